@@ -128,6 +128,35 @@ class CreateTranslationCommand(Command):
             print(f"PO file for locale '{self.locale}' already exists: {po_file}")
 
 
+class BuildCatalogCommand(Command):
+    """Custom command to build the language, keyboard and timezone catalog snapshot."""
+
+    description = 'Build the catalog snapshot installed with the package'
+    user_options = [
+        ('xkb-rules-dir=', None, 'XKB rules directory to parse'),
+        ('zoneinfo-dir=', None, 'zoneinfo directory to parse')
+    ]
+
+    def initialize_options(self):
+        self.xkb_rules_dir = None
+        self.zoneinfo_dir = None
+
+    def finalize_options(self):
+        from setup_station.data import xkb_rules_dir, zoneinfo_dir
+        if self.xkb_rules_dir is None:
+            self.xkb_rules_dir = xkb_rules_dir
+        if self.zoneinfo_dir is None:
+            self.zoneinfo_dir = zoneinfo_dir
+
+    def run(self):
+        from setup_station.catalog import build_snapshot
+        print(f"Building catalog snapshot {catalog_snapshot_file}...")
+        names = build_snapshot(catalog_snapshot_file, self.xkb_rules_dir, self.zoneinfo_dir)
+        print(f"Catalog snapshot contains: {', '.join(names)}")
+
+
+catalog_snapshot_file = 'build/catalog/catalog.snapshot'
+
 lib_setup_station_image = [
     'src/image/G_logo.gif',
     'src/image/install-gbsd.png',
@@ -145,6 +174,10 @@ data_files = [
     (f'{prefix}/share/applications', ['src/setup-station.desktop'])
 ]
 
+# Add the catalog snapshot if it was built
+if os.path.exists(catalog_snapshot_file):
+    data_files.append((f'{prefix}/lib/setup-station', [catalog_snapshot_file]))
+
 # Add locale files if they exist
 if os.path.exists('build/mo'):
     data_files.extend(data_file_list(f'{prefix}/share/locale', 'build/mo'))
@@ -162,6 +195,7 @@ setup(
     scripts=['setup-station-init'],
     data_files=data_files,
     cmdclass={
+            'build_catalog': BuildCatalogCommand,
             'create_translation': CreateTranslationCommand,
             'update_translations': UpdateTranslationsCommand,
             "build": build_extra,
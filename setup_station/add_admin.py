@@ -3,28 +3,18 @@ This module is used to add the admin user following the utility class pattern.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk
 from setup_station.data import (
     SetupData,
-    css_path,
     get_text
 )
 from setup_station.common import (
     password_strength,
 )
-from setup_station.system_calls import set_admin_user
+from setup_station.apply import apply_admin_user
+from setup_station.rc_conf import RcConf
 from setup_station.interface_controller import Button
 
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
-
 
 class AddAdminUser:
     """
@@ -94,23 +84,19 @@ class AddAdminUser:
         }
 
     @classmethod
-    def save_admin_user(cls) -> None:
+    def save_admin_user(cls, rc_conf: RcConf | None = None) -> None:
         """
         Save admin user configuration and apply system changes.
 
+        Args:
+            rc_conf: Optional rc.conf transaction receiving the hostname
+
         Raises:
             ValueError: If user data validation fails
-            subprocess.CalledProcessError: If system commands fail
+            subprocess.SubprocessError: If system commands fail or time out
         """
         cls.save_user_data()
-        set_admin_user(
-            SetupData.username,
-            SetupData.user_fullname,
-            SetupData.user_password,
-            SetupData.user_shell,
-            SetupData.user_home_directory,
-            SetupData.hostname
-        )
+        apply_admin_user(rc_conf)
 
     @classmethod
     def user_and_host(cls, _widget: Gtk.Entry) -> None:
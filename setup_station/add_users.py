@@ -1,19 +1,9 @@
 #!/usr/bin/env python
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk
 from setup_station.common import password_strength
-from setup_station.data import css_path, get_text
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
+from setup_station.data import get_text
 
 
 class AddUsers:
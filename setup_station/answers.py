@@ -0,0 +1,140 @@
+"""
+Answers file support for unattended setup.
+
+An answers file is TOML holding the values the wizard pages would collect:
+
+    [language]
+    code = "en_US"
+
+    [keyboard]
+    layout = "us"
+    variant = ""
+    model = "pc105"
+
+    [timezone]
+    name = "America/New_York"
+
+    [admin]
+    username = "ghost"
+    fullname = "Ghost User"
+    password = "secret"
+    hostname = "ghost-ghostbsd"      # optional
+    shell = "/usr/local/bin/zsh"     # optional
+    home = "/home/ghost"             # optional
+
+load_answers() fills SetupData with the same values and defaults the pages
+use, so the setup pipeline runs unchanged.
+"""
+import tomllib
+
+from setup_station.data import SetupData
+
+# (table, key) -> SetupData attribute
+answer_fields: dict = {
+    ('language', 'code'): 'language_code',
+    ('keyboard', 'layout'): 'keyboard_layout',
+    ('keyboard', 'variant'): 'keyboard_variant',
+    ('keyboard', 'model'): 'keyboard_model',
+    ('timezone', 'name'): 'timezone',
+    ('admin', 'username'): 'username',
+    ('admin', 'fullname'): 'user_fullname',
+    ('admin', 'password'): 'user_password',
+    ('admin', 'hostname'): 'hostname',
+    ('admin', 'shell'): 'user_shell',
+    ('admin', 'home'): 'user_home_directory',
+}
+
+required_answers: tuple = (
+    ('language', 'code'),
+    ('timezone', 'name'),
+    ('admin', 'username'),
+    ('admin', 'fullname'),
+    ('admin', 'password'),
+)
+
+
+def parse_answers(answers: dict, source: str) -> dict:
+    """
+    Turn answers tables into SetupData attribute values.
+
+    Args:
+        answers: Table name -> {key: value}, as in an answers file
+        source: Where the answers come from, used in error messages
+
+    Returns:
+        dict: SetupData attribute -> value, with the page defaults applied
+
+    Raises:
+        ValueError: If there are unknown keys, non-string values, or a
+            required answer is missing
+    """
+    values = {}
+    for table, content in answers.items():
+        if not isinstance(content, dict):
+            raise ValueError(f"Answers {source}: '{table}' must be a table")
+        for key, value in content.items():
+            if (table, key) not in answer_fields:
+                raise ValueError(f"Answers {source}: unknown answer '{table}.{key}'")
+            if not isinstance(value, str):
+                raise ValueError(f"Answers {source}: '{table}.{key}' must be a string")
+            values[answer_fields[table, key]] = value
+    for table, key in required_answers:
+        if not values.get(answer_fields[table, key]):
+            raise ValueError(f"Answers {source}: '{table}.{key}' is required")
+
+    # Same defaults as the admin user page
+    username = values['username']
+    values.setdefault('user_shell', '/usr/local/bin/zsh')
+    values.setdefault('user_home_directory', f'/home/{username}')
+    if not values.get('hostname'):
+        values['hostname'] = f'{username}-ghostbsd'
+    values['root_password'] = values['user_password']
+    return values
+
+
+def read_answers(path: str) -> dict:
+    """
+    Read an answers file into SetupData attribute values.
+
+    Args:
+        path: Path to the TOML answers file
+
+    Returns:
+        dict: SetupData attribute -> value, with the page defaults applied
+
+    Raises:
+        ValueError: If the file is not valid TOML or its answers are invalid
+        OSError: If the file cannot be read
+    """
+    try:
+        with open(path, 'rb') as f:
+            answers = tomllib.load(f)
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"Invalid answers file {path}: {e}") from e
+    return parse_answers(answers, f"file {path}")
+
+
+def set_answers(values: dict) -> None:
+    """
+    Reset SetupData and fill it with parsed answers.
+
+    Args:
+        values: SetupData attribute -> value, as returned by parse_answers()
+    """
+    SetupData.reset()
+    for attribute, value in values.items():
+        setattr(SetupData, attribute, value)
+
+
+def load_answers(path: str) -> None:
+    """
+    Reset SetupData and fill it from an answers file.
+
+    Args:
+        path: Path to the TOML answers file
+
+    Raises:
+        ValueError: If the answers file is invalid
+        OSError: If the file cannot be read
+    """
+    set_answers(read_answers(path))
@@ -0,0 +1,151 @@
+"""
+Apply the collected setup configuration to the system.
+
+These functions read SetupData only and never import gi, so the same code
+serves the GTK pages and unattended runs driven by an answers file.
+"""
+from setup_station.data import SetupData
+from setup_station.rc_conf import RcConf
+from setup_station.schemas import SchemaCompiler
+from setup_station.system_calls import (
+    localize_system,
+    set_keyboard,
+    set_timezone,
+    create_admin_user,
+    add_admin_user,
+    admin_user_exists,
+    set_passwords,
+    set_hostname
+)
+
+
+def apply_language() -> None:
+    """
+    Apply the selected language to the system.
+
+    Raises:
+        IOError: If file operations fail during localization
+        ValueError: If no language is selected
+    """
+    if not SetupData.language_code:
+        raise ValueError("No language selected. Please select a language before proceeding.")
+    try:
+        localize_system(SetupData.language_code)
+    except (IOError, ValueError) as e:
+        raise IOError(f"Failed to apply language settings: {e}") from e
+
+
+def apply_keyboard(rc_conf: RcConf | None = None, schemas: SchemaCompiler | None = None) -> None:
+    """
+    Apply the selected keyboard layout, variant and model to the system.
+
+    Args:
+        rc_conf: Optional rc.conf transaction receiving the console keymap
+        schemas: Optional schema compiler deferring glib-compile-schemas
+
+    Raises:
+        ValueError: If the layout or variant is unknown
+        IOError: If file operations fail
+        RuntimeError: If keyboard configuration fails
+    """
+    set_keyboard(
+        SetupData.keyboard_layout,
+        SetupData.keyboard_variant,
+        SetupData.keyboard_model,
+        rc_conf,
+        schemas
+    )
+
+
+def apply_timezone() -> None:
+    """
+    Apply the selected timezone to the system.
+
+    Raises:
+        ValueError: If no timezone is selected or the timezone is invalid
+        RuntimeError: If timezone configuration fails
+    """
+    if not SetupData.timezone:
+        raise ValueError("No timezone selected. Please select a continent and city.")
+    set_timezone(SetupData.timezone)
+
+
+def apply_admin_account() -> None:
+    """
+    Set the root password and create the admin user.
+
+    Raises:
+        ValueError: If user data validation fails
+        subprocess.SubprocessError: If system commands fail or time out
+    """
+    create_admin_user(
+        SetupData.username,
+        SetupData.user_fullname,
+        SetupData.user_password,
+        SetupData.user_shell,
+        SetupData.user_home_directory
+    )
+
+
+def apply_user_account() -> None:
+    """
+    Create the admin user account unless it exists; passwords are set by
+    apply_passwords().
+
+    The values were validated when the setup plan was compiled.
+
+    Raises:
+        subprocess.SubprocessError: If system commands fail or time out
+    """
+    if not admin_user_exists(SetupData.username):
+        add_admin_user(
+            SetupData.username,
+            SetupData.user_fullname,
+            SetupData.user_shell,
+            SetupData.user_home_directory
+        )
+
+
+def apply_passwords() -> None:
+    """
+    Set the root and admin user passwords.
+
+    A resumed setup only has the password hash kept by the journal.
+
+    Raises:
+        ValueError: If no password is set
+        subprocess.SubprocessError: If system commands fail or time out
+    """
+    if SetupData.user_password:
+        set_passwords(SetupData.username, SetupData.user_password)
+    else:
+        set_passwords(SetupData.username, SetupData.user_password_hash, hashed=True)
+
+
+def apply_hostname(rc_conf: RcConf | None = None) -> None:
+    """
+    Set the selected hostname.
+
+    Args:
+        rc_conf: Optional rc.conf transaction receiving the hostname
+
+    Raises:
+        ValueError: If the hostname is invalid
+        OSError: If the running hostname cannot be set
+    """
+    set_hostname(SetupData.hostname, rc_conf)
+
+
+def apply_admin_user(rc_conf: RcConf | None = None) -> None:
+    """
+    Create the admin user and set the hostname.
+
+    Args:
+        rc_conf: Optional rc.conf transaction receiving the hostname
+
+    Raises:
+        ValueError: If user data validation fails
+        subprocess.SubprocessError: If system commands fail or time out
+    """
+    apply_admin_account()
+    apply_hostname(rc_conf)
@@ -0,0 +1,276 @@
+"""
+Batch provisioning of many target roots from one manifest.
+
+Each manifest row holds the answers for one host. The base root is cloned
+once per row into the output directory and the setup pipeline is run
+against the clone, one host per worker process.
+
+Clones share unchanged files with the base root through hard links. Setup
+replaces every file it changes through a rename, which gives the clone its
+own copy, so those changes never reach the base root. Files that tools
+modify in place instead are copied up front: the password database, which
+pw rewrites, and the log files, which pw and others append to.
+
+Manifests are JSON, a list of objects shaped like an answers file:
+
+    [{"name": "host1", "language": {"code": "en_US"}, "admin": {...}}]
+
+or CSV with one column per answer, named table.key:
+
+    name,language.code,timezone.name,admin.username,admin.fullname,...
+
+The optional name is the clone directory; it defaults to the hostname.
+"""
+import csv
+import errno
+import json
+import os
+import re
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from setup_station.answers import parse_answers
+from setup_station.data import Target
+from setup_station.file_edit import atomic_write
+from setup_station.pipeline import apply_plan
+from setup_station.plan import compile_plan, validate
+from setup_station.setup_report import SetupReport
+
+# Paths, relative to the root, of the password database; they are copied
+# instead of linked
+private_files: tuple = (
+    'etc/master.passwd',
+    'etc/passwd',
+    'etc/pwd.db',
+    'etc/spwd.db',
+    'etc/group',
+)
+# Directories, relative to the root, whose files are appended to in place,
+# such as pw's userlog; every file below them is copied instead of linked
+private_dirs: tuple = (
+    'var/log',
+)
+
+
+def read_manifest(path: str) -> list:
+    """
+    Read the host rows of a JSON or CSV manifest.
+
+    Args:
+        path: Manifest path; a .json suffix selects JSON, anything else CSV
+
+    Returns:
+        list: (name, answers tables) tuples in manifest order
+
+    Raises:
+        ValueError: If the manifest is malformed or a name is invalid or
+            duplicated
+        OSError: If the file cannot be read
+    """
+    if path.endswith('.json'):
+        try:
+            with open(path, 'r') as f:
+                rows = json.load(f)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid manifest {path}: {e}") from e
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError(f"Manifest {path} must be a list of objects")
+    else:
+        with open(path, 'r', newline='') as f:
+            rows = []
+            for row in csv.DictReader(f):
+                tables = {}
+                for column, value in row.items():
+                    if column == 'name':
+                        tables['name'] = value
+                    elif value:
+                        table, _, key = column.partition('.')
+                        tables.setdefault(table, {})[key] = value
+                rows.append(tables)
+
+    hosts = []
+    names = set()
+    for number, row in enumerate(rows, 1):
+        answers = dict(row)
+        name = answers.pop('name', '') or answers.get('admin', {}).get('hostname', '')
+        if not re.match(r'^[A-Za-z0-9][A-Za-z0-9._-]*$', name or ''):
+            raise ValueError(f"Manifest {path} row {number}: invalid or missing host name '{name}'")
+        if name in names:
+            raise ValueError(f"Manifest {path} row {number}: duplicate host name '{name}'")
+        names.add(name)
+        hosts.append((name, answers))
+    return hosts
+
+
+def clone_root(base_root: str, host_root: str) -> None:
+    """
+    Clone a root directory, hard linking every file except private_files
+    and the files below private_dirs, which are copied.
+
+    Files on another filesystem than the clone are copied too. A host_root
+    left by an earlier run is replaced, not updated: the new clone is built
+    next to it and renamed into place, then the stale clone is removed.
+    Removing it only drops the clone's own links, so the base root is
+    unaffected.
+
+    Args:
+        base_root: Root directory to clone
+        host_root: Root directory of the clone
+
+    Raises:
+        ValueError: If host_root is the base root or contains it
+        OSError: If the clone cannot be created
+    """
+    base = os.path.realpath(base_root)
+    host = os.path.realpath(host_root)
+    if host == base or base.startswith(host + os.sep):
+        raise ValueError(f"Clone '{host_root}' would replace the base root '{base_root}'")
+    private = {os.path.join(base_root, path) for path in private_files}
+    private_trees = tuple(os.path.join(base_root, path) + os.sep for path in private_dirs)
+
+    def link_or_copy(source: str, destination: str) -> None:
+        if source not in private and not source.startswith(private_trees):
+            try:
+                os.link(source, destination)
+                return
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM):
+                    raise
+        shutil.copy2(source, destination)
+
+    # Host names never start with a dot, so these cannot clash with a clone
+    parent, name = os.path.split(host_root)
+    building = os.path.join(parent, f'.{name}.new')
+    stale = os.path.join(parent, f'.{name}.old')
+    for leftover in (building, stale):
+        remove_tree(leftover)
+    shutil.copytree(base_root, building, symlinks=True, copy_function=link_or_copy)
+    if os.path.lexists(host_root):
+        os.rename(host_root, stale)
+        os.rename(building, host_root)
+        remove_tree(stale)
+    else:
+        os.rename(building, host_root)
+
+
+def remove_tree(path: str) -> None:
+    """
+    Remove a directory tree, or a file or symbolic link; a missing path is
+    ignored.
+
+    Args:
+        path: Path to remove
+
+    Raises:
+        OSError: If the path cannot be removed
+    """
+    if os.path.islink(path) or os.path.isfile(path):
+        os.unlink(path)
+    elif os.path.isdir(path):
+        shutil.rmtree(path)
+
+
+def provision_host(name: str, values: dict, base_root: str, host_root: str) -> dict:
+    """
+    Clone the base root and run the setup pipeline against the clone.
+
+    Runs in a worker process.
+
+    Args:
+        name: Host name used in the result
+        values: SetupData attribute -> value from parse_answers()
+        base_root: Root directory to clone
+        host_root: Root directory of this host
+
+    Returns:
+        dict: Host name, root, status, error and duration in seconds
+    """
+    start = time.monotonic()
+    result = {'name': name, 'root': host_root, 'status': 'ok', 'error': None}
+    try:
+        # Reject invalid answers before paying for the clone
+        Target.set_root(base_root)
+        errors = validate(values)
+        if errors:
+            raise ValueError('; '.join(errors))
+        clone_root(base_root, host_root)
+        Target.set_root(host_root)
+        SetupReport.reset()
+        apply_plan(compile_plan(values))
+    except Exception as e:
+        result['status'] = 'failed'
+        result['error'] = str(e)
+    result['duration'] = round(time.monotonic() - start, 6)
+    return result
+
+
+def run_batch(manifest: str, base_root: str, output_dir: str, jobs: int | None = None) -> list:
+    """
+    Provision one root per manifest row in parallel.
+
+    Rows whose answers are invalid are reported as failed without being
+    cloned. Per-host results and the throughput are printed and saved as
+    batch-<epoch>.json in the output directory.
+
+    Args:
+        manifest: Path to the JSON or CSV manifest
+        base_root: Root directory every host is cloned from
+        output_dir: Directory receiving one root per host
+        jobs: Number of worker processes, by default the number of CPUs
+
+    Returns:
+        list: Per-host result dictionaries, in completion order
+
+    Raises:
+        ValueError: If the manifest or base root is invalid
+        OSError: If the manifest cannot be read
+    """
+    if not os.path.isdir(base_root):
+        raise ValueError(f"Base root is not a directory: '{base_root}'")
+    hosts = read_manifest(manifest)
+    os.makedirs(output_dir, exist_ok=True)
+    base_root = os.path.abspath(base_root)
+    started_at = time.time()
+    start = time.monotonic()
+
+    results = []
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = []
+        for name, answers in hosts:
+            host_root = os.path.join(os.path.abspath(output_dir), name)
+            try:
+                values = parse_answers(answers, f"for host {name}")
+            except ValueError as e:
+                results.append({'name': name, 'root': host_root, 'status': 'failed', 'error': str(e), 'duration': 0.0})
+                print(f"{name}: failed: {e}")
+                continue
+            futures.append(pool.submit(provision_host, name, values, base_root, host_root))
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if result['error']:
+                print(f"{result['name']}: failed after {result['duration']:.2f}s: {result['error']}")
+            else:
+                print(f"{result['name']}: ok in {result['duration']:.2f}s")
+
+    duration = time.monotonic() - start
+    failed = sum(1 for result in results if result['status'] != 'ok')
+    hosts_per_minute = (len(results) - failed) * 60 / duration if duration else 0.0
+    print(f"Provisioned {len(results) - failed} of {len(results)} hosts in {duration:.2f}s "
+          f"({hosts_per_minute:.1f} hosts/minute)")
+
+    report = {
+        'started_at': started_at,
+        'duration': round(duration, 6),
+        'hosts_per_minute': round(hosts_per_minute, 3),
+        'hosts': results
+    }
+    try:
+        atomic_write(
+            os.path.join(output_dir, f'batch-{int(started_at)}.json'),
+            json.dumps(report, indent=2) + '\n'
+        )
+    except OSError as e:
+        print(f"Warning: Failed to write batch report: {e}")
+    return results
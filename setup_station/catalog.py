@@ -0,0 +1,329 @@
+"""
+Persistent on-disk cache for the language, keyboard and timezone catalogs.
+
+Querying pc-sysinstall for the catalogs forks one process per query, which
+dominates startup time on slow first-boot hardware. The results are kept in
+a single versioned JSON file under cache_dir. Every entry is keyed by the
+modification time and size of the files it was built from, so a stale entry
+is detected on load, served once, and rebuilt in the background.
+
+A read-only snapshot built with "setup.py build_catalog" can be installed
+next to the stylesheet. When present and of the current version it is loaded
+in one read and takes precedence over the cache and the live queries.
+
+prefetch() starts every catalog on a thread pool as soon as the process
+starts, so the pages can show their placeholder lists and fill them as each
+catalog resolves instead of blocking the first frame. Only the catalog
+parsers are imported up front; system_calls, which pulls in the whole setup
+backend, is imported when pc-sysinstall has to be queried.
+"""
+import json
+import marshal
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+
+from setup_station.data import (
+    cache_dir,
+    catalog_snapshot,
+    pc_sysinstall,
+    xkb_rules_dir,
+    zoneinfo_dir
+)
+from setup_station.file_edit import atomic_write
+from setup_station.keyboard_catalog import keyboard_catalog, rules_files
+from setup_station.timezone_catalog import timezone_catalog
+
+CACHE_VERSION: int = 1
+SNAPSHOT_VERSION: int = 1
+cache_file: str = os.path.join(cache_dir, 'catalog.json')
+
+xkb_rules_sources: tuple = tuple(
+    os.path.join(xkb_rules_dir, rules_file) for rules_file in rules_files
+)
+
+
+def query_languages() -> dict:
+    """
+    Query the available system languages from pc-sysinstall.
+
+    Returns:
+        dict: Dictionary mapping language names to language codes
+
+    Raises:
+        RuntimeError: If pc-sysinstall command fails
+    """
+    from setup_station.system_calls import language_dictionary
+    return language_dictionary()
+
+
+# Catalog name -> (builder, files the result depends on)
+catalog_sources: dict = {
+    'languages': (query_languages, (pc_sysinstall,)),
+    'keyboard_layouts': (lambda: keyboard_catalog().layouts, xkb_rules_sources),
+    'keyboard_models': (lambda: keyboard_catalog().models, xkb_rules_sources),
+    'timezones': (
+        lambda: timezone_catalog().index,
+        (os.path.join(zoneinfo_dir, 'zone1970.tab'), os.path.join(zoneinfo_dir, 'tzdata.zi'))
+    ),
+}
+
+
+def fingerprint(paths: tuple) -> list:
+    """
+    Build the cache key for a list of source files.
+
+    Args:
+        paths: Files or directories a catalog is built from
+
+    Returns:
+        list: One [path, mtime_ns, size] entry per path, None values if missing
+    """
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            key.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            key.append([path, None, None])
+    return key
+
+
+class CatalogCache:
+    """
+    Utility class holding the catalog cache following the utility class pattern.
+
+    The cache file is read once, on first access, and every later lookup is
+    served from memory. Writes replace the whole file atomically so a reader
+    never sees a partially written cache.
+    """
+    entries: dict | None = None
+    snapshot: dict | None = None
+    futures: dict = {}
+    _lock: threading.Lock = threading.Lock()
+    _rebuilding: set = set()
+
+    @classmethod
+    def prefetch(cls) -> dict:
+        """
+        Start loading every catalog concurrently.
+
+        The cache file is read once up front, then every catalog lookup runs
+        on its own worker so a cache miss on one catalog does not delay the
+        others. Calling it again returns the futures already started.
+
+        Returns:
+            dict: Catalog name -> Future resolving to the catalog data
+        """
+        if not cls.futures:
+            cls.load_snapshot()
+            cls.load()
+            executor = ThreadPoolExecutor(
+                max_workers=len(catalog_sources),
+                thread_name_prefix='catalog'
+            )
+            cls.futures = {
+                name: executor.submit(cls.get, name)
+                for name in catalog_sources
+            }
+            executor.shutdown(wait=False)
+        return cls.futures
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Drop the catalogs held in memory; the cache file is kept.
+        """
+        with cls._lock:
+            cls.entries = None
+            cls.snapshot = None
+            cls.futures = {}
+
+    @classmethod
+    def when_ready(cls, name: str, callback: Callable[[dict], None]) -> None:
+        """
+        Call callback with a catalog once its prefetch resolves.
+
+        The callback runs on the worker thread that resolved the catalog, or
+        immediately if it is already available; GTK callers must hand the
+        result back to the main loop themselves. A failed query, whatever
+        the error, is reported and passed on as an empty catalog so the page
+        waiting for it never stays on its placeholder.
+
+        Args:
+            name: Catalog name, one of catalog_sources
+            callback: Function receiving the catalog data
+        """
+        def done(future: Future) -> None:
+            try:
+                data = future.result()
+            except Exception as e:
+                print(f"Warning: Failed to load {name} catalog: {e}")
+                data = {}
+            callback(data)
+
+        cls.prefetch()[name].add_done_callback(done)
+
+    @classmethod
+    def load_snapshot(cls) -> dict:
+        """
+        Load the build-time catalog snapshot in a single read.
+
+        A missing, unreadable or other-version snapshot is treated as empty.
+
+        Returns:
+            dict: Catalog name -> catalog data
+        """
+        if cls.snapshot is None:
+            try:
+                with open(catalog_snapshot, 'rb') as f:
+                    content = marshal.load(f)
+                if content.get('version') == SNAPSHOT_VERSION:
+                    cls.snapshot = content.get('catalogs', {})
+                else:
+                    cls.snapshot = {}
+            except (OSError, EOFError, ValueError, TypeError, AttributeError):
+                cls.snapshot = {}
+        return cls.snapshot
+
+    @classmethod
+    def load(cls) -> dict:
+        """
+        Load the cache file into memory in a single read.
+
+        Returns:
+            dict: Catalog name -> {'key': ..., 'data': ...} entries
+        """
+        if cls.entries is None:
+            try:
+                with open(cache_file, 'r') as f:
+                    content = json.load(f)
+                entries = content.get('entries') if content.get('version') == CACHE_VERSION else None
+                cls.entries = entries if isinstance(entries, dict) else {}
+            except (OSError, ValueError, AttributeError):
+                cls.entries = {}
+        return cls.entries
+
+    @classmethod
+    def get(cls, name: str) -> dict:
+        """
+        Return a catalog, building it on a cache miss.
+
+        The build-time snapshot is used first when it holds the catalog. A
+        stale cache entry is returned as is and rebuilt in the background so
+        the caller never waits on pc-sysinstall when any cached copy exists.
+        A malformed entry, left by a corrupt or older cache, counts as a miss.
+
+        Args:
+            name: Catalog name, one of catalog_sources
+
+        Returns:
+            dict: The catalog data
+        """
+        snapshot = cls.load_snapshot()
+        if name in snapshot:
+            return snapshot[name]
+        builder, sources = catalog_sources[name]
+        key = fingerprint(sources)
+        entry = cls.load().get(name)
+        if not isinstance(entry, dict) or not isinstance(entry.get('data'), dict):
+            data = builder()
+            cls.store(name, key, data)
+            return data
+        if entry.get('key') != key:
+            cls.rebuild_in_background(name)
+        return entry['data']
+
+    @classmethod
+    def rebuild_in_background(cls, name: str) -> None:
+        """
+        Rebuild a stale catalog entry on a daemon thread.
+
+        Args:
+            name: Catalog name, one of catalog_sources
+        """
+        with cls._lock:
+            if name in cls._rebuilding:
+                return
+            cls._rebuilding.add(name)
+        thr = threading.Thread(target=cls._rebuild, args=(name,), daemon=True)
+        thr.start()
+
+    @classmethod
+    def _rebuild(cls, name: str) -> None:
+        builder, sources = catalog_sources[name]
+        try:
+            key = fingerprint(sources)
+            cls.store(name, key, builder())
+        except Exception as e:
+            print(f"Warning: Failed to rebuild {name} catalog: {e}")
+        finally:
+            with cls._lock:
+                cls._rebuilding.discard(name)
+
+    @classmethod
+    def store(cls, name: str, key: list, data: dict) -> None:
+        """
+        Store a catalog entry and write the cache file atomically.
+
+        Args:
+            name: Catalog name
+            key: Fingerprint of the catalog sources
+            data: Catalog data
+        """
+        with cls._lock:
+            entries = dict(cls.load())
+            entries[name] = {'key': key, 'data': data}
+            cls.entries = entries
+            try:
+                write_cache(entries)
+            except OSError as e:
+                print(f"Warning: Failed to write catalog cache: {e}")
+
+
+def write_cache(entries: dict) -> None:
+    """
+    Write the cache file through a temporary file and rename.
+
+    Args:
+        entries: Catalog entries to write
+
+    Raises:
+        OSError: If the cache directory or file cannot be written
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    atomic_write(cache_file, json.dumps({'version': CACHE_VERSION, 'entries': entries}))
+
+
+def build_snapshot(path: str, rules_dir: str = xkb_rules_dir, tz_dir: str = zoneinfo_dir) -> list:
+    """
+    Build the catalog snapshot shipped with the package.
+
+    Catalogs whose source is not available on the build host are left out,
+    so the runtime falls back to the cache or live query for them.
+
+    Args:
+        path: Output file
+        rules_dir: XKB rules directory to parse
+        tz_dir: zoneinfo directory to parse
+
+    Returns:
+        list: Names of the catalogs written to the snapshot
+    """
+    builders = {
+        'languages': query_languages,
+        'keyboard_layouts': lambda: keyboard_catalog(rules_dir).layouts,
+        'keyboard_models': lambda: keyboard_catalog(rules_dir).models,
+        'timezones': lambda: timezone_catalog(tz_dir).index,
+    }
+    catalogs = {}
+    for name, builder in builders.items():
+        try:
+            catalogs[name] = builder()
+        except Exception as e:
+            print(f"Warning: {name} catalog not included in snapshot: {e}")
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        marshal.dump({'version': SNAPSHOT_VERSION, 'catalogs': catalogs}, f)
+    return list(catalogs)
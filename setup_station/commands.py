@@ -0,0 +1,280 @@
+"""
+Central runner for the external commands of setup-station.
+
+Every command gets a timeout, looked up by program name, so a hung program
+fails its step instead of freezing setup. At most max_processes commands run
+at once, whichever thread starts them, and run_all() runs independent
+commands concurrently. Every command is timed and its exit status recorded
+in the setup report.
+
+Setting SETUP_STATION_COMMANDS to record:DIR saves the result and output of
+every command as a fixture in DIR; replay:DIR answers every command from
+those fixtures without running anything, so the pipeline can be benchmarked
+deterministically on a system without the FreeBSD tools. Command input,
+which can hold passwords, is never saved.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from subprocess import CompletedProcess
+from typing import Callable
+
+from setup_station.file_edit import atomic_write
+from setup_station.profiling import Profiler
+from setup_station.setup_report import SetupReport
+
+commands_env: str = 'SETUP_STATION_COMMANDS'
+
+# Seconds a program may run before it is killed, by program name
+command_timeouts: dict = {
+    'pc-sysinstall': 30.0,
+    'setxkbmap': 10.0,
+    'pw': 60.0,
+    'glib-compile-schemas': 120.0,
+}
+default_timeout: float = 60.0
+
+
+class CommandRunner:
+    """
+    Utility class running external commands following the utility class pattern.
+
+    Attributes:
+        mode: None to run commands, 'record' or 'replay'
+        fixture_dir: Fixture directory of the record and replay modes
+    """
+    max_processes: int = 4
+    mode: str | None = None
+    fixture_dir: str | None = None
+    _configured: bool = False
+    _slots: threading.BoundedSemaphore = threading.BoundedSemaphore(max_processes)
+    _lock: threading.Lock = threading.Lock()
+    _replayed: dict = {}
+
+    @classmethod
+    def configure(cls, value: str | None = None) -> None:
+        """
+        Select the record or replay mode.
+
+        Args:
+            value: 'record:DIR', 'replay:DIR' or empty to run commands; by
+                default the SETUP_STATION_COMMANDS environment variable
+
+        Raises:
+            ValueError: If the value is not understood
+        """
+        if value is None:
+            value = os.environ.get(commands_env, '')
+        mode, _, directory = value.partition(':')
+        if not mode:
+            mode, directory = None, None
+        elif mode not in ('record', 'replay') or not directory:
+            raise ValueError(f"Invalid {commands_env} value '{value}'; expected record:DIR or replay:DIR")
+        with cls._lock:
+            cls.mode = mode
+            cls.fixture_dir = directory
+            cls._replayed = {}
+            cls._configured = True
+
+    @classmethod
+    def timeout_for(cls, command: list) -> float:
+        """
+        Return the timeout of a command.
+
+        Args:
+            command: Command and arguments
+
+        Returns:
+            float: Seconds the command may run
+        """
+        return command_timeouts.get(os.path.basename(command[0]), default_timeout)
+
+    @classmethod
+    def _fixture_path(cls, command: list) -> str:
+        """Return the fixture file of a command line."""
+        digest = hashlib.sha256(json.dumps(command).encode()).hexdigest()[:16]
+        return os.path.join(cls.fixture_dir, f'{os.path.basename(command[0])}-{digest}.json')
+
+    @classmethod
+    def _record(cls, command: list, result: CompletedProcess, duration: float) -> None:
+        """Append the result of a command to its fixture."""
+        def text(output: str | bytes | None) -> str | None:
+            if isinstance(output, bytes):
+                return output.decode('utf-8', 'surrogateescape')
+            return output
+
+        entry = {
+            'returncode': result.returncode,
+            'stdout': text(result.stdout),
+            'stderr': text(result.stderr),
+            'duration': round(duration, 6)
+        }
+        path = cls._fixture_path(command)
+        with cls._lock:
+            try:
+                with open(path, 'r') as f:
+                    fixture = json.load(f)
+            except FileNotFoundError:
+                fixture = {'command': command, 'results': []}
+            fixture['results'].append(entry)
+            os.makedirs(cls.fixture_dir, exist_ok=True)
+            atomic_write(path, json.dumps(fixture, indent=2) + '\n', sync_directory=False)
+
+    @classmethod
+    def _replay(cls, command: list, text: bool) -> CompletedProcess:
+        """
+        Answer a command from its fixture.
+
+        Repeated commands get the recorded results in order; the last one is
+        repeated once they run out.
+        """
+        path = cls._fixture_path(command)
+        try:
+            with open(path, 'r') as f:
+                results = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise RuntimeError(f"No recorded result for command '{command[0]}' in {cls.fixture_dir}: {e}") from e
+        with cls._lock:
+            count = cls._replayed.get(path, 0)
+            cls._replayed[path] = count + 1
+        entry = results[min(count, len(results) - 1)]
+
+        def output(value: str | None) -> str | bytes | None:
+            if value is None or text:
+                return value
+            return value.encode('utf-8', 'surrogateescape')
+
+        return CompletedProcess(command, entry['returncode'], output(entry['stdout']), output(entry['stderr']))
+
+    @classmethod
+    def run(cls, command: list, timeout: float | None = None, check: bool = False, **kwargs) -> CompletedProcess:
+        """
+        Run a command with a timeout and record it in the setup report.
+
+        The command is also timed as a phase when profiling is enabled.
+
+        Args:
+            command: Command and arguments
+            timeout: Seconds the command may run; defaults to timeout_for()
+            check: Raise CalledProcessError if the command fails
+            **kwargs: Passed through to subprocess.run
+
+        Returns:
+            CompletedProcess: The finished process
+
+        Raises:
+            subprocess.CalledProcessError: If check is set and the command
+                exits with a non-zero status
+            subprocess.TimeoutExpired: If the command runs past its timeout;
+                it is killed
+            OSError: If the command cannot be started
+            RuntimeError: In replay mode, if the command was not recorded
+        """
+        if not cls._configured:
+            cls.configure()
+        if timeout is None:
+            timeout = cls.timeout_for(command)
+        start = time.monotonic()
+        exit_status = None
+        timed_out = False
+        try:
+            with cls._slots, Profiler.phase('subprocess', ' '.join(command[:2])):
+                if cls.mode == 'replay':
+                    result = cls._replay(command, bool(kwargs.get('text') or kwargs.get('universal_newlines')))
+                else:
+                    result = subprocess.run(command, timeout=timeout, **kwargs)
+                    if cls.mode == 'record':
+                        cls._record(command, result, time.monotonic() - start)
+            exit_status = result.returncode
+            if check and result.returncode:
+                raise subprocess.CalledProcessError(result.returncode, command, result.stdout, result.stderr)
+            return result
+        except subprocess.TimeoutExpired:
+            timed_out = True
+            raise
+        finally:
+            SetupReport.record_command(command, start, exit_status, timed_out)
+
+    @classmethod
+    def run_all(
+            cls,
+            commands: list,
+            on_complete: Callable[[int, int], None] | None = None,
+            **kwargs
+    ) -> list:
+        """
+        Run independent commands concurrently.
+
+        Every command runs to completion, or its timeout, even when another
+        one fails.
+
+        Args:
+            commands: Command argument lists
+            on_complete: Called with the number of finished commands and the
+                total each time a command finishes, whether it succeeded
+            **kwargs: Passed to run() for every command
+
+        Returns:
+            list: CompletedProcess of every command, in the given order
+
+        Raises:
+            Exception: The first exception raised by a command, in order
+        """
+        if len(commands) < 2:
+            results = []
+            for command in commands:
+                results.append(cls.run(command, **kwargs))
+                if on_complete:
+                    on_complete(len(results), len(commands))
+            return results
+        with ThreadPoolExecutor(max_workers=min(len(commands), cls.max_processes),
+                                thread_name_prefix='command') as pool:
+            futures = [pool.submit(cls.run, command, **kwargs) for command in commands]
+            for done, _ in enumerate(as_completed(futures), 1):
+                if on_complete:
+                    on_complete(done, len(futures))
+        return [future.result() for future in futures]
+
+    @classmethod
+    def spawn(cls, command: list) -> None:
+        """
+        Start a command without waiting for it.
+
+        The start is recorded in the setup report; nothing is started in
+        replay mode.
+
+        Args:
+            command: Command and arguments
+
+        Raises:
+            OSError: If the command cannot be started
+        """
+        if not cls._configured:
+            cls.configure()
+        start = time.monotonic()
+        if cls.mode != 'replay':
+            subprocess.Popen(command)
+        SetupReport.record_command(command, start, None)
+
+    @classmethod
+    def exec(cls, command: list) -> None:
+        """
+        Replace this process with a command.
+
+        Returns only in replay mode, where nothing is run.
+
+        Args:
+            command: Command and arguments; the program is looked up in PATH
+
+        Raises:
+            OSError: If the command cannot be executed
+        """
+        if not cls._configured:
+            cls.configure()
+        SetupReport.record_command(command, time.monotonic(), None)
+        if cls.mode != 'replay':
+            os.execvp(command[0], command)
@@ -1,14 +1,76 @@
 """
 Contains the data class and some commonly used variables for setup-station-init
 """
-import os
 import gettext
+import os
 
 logo: str = "/usr/local/lib/setup-station/image/logo.png"
 gif_logo: str = "/usr/local/lib/setup-station/image/G_logo.gif"
 pc_sysinstall: str = "/usr/local/sbin/pc-sysinstall"
 tmp: str = "/tmp/.setup-station"
 css_path: str = "/usr/local/lib/setup-station/ghostbsd-style.css"
+locale_dir: str = "/usr/local/share/locale"
+cache_dir: str = "/var/cache/setup-station"
+report_dir: str = "/var/spool/setup-station"
+journal_dir: str = "/var/db/setup-station"
+staging_dir: str = "/var/db/setup-station/staged"
+catalog_snapshot: str = "/usr/local/lib/setup-station/catalog.snapshot"
+xkb_rules_dir: str = "/usr/local/share/X11/xkb/rules"
+zoneinfo_dir: str = "/usr/share/zoneinfo"
+setup_min_display_time: float = 0.0
+"""Minimum seconds the setup progress screen stays up before lightdm starts."""
+
+
+class Target:
+    """
+    Root directory of the system being configured.
+
+    The default root is the running system. Setting another root, such as a
+    mounted image or a staging directory, makes every setup step write below
+    it, like sysrc -R and pw -R, and skips the steps that only make sense on
+    the running system.
+    """
+    root: str = "/"
+
+    @classmethod
+    def set_root(cls, root: str) -> None:
+        """
+        Set the root directory to configure.
+
+        Args:
+            root: Path to the target root directory
+
+        Raises:
+            ValueError: If root is not an existing directory
+        """
+        if not os.path.isdir(root):
+            raise ValueError(f"Target root is not a directory: '{root}'")
+        cls.root = os.path.abspath(root)
+
+    @classmethod
+    def path(cls, path: str) -> str:
+        """
+        Return an absolute system path inside the target root.
+
+        Args:
+            path: Absolute path on the configured system, e.g. '/etc/rc.conf'
+
+        Returns:
+            str: The path below the target root
+        """
+        if cls.root == "/":
+            return path
+        return os.path.join(cls.root, path.lstrip("/"))
+
+    @classmethod
+    def is_live(cls) -> bool:
+        """
+        Tell whether the running system is the one being configured.
+
+        Returns:
+            bool: True when the target root is /
+        """
+        return cls.root == "/"
 
 
 class SetupData:
@@ -36,6 +98,7 @@ class SetupData:
     username: str = ""
     user_fullname: str = ""
     user_password: str = ""
+    user_password_hash: str = ""
     user_shell: str = ""
     user_home_directory: str = ""
     hostname: str = ""
@@ -56,12 +119,76 @@ class SetupData:
         cls.username = ""
         cls.user_fullname = ""
         cls.user_password = ""
+        cls.user_password_hash = ""
         cls.user_shell = ""
         cls.user_home_directory = ""
         cls.hostname = ""
         cls.root_password = ""
 
 
+class Translation:
+    """
+    Cached gettext translations following the utility class pattern.
+
+    One translations object is kept per language and every translated string
+    is memoized in a per-language dictionary, so get_text() is a dictionary
+    lookup after the first call. set_language() switches the current language
+    and is called when the user picks a new one.
+    """
+    language: str | None = None
+    """Selected language code, None to follow the LANGUAGE/LC_ALL/LANG environment."""
+    hits: int = 0
+    misses: int = 0
+    _translations: dict = {}
+    _messages: dict = {}
+
+    @classmethod
+    def set_language(cls, language_code: str | None) -> None:
+        """
+        Switch the language used by get_text().
+
+        Args:
+            language_code: Language code (e.g., 'fr', 'pt_BR'), or None
+        """
+        cls.language = language_code
+
+    @classmethod
+    def gettext(cls, text: str) -> str:
+        """
+        Translate text in the current language.
+
+        Args:
+            text: Text to translate
+
+        Returns:
+            str: Translated text, or text itself when no translation exists
+        """
+        language = cls.language
+        messages = cls._messages.get(language)
+        if messages is not None and text in messages:
+            cls.hits += 1
+            return messages[text]
+        cls.misses += 1
+        translations = cls._translations.get(language)
+        if translations is None:
+            translations = gettext.translation(
+                'setup-station',
+                locale_dir,
+                languages=[language] if language else None,
+                fallback=True
+            )
+            cls._translations[language] = translations
+        translated = translations.gettext(text)
+        cls._messages.setdefault(language, {})[text] = translated
+        return translated
+
+    @classmethod
+    def clear(cls) -> None:
+        """Drop every cached translations object and message."""
+        cls._translations = {}
+        cls._messages = {}
+
+
 def get_text(text: str) -> str:
     """
     Global translation function that always returns current language translation.
@@ -72,7 +199,4 @@ def get_text(text: str) -> str:
     Returns:
         str: Translated text in current language
     """
-    # Force reload of translations for current language
-    gettext.bindtextdomain('setup-station', '/usr/local/share/locale')
-    gettext.textdomain('setup-station')
-    return gettext.gettext(text)
\ No newline at end of file
+    return Translation.gettext(text)
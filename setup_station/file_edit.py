@@ -0,0 +1,371 @@
+"""
+Batched, atomic file edits.
+
+Edits are grouped per file and applied in one read and one write per file.
+Every file is replaced through a temporary file and rename, so a power loss
+leaves either the old or the new content, never a half-written system file.
+The containing directories are fsynced once per batch.
+
+install_copy() and install_symlink() replace a file the same way with a
+kernel-side copy of, or a symbolic link to, another file.
+"""
+import errno
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+from functools import lru_cache
+
+SNAPSHOT_VERSION: int = 1
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """
+    Compile a regular expression once and reuse it.
+
+    Args:
+        pattern: Regular expression
+
+    Returns:
+        re.Pattern: The compiled pattern
+    """
+    return re.compile(pattern)
+
+
+def fsync_directory(directory: str) -> None:
+    """
+    Flush a directory entry to disk so a completed rename is durable.
+
+    Args:
+        directory: Directory to fsync
+    """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: str, content: str | bytes, sync_directory: bool = True, mode: int = 0o644) -> None:
+    """
+    Replace a file through a fsynced temporary file and rename.
+
+    An existing file keeps its mode and owner; a new one gets mode.
+
+    Args:
+        path: File to write
+        content: New content, text or bytes
+        sync_directory: Whether to fsync the directory after the rename
+        mode: Permission bits used when the file does not exist yet
+
+    Raises:
+        OSError: If the file cannot be written
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.')
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+            f.flush()
+            try:
+                stat = os.stat(path)
+                os.fchmod(f.fileno(), stat.st_mode & 0o7777)
+                os.fchown(f.fileno(), stat.st_uid, stat.st_gid)
+            except FileNotFoundError:
+                os.fchmod(f.fileno(), mode)
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if sync_directory:
+        fsync_directory(directory)
+
+
+def _temporary_name(path: str) -> str:
+    """Return an unused hidden name next to path."""
+    return os.path.join(os.path.dirname(path) or '.', f'.{os.path.basename(path)}.{os.urandom(4).hex()}')
+
+
+def _copy_data(source_fd: int, fd: int) -> None:
+    """
+    Copy a whole file between descriptors.
+
+    copy_file_range() lets the kernel copy, or share, the blocks without
+    moving them through user space; other systems use a buffered copy.
+    """
+    if hasattr(os, 'copy_file_range'):
+        size = os.fstat(source_fd).st_size
+        copied = 0
+        try:
+            while copied < size:
+                count = os.copy_file_range(source_fd, fd, size - copied)
+                if count == 0:
+                    break
+                copied += count
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+        # Both offsets advanced by what was copied; finish from there
+    while True:
+        chunk = os.read(source_fd, 1 << 16)
+        if not chunk:
+            return
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(fd, view):]
+
+
+def install_copy(source: str, path: str, sync_directory: bool = True) -> None:
+    """
+    Atomically replace a file with a copy of another file.
+
+    The data is copied into a fsynced temporary file with the source's mode,
+    which is renamed over path. The copy is never a hard link: tools that
+    rewrite the file in place would otherwise change the source too.
+
+    Args:
+        source: File providing the content
+        path: File to replace
+        sync_directory: Whether to fsync the directory after the rename
+
+    Raises:
+        OSError: If the source cannot be read or the file cannot be written
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(path)}.')
+    try:
+        with open(source, 'rb') as f:
+            _copy_data(f.fileno(), fd)
+            os.fchmod(fd, os.fstat(f.fileno()).st_mode & 0o7777)
+        os.fsync(fd)
+        os.close(fd)
+        fd = None
+        os.replace(tmp_path, path)
+    except OSError:
+        if fd is not None:
+            os.close(fd)
+        os.unlink(tmp_path)
+        raise
+    if sync_directory:
+        fsync_directory(directory)
+
+
+def install_symlink(target: str, path: str, sync_directory: bool = True) -> None:
+    """
+    Atomically replace a file with a symbolic link.
+
+    Args:
+        target: Link target, stored as given
+        path: File to replace
+        sync_directory: Whether to fsync the directory after the rename
+
+    Raises:
+        OSError: If the link cannot be created
+    """
+    tmp_path = _temporary_name(path)
+    os.symlink(target, tmp_path)
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.unlink(tmp_path)
+        raise
+    if sync_directory:
+        fsync_directory(os.path.dirname(path) or '.')
+
+
+class FileSnapshot:
+    """
+    Saved state of some files, restored atomically on request.
+
+    A file is saved with its content and mode, a symbolic link with its
+    target, and a missing file as missing, so restore() deletes it. save()
+    keeps the snapshot on disk so another process can restore it after a
+    crash.
+    """
+
+    def __init__(self, paths: list) -> None:
+        """
+        Save the files.
+
+        Args:
+            paths: Files to save; duplicates are saved once
+
+        Raises:
+            OSError: If an existing file cannot be read
+        """
+        self.files: dict = {}
+        for path in dict.fromkeys(paths):
+            if os.path.islink(path):
+                self.files[path] = ('link', os.readlink(path), None)
+            elif os.path.isfile(path):
+                with open(path, 'rb') as f:
+                    self.files[path] = ('file', f.read(), os.stat(path).st_mode & 0o7777)
+            else:
+                self.files[path] = ('missing', None, None)
+
+    def restore(self) -> None:
+        """
+        Put every saved file back as it was.
+
+        Raises:
+            OSError: If a file cannot be written or removed
+        """
+        directories = set()
+        for path, (kind, content, mode) in self.files.items():
+            if kind == 'link':
+                install_symlink(content, path, sync_directory=False)
+            elif kind == 'file':
+                atomic_write(path, content, sync_directory=False, mode=mode)
+                os.chmod(path, mode)
+            else:
+                try:
+                    os.unlink(path)
+                except FileNotFoundError:
+                    continue
+            directories.add(os.path.dirname(path) or '.')
+        for directory in directories:
+            fsync_directory(directory)
+
+    def save(self, directory: str) -> None:
+        """
+        Write the snapshot to a directory, durably.
+
+        The manifest is written last, so a directory without one holds an
+        incomplete snapshot and load() ignores it.
+
+        Args:
+            directory: Directory receiving the snapshot; created mode 0700
+
+        Raises:
+            OSError: If the snapshot cannot be written
+        """
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        files = []
+        for number, (path, (kind, content, mode)) in enumerate(self.files.items()):
+            if kind == 'file':
+                atomic_write(os.path.join(directory, str(number)), content, sync_directory=False, mode=0o600)
+                content = str(number)
+            files.append([path, kind, content, mode])
+        manifest = {'version': SNAPSHOT_VERSION, 'files': files}
+        atomic_write(os.path.join(directory, 'manifest.json'), json.dumps(manifest) + '\n', mode=0o600)
+
+    @classmethod
+    def load(cls, directory: str) -> 'FileSnapshot | None':
+        """
+        Read a snapshot written by save().
+
+        Args:
+            directory: Snapshot directory
+
+        Returns:
+            FileSnapshot | None: The snapshot, None if it is incomplete or
+                of another version
+
+        Raises:
+            OSError: If a saved file cannot be read
+        """
+        try:
+            with open(os.path.join(directory, 'manifest.json'), 'r') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if not isinstance(manifest, dict) or manifest.get('version') != SNAPSHOT_VERSION:
+            return None
+        snapshot = cls([])
+        for path, kind, content, mode in manifest['files']:
+            if kind == 'file':
+                with open(os.path.join(directory, content), 'rb') as f:
+                    content = f.read()
+            snapshot.files[path] = (kind, content, mode)
+        return snapshot
+
+    @staticmethod
+    def discard(directory: str) -> None:
+        """
+        Remove a snapshot written by save(); a missing one is ignored.
+
+        Args:
+            directory: Snapshot directory
+
+        Raises:
+            OSError: If the snapshot cannot be removed
+        """
+        try:
+            shutil.rmtree(directory)
+        except FileNotFoundError:
+            return
+        fsync_directory(os.path.dirname(directory) or '.')
+
+
+class FileEdits:
+    """
+    A batch of regular expression edits committed together.
+
+    Every file is read once, all of its edits are applied in the order they
+    were added, and it is written back once, only if its content changed.
+    """
+
+    def __init__(self) -> None:
+        self.edits: dict = {}
+        self._lock = threading.Lock()
+
+    def add(self, file: str, pattern: str, replacement: str) -> None:
+        """
+        Queue a re.sub edit on a file.
+
+        Args:
+            file: Path to the file to modify
+            pattern: Pattern to search for (regex)
+            replacement: Replacement string
+        """
+        with self._lock:
+            self.edits.setdefault(file, []).append((compile_pattern(pattern), replacement))
+
+    def commit(self) -> list:
+        """
+        Apply every queued edit.
+
+        All files are read and edited in memory before the first one is
+        written, so a missing file aborts the batch without changing anything.
+
+        Returns:
+            list: Files whose content changed
+
+        Raises:
+            FileNotFoundError: If a file to edit doesn't exist
+            IOError: If file operations fail
+        """
+        with self._lock:
+            edits, self.edits = self.edits, {}
+        results = {}
+        for file, file_edits in edits.items():
+            if not os.path.exists(file):
+                raise FileNotFoundError(f"File not found: {file}")
+            try:
+                with open(file, 'r') as f:
+                    content = f.read()
+            except (IOError, OSError) as e:
+                raise IOError(f"Failed to read file {file}: {e}") from e
+            modified = content
+            for pattern, replacement in file_edits:
+                modified = pattern.sub(replacement, modified)
+            if modified != content:
+                results[file] = modified
+
+        directories = set()
+        for file, content in results.items():
+            try:
+                atomic_write(file, content, sync_directory=False)
+            except (IOError, OSError) as e:
+                raise IOError(f"Failed to modify file {file}: {e}") from e
+            directories.add(os.path.dirname(file) or '.')
+        for directory in directories:
+            fsync_directory(directory)
+        return list(results)
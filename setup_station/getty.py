@@ -0,0 +1,196 @@
+"""
+Structured models of /etc/ttys and /etc/gettytab.
+
+Replaces the sed edits that removed the live user autologin. Both files are
+parsed once with comments and layout preserved, edited by entry instead of
+by text match, and written back through a temporary file, fsync and rename.
+Every edit is listed in changes.
+"""
+import re
+import threading
+
+from setup_station.data import Target
+from setup_station.file_edit import atomic_write
+
+ttys_path: str = '/etc/ttys'
+gettytab_path: str = '/etc/gettytab'
+
+# name, separator, getty command (quoted or a single word), rest of the line
+_ttys_entry = re.compile(r'^(?P<name>[^\s#]+)(?P<separator>\s+)(?P<getty>"[^"]*"|[^\s#]+)(?P<rest>.*)$')
+
+
+class ConfigFile:
+    """
+    Lines of a configuration file, edited in memory and committed once.
+
+    Attributes:
+        changes: Descriptions of the uncommitted edits
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Read the file once.
+
+        Args:
+            path: Path to the file; a missing file is treated as empty
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.changes: list = []
+        try:
+            with open(self.path, 'r') as f:
+                self.lines = f.read().splitlines()
+        except FileNotFoundError:
+            self.lines = []
+
+    def commit(self, sync_directory: bool = True) -> list:
+        """
+        Write the edited file atomically, if anything changed.
+
+        Args:
+            sync_directory: Whether to fsync the directory after the rename
+
+        Returns:
+            list: Descriptions of the committed edits, empty if nothing changed
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        with self._lock:
+            if not self.changes:
+                return []
+            atomic_write(self.path, '\n'.join(self.lines) + '\n', sync_directory=sync_directory)
+            changes, self.changes = self.changes, []
+            return changes
+
+
+class Ttys(ConfigFile):
+    """
+    Model of /etc/ttys: one terminal per line, with its getty command, terminal
+    type and status.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Args:
+            path: Path to the ttys file, by default /etc/ttys in the target root
+        """
+        super().__init__(path or Target.path(ttys_path))
+
+    def getty_type(self, tty: str) -> str | None:
+        """
+        Return the gettytab entry a terminal's getty uses.
+
+        Args:
+            tty: Terminal name, e.g. 'ttyv0'
+
+        Returns:
+            str | None: The getty type, None if the terminal is not listed or
+                its command has no type argument
+        """
+        with self._lock:
+            for line in self.lines:
+                match = _ttys_entry.match(line)
+                if match and match.group('name') == tty:
+                    words = match.group('getty').strip('"').split()
+                    return words[1] if len(words) > 1 else None
+        return None
+
+    def replace_getty_type(self, tty: str, old: str, new: str) -> bool:
+        """
+        Switch a terminal's getty from one gettytab entry to another.
+
+        Args:
+            tty: Terminal name, e.g. 'ttyv0'
+            old: Current getty type; other types are left alone
+            new: New getty type
+
+        Returns:
+            bool: True if the terminal used old and was changed
+        """
+        with self._lock:
+            for number, line in enumerate(self.lines):
+                match = _ttys_entry.match(line)
+                if not match or match.group('name') != tty:
+                    continue
+                getty = match.group('getty')
+                words = getty.strip('"').split()
+                if len(words) < 2 or words[1] != old:
+                    return False
+                words[1] = new
+                getty = f'"{" ".join(words)}"'
+                self.lines[number] = (
+                    f"{match.group('name')}{match.group('separator')}{getty}{match.group('rest')}"
+                )
+                self.changes.append(f'{tty} getty {old} -> {new}')
+                return True
+        return False
+
+
+class GettyTab(ConfigFile):
+    """
+    Model of /etc/gettytab: termcap-style entries that may continue over
+    several lines with a trailing backslash.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Args:
+            path: Path to the gettytab file, by default /etc/gettytab in the
+                target root
+        """
+        super().__init__(path or Target.path(gettytab_path))
+
+    def _entries(self) -> list:
+        """Return (first line, end line, names, capabilities) of every entry."""
+        entries = []
+        number = 0
+        while number < len(self.lines):
+            line = self.lines[number]
+            if not line.strip() or line.lstrip().startswith('#'):
+                number += 1
+                continue
+            first = number
+            text = line
+            while text.endswith('\\') and number + 1 < len(self.lines):
+                number += 1
+                text = text[:-1] + self.lines[number]
+            fields = [field.strip() for field in text.split(':')]
+            entries.append((first, number + 1, fields[0].split('|'), [field for field in fields[1:] if field]))
+            number += 1
+        return entries
+
+    def entries_for(self, user: str) -> list:
+        """
+        Return the entries named after or logging in a user automatically.
+
+        Args:
+            user: User name
+
+        Returns:
+            list: Primary names of the matching entries
+        """
+        with self._lock:
+            return [
+                names[0] for _, _, names, capabilities in self._entries()
+                if user in names or f'al={user}' in capabilities
+            ]
+
+    def remove_entries_for(self, user: str) -> list:
+        """
+        Remove the entries named after or logging in a user automatically.
+
+        Args:
+            user: User name
+
+        Returns:
+            list: Primary names of the removed entries
+        """
+        removed = []
+        with self._lock:
+            for first, end, names, capabilities in reversed(self._entries()):
+                if user in names or f'al={user}' in capabilities:
+                    del self.lines[first:end]
+                    removed.insert(0, names[0])
+            self.changes.extend(f'removed entry {name}' for name in removed)
+        return removed
@@ -0,0 +1,202 @@
+"""
+Handoff from setup-station to the login screen.
+
+When setup completes, the worker thread requests the handoff and asks the
+GTK main loop to quit. The main thread destroys the window, drops the
+cached catalogs and translations, and replaces the process with a small
+watcher, so the GTK process is gone by the time lightdm starts. The watcher
+starts lightdm, waits for the greeter process and adds the time from the
+handoff request to the greeter, the time-to-greeter, to the setup report.
+It polls with a growing interval so it does not compete with lightdm and
+the greeter for the CPU: lightdm's pidfile is checked without forking, and
+pgrep only runs once lightdm is up.
+
+Run the watcher with: python -m setup_station.handoff REPORT START
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Callable
+
+from setup_station.file_edit import atomic_write
+
+# Process names of the lightdm greeters shipped with GhostBSD
+greeter_names: tuple = ('slick-greeter', 'lightdm-gtk-greeter')
+greeter_timeout: float = 60.0
+"""Seconds the watcher waits for a greeter before giving up."""
+lightdm_pidfile: str = '/var/run/lightdm.pid'
+poll_interval: float = 0.25
+"""First interval between two checks of the watcher; it doubles up to max_poll_interval."""
+max_poll_interval: float = 2.0
+
+
+class Handoff:
+    """
+    Utility class driving the handoff following the utility class pattern.
+
+    Attributes:
+        requested: True once setup completed and the handoff was requested
+        started: Monotonic time of the request
+    """
+    requested: bool = False
+    started: float | None = None
+
+    @classmethod
+    def request(cls) -> None:
+        """Record that setup completed and lightdm should take over."""
+        cls.requested = True
+        cls.started = time.monotonic()
+
+    @classmethod
+    def release_caches(cls) -> None:
+        """
+        Drop the catalogs, translations and memoized lookups.
+        """
+        from setup_station.catalog import CatalogCache
+        from setup_station.data import Translation
+        from setup_station.file_edit import compile_pattern
+        from setup_station.keyboard_catalog import keyboard_catalog
+        from setup_station.timezone_catalog import timezone_catalog
+        from setup_station.validation import valid_shells
+        CatalogCache.clear()
+        Translation.clear()
+        for cached in (compile_pattern, keyboard_catalog, timezone_catalog, valid_shells):
+            cached.cache_clear()
+        gc.collect()
+
+    @classmethod
+    def start_lightdm(cls, report_path: str | None = None) -> None:
+        """
+        Replace this process with the watcher starting lightdm.
+
+        Does not return unless the watcher cannot be started, in which case
+        lightdm is started in the background instead.
+
+        Args:
+            report_path: Setup report receiving the time-to-greeter
+        """
+        from setup_station.commands import CommandRunner
+        from setup_station.profiling import Profiler
+        started = cls.started if cls.started is not None else time.monotonic()
+        command = [sys.executable, '-m', 'setup_station.handoff', report_path or '', repr(started)]
+        # exec does not run the atexit handlers
+        Profiler.print_summary()
+        sys.stdout.flush()
+        sys.stderr.flush()
+        try:
+            CommandRunner.exec(command)
+        except OSError as e:
+            print(f"Warning: Failed to hand off to lightdm, starting it in the background: {e}")
+            CommandRunner.spawn(['service', 'lightdm', 'start'])
+
+
+def lightdm_running(pidfile: str | None = None) -> bool:
+    """
+    Tell whether the process in lightdm's pidfile is running.
+
+    Args:
+        pidfile: Pidfile to read, by default lightdm_pidfile
+
+    Returns:
+        bool: True if the pidfile names a running process
+    """
+    try:
+        with open(pidfile or lightdm_pidfile, 'r') as f:
+            pid = int(f.read().split()[0])
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except (OSError, ValueError, IndexError):
+        return False
+    return True
+
+
+def greeter_running() -> bool:
+    """
+    Tell whether a lightdm greeter process is running.
+
+    Returns:
+        bool: True if a process named after one of greeter_names exists
+    """
+    from setup_station.commands import CommandRunner
+    # One pgrep for every greeter; its pattern is an extended regex
+    command = ['pgrep', '-x', '|'.join(greeter_names)]
+    try:
+        return CommandRunner.run(command, stdout=subprocess.DEVNULL, timeout=5).returncode == 0
+    except (OSError, RuntimeError, subprocess.SubprocessError):
+        return False
+
+
+def wait_for(check: Callable[[], bool], deadline: float) -> bool:
+    """
+    Poll a check with a doubling interval until it passes or time runs out.
+
+    Args:
+        check: Returns True once the awaited state is reached
+        deadline: Monotonic time to give up at
+
+    Returns:
+        bool: True if the check passed before the deadline
+    """
+    interval = poll_interval
+    while not check():
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_poll_interval)
+    return True
+
+
+def watch(report_path: str, started: float) -> int:
+    """
+    Start lightdm, wait for its greeter and record the time-to-greeter.
+
+    Args:
+        report_path: Setup report to update; empty to only print the timing
+        started: Monotonic time of the handoff request
+
+    Returns:
+        int: 0 if lightdm started, 1 otherwise
+    """
+    from setup_station.commands import CommandRunner
+    exec_after = time.monotonic() - started
+    try:
+        status = CommandRunner.run(['service', 'lightdm', 'start'], timeout=greeter_timeout).returncode
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        print(f"Warning: Failed to start lightdm: {e}")
+        status = None
+    lightdm_after = None
+    greeter_after = None
+    if status == 0:
+        deadline = time.monotonic() + greeter_timeout
+        if wait_for(lightdm_running, deadline):
+            lightdm_after = time.monotonic() - started
+            if wait_for(greeter_running, deadline):
+                greeter_after = time.monotonic() - started
+        else:
+            print(f"Warning: lightdm did not write {lightdm_pidfile}, not waiting for the greeter")
+    handoff = {
+        'exec_after': round(exec_after, 6),
+        'lightdm_exit_status': status,
+        'lightdm_after': None if lightdm_after is None else round(lightdm_after, 6),
+        'greeter_after': None if greeter_after is None else round(greeter_after, 6)
+    }
+    if greeter_after is not None:
+        print(f"Time to greeter: {greeter_after:.2f}s")
+    if report_path:
+        try:
+            with open(report_path, 'r') as f:
+                report = json.load(f)
+            report['handoff'] = handoff
+            atomic_write(report_path, json.dumps(report, indent=2) + '\n')
+        except (OSError, ValueError) as e:
+            print(f"Warning: Failed to record time to greeter: {e}")
+    return 0 if status == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(watch(sys.argv[1], float(sys.argv[2])))
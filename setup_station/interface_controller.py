@@ -2,14 +2,16 @@
 Interface Controller Module.
 
 This module provides the main navigation interface and button controls
-for the Setup Station GTK application wizard.
+for the Setup Station GTK application wizard. Page modules are imported
+only when their page is first shown.
 """
+import importlib
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
-from setup_station.setup_system import SetupWindow, SetupProgress
 from setup_station.window import Window
 from setup_station.data import SetupData, get_text
+from setup_station.profiling import Profiler
 
 
 class Button:
@@ -19,15 +21,17 @@ class Button:
     Manages the Back and Next buttons used throughout
     the setup wizard interface.
     """
-    back_button: Gtk.Button = Gtk.Button(label=get_text('Back'))
+    back_button: Gtk.Button | None = None
     """This button is used to go back to the previous page."""
-    next_button: Gtk.Button = Gtk.Button(label=get_text('Next'))
+    next_button: Gtk.Button | None = None
     """This button is used to go to the next page."""
     _box: Gtk.Box | None = None
 
     @classmethod
     def update_button_labels(cls) -> None:
         """Update button labels with current language translations."""
+        if cls._box is None:
+            return
         cls.back_button.set_label(get_text('Back'))
         cls.next_button.set_label(get_text('Next'))
 
@@ -74,6 +78,8 @@ class Button:
             cls._box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, homogeneous=False, spacing=5)
             cls._box.set_halign(Gtk.Align.END)  # Align the entire box to the right
             
+            cls.back_button = Gtk.Button(label=get_text('Back'))
+            cls.next_button = Gtk.Button(label=get_text('Next'))
             cls.back_button.connect("clicked", Interface.back_page)
             cls._box.pack_start(cls.back_button, False, False, 0)
             
@@ -91,17 +97,46 @@ class Interface:
     Manages the GTK Notebook pages and navigation between different
     screens in the setup process including language, keyboard,
     timezone, network setup, and admin user configuration.
+
+    The page class attributes are filled from page_modules the first time
+    each page is shown, unless they were assigned beforehand.
     """
     language = None
     keyboard = None
     timezone = None
     network_setup = None
     add_admin = None
-    page: Gtk.Notebook = Gtk.Notebook()
+    page_modules: dict = {
+        'language': ('setup_station.language', 'Language'),
+        'keyboard': ('setup_station.keyboard', 'Keyboard'),
+        'timezone': ('setup_station.timezone', 'TimeZone'),
+        'network_setup': ('setup_station.network_setup', 'NetworkSetup'),
+        'add_admin': ('setup_station.add_admin', 'AddUser'),
+    }
+    page: Gtk.Notebook | None = None
     nbButton: Gtk.Notebook | None = None
 
+    @classmethod
+    def load_page(cls, name: str):
+        """
+        Return a page class, importing its module on first use.
+
+        Args:
+            name: Page attribute name, one of page_modules
+
+        Returns:
+            The page utility class
+        """
+        page_class = getattr(cls, name)
+        if page_class is None:
+            module_name, class_name = cls.page_modules[name]
+            page_class = getattr(importlib.import_module(module_name), class_name)
+            setattr(cls, name, page_class)
+        return page_class
+
     @classmethod
     def get_interface(cls) -> Gtk.Box:
+        cls.page = Gtk.Notebook()
         interface_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
         interface_box.show()
         interface_box.pack_start(cls.page, True, True, 0)
@@ -112,8 +147,10 @@ class Interface:
         # Create the language page
         language_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
         language_box.show()
-        cls.language.initialize()
-        get_types = cls.language.get_model()
+        with Profiler.phase('page', 'language'):
+            language = cls.load_page('language')
+            language.initialize()
+            get_types = language.get_model()
         language_box.pack_start(get_types, True, True, 0)
         Window.set_title(get_text("GhostBSD Initial Setup"))
         label = Gtk.Label(label=get_text("Language"))
@@ -137,20 +174,39 @@ class Interface:
     def delete(cls, _widget: Gtk.Widget, _event=None) -> None:
         """
         Close the main window and clean up application state.
+
+        Steps staged in the background are rolled back first.
         """
+        from setup_station.speculative import Speculation
+        Speculation.rollback()
         SetupData.reset()
         Gtk.main_quit()
 
+    @classmethod
+    def stage(cls, name: str) -> None:
+        """
+        Stage the step of the page being left, if speculative apply is on.
+
+        Args:
+            name: Step name: 'language', 'keyboard' or 'timezone'
+        """
+        from setup_station.speculative import Speculation
+        if Speculation.enabled:
+            Speculation.stage(name)
+
     @classmethod
     def next_page(cls, _widget: Gtk.Button) -> None:
         """Go to the next window."""
         page = cls.page.get_current_page()
         if page == 0:
+            SetupData.language_code = cls.load_page('language').get_language()
+            cls.stage('language')
             # Check if the keyboard page already exists
             if cls.page.get_n_pages() <= 1:
                 keyboard_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
                 keyboard_box.show()
-                get_keyboard = cls.keyboard.get_model()
+                with Profiler.phase('page', 'keyboard'):
+                    get_keyboard = cls.load_page('keyboard').get_model()
                 keyboard_box.pack_start(get_keyboard, True, True, 0)
                 label = Gtk.Label(label=get_text("Keyboard"))
                 cls.page.insert_page(keyboard_box, label, 1)
@@ -159,11 +215,14 @@ class Interface:
             Button.show_back()
             Button.next_button.set_sensitive(True)
         elif page == 1:
+            cls.load_page('keyboard').save_keyboard_data()
+            cls.stage('keyboard')
             # Check if the timezone page already exists
             if cls.page.get_n_pages() <= 2:
                 timezone_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
                 timezone_box.show()
-                get_timezone = cls.timezone.get_model()
+                with Profiler.phase('page', 'timezone'):
+                    get_timezone = cls.load_page('timezone').get_model()
                 timezone_box.pack_start(get_timezone, True, True, 0)
                 label = Gtk.Label(label=get_text("Time Zone"))
                 cls.page.insert_page(timezone_box, label, 2)
@@ -171,11 +230,13 @@ class Interface:
             Window.show_all()
             Button.next_button.set_sensitive(True)
         elif page == 2:
+            cls.stage('timezone')
             # Check if the network setup page already exists
             if cls.page.get_n_pages() <= 3:
                 network_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
                 network_box.show()
-                get_network = cls.network_setup.get_model()
+                with Profiler.phase('page', 'network_setup'):
+                    get_network = cls.load_page('network_setup').get_model()
                 network_box.pack_start(get_network, True, True, 0)
                 label = Gtk.Label(label=get_text("Network"))
                 cls.page.insert_page(network_box, label, 3)
@@ -187,7 +248,8 @@ class Interface:
             if cls.page.get_n_pages() <= 4:
                 admin_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
                 admin_box.show()
-                get_admin = cls.add_admin.get_model()
+                with Profiler.phase('page', 'add_admin'):
+                    get_admin = cls.load_page('add_admin').get_model()
                 admin_box.pack_start(get_admin, True, True, 0)
                 label = Gtk.Label(label=get_text("Admin User"))
                 cls.page.insert_page(admin_box, label, 4)
@@ -195,11 +257,18 @@ class Interface:
             Window.show_all()
             Button.next_button.set_sensitive(False)
         elif page == 4:
+            # Copy the page entries into SetupData, which the setup pipeline
+            # reads, before leaving the GTK main thread
+            cls.load_page('keyboard').save_keyboard_data()
+            cls.load_page('add_admin').save_user_data()
+
             # Create the Setup Progress page
+            from setup_station.setup_system import SetupWindow, SetupProgress
             install_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
             install_box.show()
-            install = SetupWindow()
-            get_install = install.get_model()
+            with Profiler.phase('page', 'setup'):
+                install = SetupWindow()
+                get_install = install.get_model()
             install_box.pack_start(get_install, True, True, 0)
             label = Gtk.Label(label=get_text("Setup GhostBSD"))
             cls.page.insert_page(install_box, label, 5)
@@ -0,0 +1,168 @@
+"""
+Checkpoint journal for resuming an interrupted setup.
+
+Before the first step runs, the validated answers are committed to
+answers.json (mode 0600) and a new journal is started. The password is never
+written: answers.json only holds its SHA-512 crypt hash, like master.passwd,
+and a resumed setup sets the passwords from that hash with pw -H. Every
+completed step is appended to the journal as one JSON line holding the step
+name and the hash of the answers it applied, and the journal is fsynced.
+When setup completes both files are removed, and so are the files of an
+older journal format, which could hold the password itself.
+
+After a power loss, the next start finds the committed answers, skips the
+wizard and resumes with the first step the journal does not list.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+
+from setup_station.data import Target, journal_dir
+from setup_station.file_edit import atomic_write, fsync_directory
+
+JOURNAL_VERSION: int = 2
+
+
+def answers_hash(values: dict) -> str:
+    """
+    Hash a set of setup values; the password is left out, its crypt hash is
+    not.
+
+    Args:
+        values: SetupData attribute -> value
+
+    Returns:
+        str: Hex SHA-256 digest of the values
+    """
+    hashed = {name: value for name, value in values.items() if name != 'user_password'}
+    return hashlib.sha256(json.dumps(hashed, sort_keys=True).encode()).hexdigest()
+
+
+class SetupJournal:
+    """
+    Committed answers and append-only record of completed steps.
+    """
+
+    def __init__(self, directory: str | None = None) -> None:
+        """
+        Args:
+            directory: Journal directory, by default journal_dir in the
+                target root
+        """
+        self.directory = directory or Target.path(journal_dir)
+        self.answers_path = os.path.join(self.directory, 'answers.json')
+        self.journal_path = os.path.join(self.directory, 'journal.log')
+        self._lock = threading.Lock()
+
+    def pending(self) -> dict | None:
+        """
+        Return the answers committed by an unfinished setup.
+
+        Returns:
+            dict | None: SetupData attribute -> value, with the password
+                hash instead of the password; None if no setup is pending or
+                the answers file is unreadable
+        """
+        try:
+            with open(self.answers_path, 'r') as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable setup answers {self.answers_path}: {e}")
+            return None
+        values = content.get('values')
+        if content.get('version') != JOURNAL_VERSION or not isinstance(values, dict) or values.get('user_password'):
+            print(f"Warning: Removing setup answers {self.answers_path} of an older setup-station")
+            self.finish()
+            return None
+        return values
+
+    def completed(self, values: dict) -> set:
+        """
+        Return the steps the journal lists as completed for these values.
+
+        A torn last line, left by a power loss during an append, is ignored.
+
+        Args:
+            values: SetupData attribute -> value being applied
+
+        Returns:
+            set: Names of the completed steps
+        """
+        digest = answers_hash(values)
+        steps = set()
+        try:
+            with open(self.journal_path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    if entry.get('answers') == digest and 'step' in entry:
+                        steps.add(entry['step'])
+        except FileNotFoundError:
+            pass
+        return steps
+
+    def begin(self, values: dict) -> dict:
+        """
+        Commit the answers and start an empty journal.
+
+        Args:
+            values: SetupData attribute -> value about to be applied
+
+        Returns:
+            dict: The committed values, with the password replaced by its
+                hash; record() and completed() take these
+
+        Raises:
+            OSError: If the journal cannot be written
+            subprocess.SubprocessError: If the password cannot be hashed
+        """
+        from setup_station.system_calls import hash_password
+        committed = dict(values)
+        if committed.get('user_password'):
+            committed['user_password_hash'] = hash_password(committed['user_password'])
+            committed['user_password'] = ''
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        content = {'version': JOURNAL_VERSION, 'values': committed}
+        atomic_write(self.answers_path, json.dumps(content) + '\n', mode=0o600)
+        atomic_write(self.journal_path, '', mode=0o600)
+        return committed
+
+    def record(self, step: str, values: dict) -> None:
+        """
+        Append a completed step to the journal and fsync it.
+
+        Args:
+            step: Name of the completed step
+            values: SetupData attribute -> value the step applied
+
+        Raises:
+            OSError: If the journal cannot be written
+        """
+        line = json.dumps({'step': step, 'answers': answers_hash(values), 'time': time.time()}) + '\n'
+        with self._lock:
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            try:
+                os.write(fd, line.encode())
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def finish(self) -> None:
+        """
+        Remove the committed answers and the journal after a completed setup.
+        """
+        for path in (self.answers_path, self.journal_path):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        try:
+            fsync_directory(self.directory)
+        except OSError:
+            pass
@@ -3,32 +3,17 @@ Keyboard configuration module following the utility class pattern.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk
-from setup_station.system_calls import (
-    keyboard_dictionary,
-    keyboard_models,
-    change_keyboard,
-    set_keyboard
-)
+from gi.repository import Gtk, GLib
+from setup_station.system_calls import change_keyboard
+from setup_station.apply import apply_keyboard
+from setup_station.catalog import CatalogCache
+from setup_station.rc_conf import RcConf
+from setup_station.schemas import SchemaCompiler
 from setup_station.data import (
     SetupData,
-    css_path,
     get_text
 )
 
-kb_dictionary = keyboard_dictionary()
-kbm_dictionary = keyboard_models()
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
-
 
 # This class is for placeholder for entry.
 class PlaceHolderEntry(Gtk.Entry):
@@ -84,7 +69,11 @@ class Keyboard:
     kb_layout: str | None = None
     kb_variant: str | None = None
     kb_model: str | None = None
+    kb_dictionary: dict = {}
+    kbm_dictionary: dict = {}
     treeView: Gtk.TreeView | None = None
+    layout_store: Gtk.TreeStore | None = None
+    model_treeview: Gtk.TreeView | None = None
     model_store: Gtk.TreeStore | None = None
     tree_selection: Gtk.TreeSelection | None = None
 
@@ -118,7 +107,9 @@ class Keyboard:
         model, treeiter = tree_selection.get_selected()
         if treeiter is not None:
             value = model[treeiter][0]
-            kb_lv = kb_dictionary[value]
+            if value not in cls.kb_dictionary:
+                return
+            kb_lv = cls.kb_dictionary[value]
             cls.kb_layout = kb_lv['layout']
             cls.kb_variant = kb_lv['variant']
             try:
@@ -135,7 +126,9 @@ class Keyboard:
         model, treeiter = tree_selection.get_selected()
         if treeiter is not None:
             value = model[treeiter][0]
-            cls.kb_model = kbm_dictionary[value]
+            if value not in cls.kbm_dictionary:
+                return
+            cls.kb_model = cls.kbm_dictionary[value]
             try:
                 change_keyboard(cls.kb_layout, cls.kb_variant, cls.kb_model)
             except RuntimeError as e:
@@ -160,20 +153,20 @@ class Keyboard:
         SetupData.keyboard_model = cls.kb_model or ""
 
     @classmethod
-    def save_keyboard(cls) -> None:
+    def save_keyboard(cls, rc_conf: RcConf | None = None, schemas: SchemaCompiler | None = None) -> None:
         """
         Apply keyboard configuration to the system.
 
+        Args:
+            rc_conf: Optional rc.conf transaction receiving the console keymap
+            schemas: Optional schema compiler deferring glib-compile-schemas
+
         Raises:
             IOError: If file operations fail
             RuntimeError: If keyboard configuration fails
         """
         cls.save_keyboard_data()
-        set_keyboard(
-            SetupData.keyboard_layout,
-            SetupData.keyboard_variant,
-            SetupData.keyboard_model
-        )
+        apply_keyboard(rc_conf, schemas)
 
     @classmethod
     def _initialize_ui(cls) -> None:
@@ -195,14 +188,12 @@ class Keyboard:
         sw = Gtk.ScrolledWindow()
         sw.set_shadow_type(Gtk.ShadowType.ETCHED_IN)
         sw.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        store = Gtk.TreeStore(str)
-        store.append(None, ['English (US)'])
-        store.append(None, ['English (Canada)'])
-        store.append(None, ['French (Canada)'])
-        for line in sorted(kb_dictionary):
-            store.append(None, [line.rstrip()])
+        # Placeholder until the keyboard layout catalog resolves
+        cls.layout_store = Gtk.TreeStore(str)
+        cls.layout_store.append(None, [get_text('Loading...')])
         cls.treeView = Gtk.TreeView()
-        cls.treeView.set_model(store)
+        cls.treeView.set_model(cls.layout_store)
+        cls.treeView.set_sensitive(False)
         cls.treeView.set_rules_hint(True)
         cls.layout_columns(cls.treeView)
         cls.tree_selection = cls.treeView.get_selection()
@@ -216,17 +207,18 @@ class Keyboard:
         sw = Gtk.ScrolledWindow()
         sw.set_shadow_type(Gtk.ShadowType.ETCHED_IN)
         sw.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
+        # Placeholder until the keyboard model catalog resolves
         cls.model_store = Gtk.TreeStore(str)
-        for line in sorted(kbm_dictionary):
-            cls.model_store.append(None, [line.rstrip()])
-        treeview = Gtk.TreeView()
-        treeview.set_model(cls.model_store)
-        treeview.set_rules_hint(True)
-        cls.variant_columns(treeview)
-        tree_selection = treeview.get_selection()
+        cls.model_store.append(None, [get_text('Loading...')])
+        cls.model_treeview = Gtk.TreeView()
+        cls.model_treeview.set_model(cls.model_store)
+        cls.model_treeview.set_sensitive(False)
+        cls.model_treeview.set_rules_hint(True)
+        cls.variant_columns(cls.model_treeview)
+        tree_selection = cls.model_treeview.get_selection()
         tree_selection.set_mode(Gtk.SelectionMode.SINGLE)
         tree_selection.connect("changed", cls.model_selection)
-        sw.add(treeview)
+        sw.add(cls.model_treeview)
         sw.show()
         hbox1.pack_start(sw, True, True, 5)
 
@@ -236,3 +228,44 @@ class Keyboard:
         cls.vbox1.pack_start(vbox3, False, False, 0)
         vbox3.show()
         vbox3.pack_start(PlaceHolderEntry(), True, True, 10)
+
+        CatalogCache.when_ready(
+            'keyboard_layouts',
+            lambda dictionary: GLib.idle_add(cls.populate_layouts, dictionary)
+        )
+        CatalogCache.when_ready(
+            'keyboard_models',
+            lambda dictionary: GLib.idle_add(cls.populate_models, dictionary)
+        )
+
+    @classmethod
+    def populate_layouts(cls, dictionary: dict) -> None:
+        """
+        Replace the placeholder layout list once the catalog resolves.
+
+        Args:
+            dictionary: Keyboard names mapped to layout/variant info
+        """
+        cls.kb_dictionary = dictionary
+        cls.layout_store.clear()
+        cls.layout_store.append(None, ['English (US)'])
+        cls.layout_store.append(None, ['English (Canada)'])
+        cls.layout_store.append(None, ['French (Canada)'])
+        for line in sorted(dictionary):
+            cls.layout_store.append(None, [line.rstrip()])
+        cls.treeView.set_sensitive(True)
+        cls.treeView.set_cursor(0)
+
+    @classmethod
+    def populate_models(cls, dictionary: dict) -> None:
+        """
+        Replace the placeholder model list once the catalog resolves.
+
+        Args:
+            dictionary: Keyboard model names mapped to model codes
+        """
+        cls.kbm_dictionary = dictionary
+        cls.model_store.clear()
+        for line in sorted(dictionary):
+            cls.model_store.append(None, [line.rstrip()])
+        cls.model_treeview.set_sensitive(True)
@@ -0,0 +1,156 @@
+"""
+Native keyboard catalog built from the XKB rules database.
+
+Replaces the pc-sysinstall xkeyboard-layouts, xkeyboard-variants and
+xkeyboard-models queries with a single streaming pass over the rules registry
+(evdev.xml or base.xml), with base.lst as a fallback. The rules directory is
+a parameter so the parser can run against a fixture tree. The layout and
+model catalogs are prefetched on separate workers; a lock makes the second
+one wait for the first parse instead of parsing the rules again.
+"""
+import os
+import threading
+from functools import lru_cache
+from typing import NamedTuple
+from xml.etree.ElementTree import iterparse, ParseError
+
+from setup_station.data import xkb_rules_dir
+
+rules_files: tuple = ('evdev.xml', 'base.xml', 'base.lst')
+_catalog_lock: threading.Lock = threading.Lock()
+
+
+class KeyboardCatalog(NamedTuple):
+    """
+    Parsed keyboard catalog.
+
+    Attributes:
+        layouts: Keyboard names mapped to {'layout': ..., 'variant': ...}
+        variants: Layout codes mapped to lists of their variant codes
+        models: Keyboard model names mapped to model codes
+    """
+    layouts: dict
+    variants: dict
+    models: dict
+
+
+def _add_variant(catalog: KeyboardCatalog, layout: str, variant: str, description: str) -> None:
+    catalog.layouts[description] = {'layout': layout, 'variant': variant}
+    catalog.variants.setdefault(layout, []).append(variant)
+
+
+def _parse_xml(path: str) -> KeyboardCatalog:
+    """
+    Parse an XKB registry XML file in one streaming pass.
+
+    Args:
+        path: Path to evdev.xml or base.xml
+
+    Returns:
+        KeyboardCatalog: Layouts, variants and models from the file
+    """
+    catalog = KeyboardCatalog(layouts={}, variants={}, models={})
+    stack = []
+    layout = None
+    for event, elem in iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            stack.append(elem.tag)
+            continue
+        stack.pop()
+        if elem.tag == 'configItem' and stack:
+            name = (elem.findtext('name') or '').strip()
+            description = (elem.findtext('description') or '').strip()
+            if stack[-1] == 'model':
+                catalog.models[description] = name
+            elif stack[-1] == 'layout':
+                layout = name
+                catalog.layouts[description] = {'layout': name, 'variant': None}
+                catalog.variants.setdefault(name, [])
+            elif stack[-1] == 'variant' and layout is not None:
+                _add_variant(catalog, layout, name, description)
+        elif elem.tag in ('model', 'layout', 'group'):
+            elem.clear()
+    return catalog
+
+
+def _parse_lst(path: str) -> KeyboardCatalog:
+    """
+    Parse an XKB base.lst file.
+
+    Args:
+        path: Path to base.lst
+
+    Returns:
+        KeyboardCatalog: Layouts, variants and models from the file
+    """
+    catalog = KeyboardCatalog(layouts={}, variants={}, models={})
+    section = None
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith('!'):
+                section = line[1:].strip()
+                continue
+            name, _, description = line.strip().partition(' ')
+            description = description.strip()
+            if not name:
+                continue
+            if section == 'model':
+                catalog.models[description] = name
+            elif section == 'layout':
+                catalog.layouts[description] = {'layout': name, 'variant': None}
+                catalog.variants.setdefault(name, [])
+            elif section == 'variant':
+                layout, _, description = description.partition(':')
+                _add_variant(catalog, layout.strip(), name, description.strip())
+    return catalog
+
+
+def keyboard_catalog(rules_dir: str = xkb_rules_dir) -> KeyboardCatalog:
+    """
+    Build the keyboard catalog once per rules directory, whichever threads
+    ask for it at the same time.
+
+    Args:
+        rules_dir: Directory holding the XKB rules files
+
+    Returns:
+        KeyboardCatalog: Layouts, variants and models
+
+    Raises:
+        RuntimeError: If no readable rules file is found
+    """
+    # lru_cache alone lets concurrent misses each parse the rules
+    with _catalog_lock:
+        return _load_catalog(rules_dir)
+
+
+@lru_cache(maxsize=None)
+def _load_catalog(rules_dir: str) -> KeyboardCatalog:
+    """
+    Parse the first usable rules file of a rules directory.
+
+    Args:
+        rules_dir: Directory holding the XKB rules files
+
+    Returns:
+        KeyboardCatalog: Layouts, variants and models
+
+    Raises:
+        RuntimeError: If no readable rules file is found
+    """
+    errors = []
+    for rules_file in rules_files:
+        path = os.path.join(rules_dir, rules_file)
+        if not os.path.exists(path):
+            continue
+        try:
+            if rules_file.endswith('.xml'):
+                return _parse_xml(path)
+            return _parse_lst(path)
+        except (OSError, ParseError) as e:
+            errors.append(f"{path}: {e}")
+    raise RuntimeError(f"No usable XKB rules found in {rules_dir}: {errors}")
+
+
+# Memoized like the other catalogs; Handoff.release_caches() clears it
+keyboard_catalog.cache_clear = _load_catalog.cache_clear
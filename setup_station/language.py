@@ -3,31 +3,16 @@ Language selection module following the utility class pattern.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk
-from setup_station.system_calls import (
-    language_dictionary,
-    localize_system
-)
+from gi.repository import Gtk, GLib
+from setup_station.catalog import CatalogCache
 from setup_station.data import (
     SetupData,
+    Translation,
     gif_logo,
-    css_path,
     get_text
 )
 from setup_station.window import Window
 
-lang_dictionary = language_dictionary()
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
-
 
 class Language:
     """
@@ -45,6 +30,8 @@ class Language:
     # Class variables instead of instance variables
     vbox1: Gtk.Box | None = None
     language: str | None = None
+    lang_dictionary: dict = {}
+    store: Gtk.TreeStore | None = None
     treeview: Gtk.TreeView | None = None
     welcome_text: Gtk.Label | None = None
     language_column_header: Gtk.Label | None = None
@@ -64,7 +51,9 @@ class Language:
         model, treeiter = tree_selection.get_selected()
         if treeiter is not None:
             value = model[treeiter][0]
-            language_code = lang_dictionary[value]
+            if value not in cls.lang_dictionary:
+                return
+            language_code = cls.lang_dictionary[value]
             cls.language = language_code
             SetupData.language = value
             SetupData.language_code = language_code
@@ -75,6 +64,7 @@ class Language:
             os.environ['LANGUAGE'] = language_code
             os.environ['LC_ALL'] = f'{language_code}.UTF-8'
             os.environ['LANG'] = f'{language_code}.UTF-8'
+            Translation.set_language(language_code)
             
             # Update the UI text with new translations
             cls.update_ui_text()
@@ -172,12 +162,13 @@ class Language:
         sw.set_shadow_type(Gtk.ShadowType.ETCHED_IN)
         sw.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
         
-        store = Gtk.TreeStore(str)
-        for line in lang_dictionary:
-            store.append(None, [line])
-            
+        # Placeholder until the language catalog resolves
+        cls.store = Gtk.TreeStore(str)
+        cls.store.append(None, [get_text('Loading...')])
+
         cls.treeview = Gtk.TreeView()
-        cls.treeview.set_model(store)
+        cls.treeview.set_model(cls.store)
+        cls.treeview.set_sensitive(False)
         cls.treeview.set_rules_hint(True)
         cls.treeview.set_headers_visible(False)
         cls.setup_language_columns(cls.treeview)
@@ -204,6 +195,27 @@ class Language:
         main_grid.attach(right_box, 1, 0, 1, 1)
         main_grid.show()
 
+        CatalogCache.when_ready(
+            'languages',
+            lambda dictionary: GLib.idle_add(cls.populate, dictionary)
+        )
+
+    @classmethod
+    def populate(cls, dictionary: dict) -> None:
+        """
+        Replace the placeholder list with the available languages.
+
+        Called on the main loop once the language catalog resolves.
+
+        Args:
+            dictionary: Language names mapped to language codes
+        """
+        cls.lang_dictionary = dictionary
+        cls.store.clear()
+        for line in dictionary:
+            cls.store.append(None, [line])
+        cls.treeview.set_sensitive(True)
+
     @classmethod
     def get_model(cls) -> Gtk.Box:
         """
@@ -240,11 +252,8 @@ class Language:
             IOError: If file operations fail during localization
             ValueError: If language code is invalid
         """
-        language_code = SetupData.language_code or cls.language
-        if not language_code:
-            raise ValueError("No language selected. Please select a language before proceeding.")
-
-        try:
-            localize_system(language_code)
-        except (IOError, ValueError) as e:
-            raise IOError(f"Failed to apply language settings: {e}") from e
\ No newline at end of file
+        if not SetupData.language_code and cls.language:
+            SetupData.language_code = cls.language
+        # The setup backend is only imported once a language is applied
+        from setup_station.apply import apply_language
+        apply_language()
\ No newline at end of file
@@ -3,27 +3,11 @@ Network setup module following the utility class pattern.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk, GLib, GdkPixbuf
+from gi.repository import Gtk, GLib, GdkPixbuf
 import re
 import threading
 from time import sleep
-from NetworkMgr.net_api import (
-    networkdictionary,
-    connectToSsid,
-    delete_ssid_wpa_supplicant_config,
-    nic_status
-)
-from setup_station.data import css_path, get_text
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
+from setup_station.data import get_text
 
 
 class NetworkSetup:
@@ -132,6 +116,7 @@ class NetworkSetup:
 
         Detects network interfaces and creates the interface for wired/wireless setup.
         """
+        from NetworkMgr.net_api import networkdictionary
         cls.network_info = networkdictionary()
         print(cls.network_info)
         cls.vbox1 = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, homogeneous=False, spacing=0)
@@ -281,6 +266,12 @@ class NetworkSetup:
             ssid_info: Tuple containing SSID information
             card: Name of the wireless network interface
         """
+        from NetworkMgr.net_api import (
+            networkdictionary,
+            connectToSsid,
+            delete_ssid_wpa_supplicant_config,
+            nic_status
+        )
         if connectToSsid(ssid, card) is False:
             delete_ssid_wpa_supplicant_config(ssid)
             GLib.idle_add(cls.restart_authentication, ssid_info, card)
@@ -0,0 +1,276 @@
+"""
+The setup pipeline shared by the GTK wizard and unattended runs.
+
+Every step applies values from SetupData, so the pipeline runs the same way
+whether the pages or an answers file filled them in. The values are validated
+by the plan compiler before the first step runs. Nothing here imports gi.
+"""
+import os
+from functools import partial
+from typing import Callable
+
+from setup_station.apply import (
+    apply_language,
+    apply_keyboard,
+    apply_timezone,
+    apply_user_account,
+    apply_passwords,
+    apply_hostname
+)
+from setup_station.data import SetupData, Target, get_text
+from setup_station.journal import SetupJournal
+from setup_station.plan import SetupPlan, compile_plan
+from setup_station.progress import ProgressBus, ProgressEvent, StepHistory
+from setup_station.rc_conf import RcConf
+from setup_station.schemas import SchemaCompiler, schemas_dir
+from setup_station.setup_report import SetupReport
+from setup_station.step_executor import Step, StepExecutor
+from setup_station.system_calls import (
+    admin_user_exists,
+    autologin_removed,
+    enable_lightdm,
+    hostname_applied,
+    keyboard_applied,
+    lightdm_enabled,
+    locale_applied,
+    remove_ghostbsd_autologin,
+    timezone_applied
+)
+
+
+def setup_steps(resuming: bool = False) -> list:
+    """
+    Build the setup pipeline steps.
+
+    Touched files are paths in the target root. The keyboard, hostname and
+    lightdm steps update one shared rc.conf model, which is written once
+    by the final commit step. Schema overrides are compiled once, in their
+    own step, and only if one changed. Every step but the passwords has a
+    probe, so steps already in effect on a configured system are skipped;
+    the passwords are set on every run.
+
+    Args:
+        resuming: True when an interrupted setup is resumed; the schemas are
+            then compiled even if the overrides were already written
+
+    Returns:
+        list: Steps with their requirements and the files they touch
+    """
+    rc_conf = RcConf()
+    schemas = SchemaCompiler()
+    if resuming and os.path.isdir(Target.path(schemas_dir)):
+        schemas.queue(Target.path(schemas_dir))
+    return [
+        Step(
+            'language', get_text("Setting system language"), apply_language,
+            touches=(
+                Target.path('/etc/login.conf'),
+                Target.path('/etc/profile'),
+                Target.path('/usr/share/skel/dot.profile'),
+                Target.path('/usr/local/share/xgreeters')
+            ),
+            probe=lambda: locale_applied(SetupData.language_code)
+        ),
+        Step(
+            'keyboard', get_text("Setting keyboard layout"), partial(apply_keyboard, rc_conf, schemas),
+            touches=(
+                Target.path('/usr/local/etc/X11/xorg.conf.d/00-keyboard.conf'),
+                Target.path(schemas_dir),
+                Target.path('/usr/local/etc/xdg/xfce4/xfconf/xfce-perchannel-xml/keyboard-layout.xml')
+            ),
+            finalized_by=('commit_rc_conf',),
+            probe=lambda: keyboard_applied(
+                SetupData.keyboard_layout,
+                SetupData.keyboard_variant,
+                SetupData.keyboard_model,
+                rc_conf
+            )
+        ),
+        Step(
+            'timezone', get_text("Setting timezone"), apply_timezone,
+            touches=(Target.path('/etc/localtime'),),
+            probe=lambda: timezone_applied(SetupData.timezone)
+        ),
+        Step(
+            'admin_user', get_text("Creating admin user"), apply_user_account,
+            # pw useradd -m copies the skeleton, localized by the language
+            # step, into the new home
+            requires=('language',),
+            touches=(Target.path('/etc/master.passwd'), Target.path('/etc/group')),
+            probe=lambda: admin_user_exists(SetupData.username),
+            cost=3.0
+        ),
+        # No probe: an existing account may hold stale or empty passwords
+        Step(
+            'passwords', get_text("Creating admin user"), apply_passwords,
+            requires=('admin_user',),
+            touches=(Target.path('/etc/master.passwd'),)
+        ),
+        Step(
+            'hostname', get_text("Setting hostname"), partial(apply_hostname, rc_conf),
+            finalized_by=('commit_rc_conf',),
+            probe=lambda: hostname_applied(SetupData.hostname, rc_conf)
+        ),
+        Step(
+            'enable_lightdm', get_text("Enabling display manager"), partial(enable_lightdm, rc_conf),
+            finalized_by=('commit_rc_conf',),
+            probe=lambda: lightdm_enabled(rc_conf)
+        ),
+        # Only drop the live autologin once the admin account can log in
+        Step(
+            'remove_autologin', get_text("Removing system setup autologin"), remove_ghostbsd_autologin,
+            requires=('passwords',),
+            touches=(Target.path('/etc/gettytab'), Target.path('/etc/ttys')),
+            probe=autologin_removed
+        ),
+        Step(
+            'compile_schemas', get_text("Setting keyboard layout"), schemas.compile,
+            requires=('keyboard',),
+            touches=(Target.path(schemas_dir),),
+            probe=lambda: not schemas.pending,
+            cost=2.0
+        ),
+        Step(
+            'commit_rc_conf', get_text("Saving system configuration"), rc_conf.commit,
+            requires=('keyboard', 'hostname', 'enable_lightdm'),
+            touches=(rc_conf.path,),
+            probe=lambda: not rc_conf.changed
+        ),
+    ]
+
+
+def apply_plan(
+        plan: SetupPlan,
+        on_start: Callable[[Step], None] | None = None,
+        on_complete: Callable[[Step, int, int], None] | None = None,
+        journal: SetupJournal | None = None,
+        progress: Callable[[list], ProgressBus] | None = None
+) -> dict:
+    """
+    Run the setup pipeline on the values of a compiled plan.
+
+    With a journal, the plan's values are committed and every completed
+    step is recorded. When the journal already holds the same values, the
+    run resumes: steps completed and made durable by the earlier run are
+    skipped. The journal is cleared once every step completed. Steps whose
+    changes are already in effect are skipped and listed separately.
+
+    Args:
+        plan: Plan returned by compile_plan()
+        on_start: Called with a step when it starts
+        on_complete: Called with a step, the number of completed steps and
+            the total when a step completes
+        journal: Optional checkpoint journal
+        progress: Optional factory building a progress bus for the steps;
+            the bus is started before the first step and closed at the end
+
+    Returns:
+        dict: Step name -> (start, end) monotonic times
+
+    Raises:
+        OSError: If the journal cannot be written
+        Exception: The first exception raised by a step
+    """
+    for name, value in plan.values.items():
+        setattr(SetupData, name, value)
+
+    resuming = journal is not None and journal.pending() == plan.values
+    steps = setup_steps(resuming)
+    completed = set()
+    committed = plan.values
+    if resuming:
+        journaled = journal.completed(plan.values)
+        completed = {
+            step.name for step in steps
+            if step.name in journaled and journaled.issuperset(step.finalized_by)
+        }
+        if completed:
+            print(f"Resuming setup; already completed: {', '.join(sorted(completed))}")
+    elif journal is not None:
+        committed = journal.begin(plan.values)
+
+    bus = progress(steps) if progress else None
+
+    def step_started(step: Step) -> None:
+        if bus is not None:
+            bus.step_started(step)
+        if on_start:
+            on_start(step)
+
+    def step_completed(step: Step, done: int, total: int) -> None:
+        if journal is not None:
+            journal.record(step.name, committed)
+        if bus is not None:
+            bus.step_completed(step, ran=step.name in executor.timings)
+        if on_complete:
+            on_complete(step, done, total)
+
+    executor = StepExecutor(
+        steps,
+        on_start=step_started,
+        on_complete=step_completed,
+        completed=completed
+    )
+    if bus is not None:
+        for step in steps:
+            if step.name in completed:
+                bus.step_completed(step, ran=False)
+        bus.start()
+    try:
+        timings = executor.run()
+    finally:
+        if bus is not None:
+            bus.close()
+    if executor.skipped:
+        print(f"Setup steps already in effect, skipped: {', '.join(sorted(executor.skipped))}")
+    if journal is not None:
+        journal.finish()
+    return timings
+
+
+def run_setup(
+        plan: SetupPlan | None = None,
+        on_start: Callable[[Step], None] | None = None,
+        on_complete: Callable[[Step, int, int], None] | None = None,
+        on_progress: Callable[[ProgressEvent], None] | None = None
+) -> dict:
+    """
+    Apply a setup plan and write the timing report.
+
+    Every value is validated before the first step runs. Progress is kept in
+    the checkpoint journal so an interrupted setup resumes where it stopped.
+    The report is written whether setup succeeded or not, and the durations
+    of a successful run are added to the step history that weighs progress.
+
+    Args:
+        plan: Plan to apply; defaults to a plan compiled from SetupData
+        on_start: Called with a step when it starts
+        on_complete: Called with a step, the number of completed steps and
+            the total when a step completes
+        on_progress: Called with the weighted progress and estimated time
+            left, at most once per progress.frame_budget
+
+    Returns:
+        dict: Step name -> (start, end) monotonic times
+
+    Raises:
+        ValueError: If the setup values are invalid; nothing is changed
+        Exception: The first exception raised by a step
+    """
+    if plan is None:
+        plan = compile_plan()
+    SetupReport.reset()
+
+    def progress(steps: list) -> ProgressBus:
+        bus = ProgressBus(steps)
+        bus.subscribe(on_progress)
+        return bus
+
+    try:
+        timings = apply_plan(plan, on_start, on_complete, SetupJournal(), progress if on_progress else None)
+    finally:
+        SetupReport.write()
+    StepHistory.update(timings)
+    for name, (start, end) in sorted(timings.items(), key=lambda item: item[1][0]):
+        print(f"Setup step {name}: {end - start:.2f}s")
+    return timings
@@ -0,0 +1,216 @@
+"""
+Setup plan compiler.
+
+compile_plan() takes a snapshot of SetupData, runs every validator before
+anything is changed, and lists the file edits, writes, rc.conf updates and
+commands the setup pipeline will perform. The pipeline then applies the
+snapshot held by the plan, so an invalid hostname is reported before the
+language or keyboard are applied. check_answers() validates many answers
+files without touching the system.
+"""
+import shlex
+from typing import NamedTuple
+
+from setup_station.answers import read_answers
+from setup_station.data import SetupData, Target, zoneinfo_dir
+from setup_station.rc_conf import rc_conf_path
+from setup_station.schemas import schemas_dir
+from setup_station.system_calls import (
+    admin_user_commands,
+    autologin_edits,
+    keyboard_config,
+    locale_edits,
+    password_commands
+)
+from setup_station.validation import (
+    validate_admin_user,
+    validate_hostname,
+    validate_keyboard,
+    validate_locale,
+    validate_timezone
+)
+
+# SetupData attributes used by the setup pipeline
+plan_fields: tuple = (
+    'language_code',
+    'keyboard_layout',
+    'keyboard_variant',
+    'keyboard_model',
+    'timezone',
+    'username',
+    'user_fullname',
+    'user_password',
+    'user_password_hash',
+    'user_shell',
+    'user_home_directory',
+    'hostname',
+)
+
+
+class PlanAction(NamedTuple):
+    """
+    One change made by the setup pipeline.
+
+    Attributes:
+        step: Name of the pipeline step making the change
+        kind: 'edit', 'write', 'install', 'rc_conf', 'sethostname' or
+            'command'
+        target: File path, rc.conf variable, hostname or command line
+        detail: Replacement or description, new content, source file or
+            value; empty for hostnames and commands
+    """
+    step: str
+    kind: str
+    target: str
+    detail: str = ''
+
+
+class SetupPlan(NamedTuple):
+    """
+    A validated setup configuration and the changes it makes.
+
+    Attributes:
+        values: SetupData attribute -> value snapshot the pipeline applies
+        actions: PlanAction tuples in pipeline order
+    """
+    values: dict
+    actions: tuple
+
+
+def snapshot() -> dict:
+    """
+    Copy the SetupData values used by the setup pipeline.
+
+    Returns:
+        dict: SetupData attribute -> value
+    """
+    return {name: getattr(SetupData, name) for name in plan_fields}
+
+
+def validate(values: dict) -> list:
+    """
+    Run every validator on a snapshot and collect the errors.
+
+    Args:
+        values: SetupData attribute -> value
+
+    Returns:
+        list: Error messages, empty when the snapshot is valid
+    """
+    checks = (
+        (validate_locale, (values.get('language_code', ''),)),
+        (validate_keyboard, (values.get('keyboard_layout') or 'us', values.get('keyboard_variant'))),
+        (validate_timezone, (values.get('timezone', ''),)),
+        (validate_admin_user, (
+            values.get('username', ''),
+            values.get('user_fullname', ''),
+            values.get('user_password') or values.get('user_password_hash', ''),
+            values.get('user_shell', ''),
+            values.get('user_home_directory', '')
+        )),
+        (validate_hostname, (values.get('hostname', ''),)),
+    )
+    errors = []
+    for validator, args in checks:
+        try:
+            validator(*args)
+        except ValueError as e:
+            errors.append(str(e))
+    return errors
+
+
+def plan_actions(values: dict) -> list:
+    """
+    List the changes the pipeline makes for a validated snapshot.
+
+    Args:
+        values: SetupData attribute -> value
+
+    Returns:
+        list: PlanAction tuples in pipeline order
+    """
+    actions = []
+    for file, pattern, replacement in locale_edits(values['language_code']):
+        actions.append(PlanAction('language', 'edit', file, f'{pattern} -> {replacement}'))
+
+    config = keyboard_config(values['keyboard_layout'], values['keyboard_variant'], values['keyboard_model'])
+    actions.append(PlanAction('keyboard', 'write', *config.xorg_conf))
+    if config.keymap:
+        actions.append(PlanAction('keyboard', 'rc_conf', 'keymap', config.keymap))
+    if config.mate_override:
+        actions.append(PlanAction('keyboard', 'write', *config.mate_override))
+    for file, pattern, replacement in config.xfce_edits:
+        actions.append(PlanAction('keyboard', 'edit', file, f'{pattern} -> {replacement}'))
+
+    actions.append(PlanAction(
+        'timezone', 'install', Target.path('/etc/localtime'),
+        f"{Target.path(zoneinfo_dir)}/{values['timezone']}"
+    ))
+
+    for command in admin_user_commands(
+            values['username'],
+            values['user_fullname'],
+            values['user_shell'],
+            values['user_home_directory']
+    ):
+        actions.append(PlanAction('admin_user', 'command', shlex.join(command)))
+    hashed = not values['user_password'] and bool(values['user_password_hash'])
+    for command in password_commands(values['username'], hashed):
+        actions.append(PlanAction('passwords', 'command', shlex.join(command)))
+    actions.append(PlanAction('hostname', 'rc_conf', 'hostname', values['hostname']))
+    if Target.is_live():
+        actions.append(PlanAction('hostname', 'sethostname', values['hostname']))
+
+    actions.append(PlanAction('enable_lightdm', 'rc_conf', 'lightdm_enable', 'YES'))
+    for file, description in autologin_edits():
+        actions.append(PlanAction('remove_autologin', 'edit', file, description))
+    if config.mate_override:
+        actions.append(PlanAction('compile_schemas', 'command', f'glib-compile-schemas {Target.path(schemas_dir)}'))
+    actions.append(PlanAction('commit_rc_conf', 'write', Target.path(rc_conf_path)))
+    return actions
+
+
+def compile_plan(values: dict | None = None) -> SetupPlan:
+    """
+    Validate a SetupData snapshot and compute its changes.
+
+    Nothing on the system is modified.
+
+    Args:
+        values: SetupData attribute -> value; defaults to a snapshot of
+            SetupData. Only plan_fields are kept.
+
+    Returns:
+        SetupPlan: The validated snapshot and its actions
+
+    Raises:
+        ValueError: With every validation error, if the snapshot is invalid
+    """
+    if values is None:
+        values = snapshot()
+    values = {name: values.get(name) or '' for name in plan_fields}
+    errors = validate(values)
+    if errors:
+        raise ValueError('; '.join(errors))
+    return SetupPlan(values, tuple(plan_actions(values)))
+
+
+def check_answers(paths: list) -> dict:
+    """
+    Validate answers files without touching the system.
+
+    Args:
+        paths: Answers file paths
+
+    Returns:
+        dict: Path -> list of error messages, empty for valid files
+    """
+    results = {}
+    for path in paths:
+        try:
+            values = read_answers(path)
+        except (OSError, ValueError) as e:
+            results[path] = [str(e)]
+            continue
+        results[path] = validate(values)
+    return results
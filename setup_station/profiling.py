@@ -0,0 +1,162 @@
+"""
+Profiling support for setup-station-init.
+
+Profiling is enabled with the --profile[=DIR] command line flag or the
+SETUP_STATION_PROFILE environment variable (set to 1, or to a directory).
+When enabled, module imports, system_calls subprocesses, page construction
+and setup steps are timed and a sorted summary is printed on exit. When a
+directory is given, a cProfile/pstats dump is also written for each phase.
+"""
+import atexit
+import builtins
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+profile_env: str = 'SETUP_STATION_PROFILE'
+
+
+class Profiler:
+    """
+    Utility class collecting phase timings following the utility class pattern.
+
+    Every record is a (category, name, seconds) tuple. Phases can nest and can
+    run on any thread; only one cProfile dump is collected at a time, for the
+    outermost phase that started while no other dump was running.
+    """
+    enabled: bool = False
+    dump_dir: str | None = None
+    records: list = []
+    _lock: threading.Lock = threading.Lock()
+    _dumping: bool = False
+    _original_import = None
+
+    @classmethod
+    def configure(cls, argv: list) -> None:
+        """
+        Enable profiling from the command line or the environment.
+
+        A --profile or --profile=DIR argument is removed from argv.
+
+        Args:
+            argv: Command line arguments, usually sys.argv
+        """
+        value = os.environ.get(profile_env, '')
+        for arg in list(argv[1:]):
+            if arg == '--profile' or arg.startswith('--profile='):
+                value = arg.partition('=')[2] or value or '1'
+                argv.remove(arg)
+        if value and value != '0':
+            cls.enable(None if value == '1' else value)
+
+    @classmethod
+    def enable(cls, dump_dir: str | None = None) -> None:
+        """
+        Start recording phases and module imports.
+
+        Args:
+            dump_dir: Optional directory receiving one .pstats file per phase
+        """
+        if cls.enabled:
+            return
+        cls.enabled = True
+        cls.dump_dir = dump_dir
+        if dump_dir:
+            os.makedirs(dump_dir, exist_ok=True)
+        cls._install_import_hook()
+        atexit.register(cls.print_summary)
+
+    @classmethod
+    @contextmanager
+    def phase(cls, category: str, name: str) -> Iterator[None]:
+        """
+        Time a block of code as one phase.
+
+        Does nothing but yield when profiling is disabled.
+
+        Args:
+            category: Phase category, e.g. 'import', 'subprocess', 'page', 'step'
+            name: Phase name within the category
+        """
+        if not cls.enabled:
+            yield
+            return
+        profile = None
+        if cls.dump_dir:
+            with cls._lock:
+                if not cls._dumping:
+                    cls._dumping = True
+                    profile = cProfile.Profile()
+        start = time.monotonic()
+        if profile is not None:
+            profile.enable()
+        try:
+            yield
+        finally:
+            if profile is not None:
+                profile.disable()
+            cls.records.append((category, name, time.monotonic() - start))
+            if profile is not None:
+                file_name = re.sub(r'[^A-Za-z0-9_.-]+', '_', f'{category}-{name}')
+                profile.dump_stats(os.path.join(cls.dump_dir, f'{file_name}.pstats'))
+                with cls._lock:
+                    cls._dumping = False
+
+    @classmethod
+    def _install_import_hook(cls) -> None:
+        """
+        Wrap builtins.__import__ to time first-time absolute imports.
+
+        Times are inclusive of the nested imports a module triggers.
+        """
+        if cls._original_import is not None:
+            return
+        original = builtins.__import__
+        cls._original_import = original
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            label = None
+            if level == 0 and cls.enabled:
+                module = sys.modules.get(name)
+                if module is None:
+                    label = name
+                elif fromlist and hasattr(module, '__path__') and any(
+                        f'{name}.{item}' not in sys.modules for item in fromlist if item != '*'):
+                    # Submodules pulled in by "from package import name"
+                    label = f"{name}.{','.join(fromlist)}"
+            if label is None:
+                return original(name, globals, locals, fromlist, level)
+            with cls.phase('import', label):
+                return original(name, globals, locals, fromlist, level)
+
+        builtins.__import__ = timed_import
+
+    @classmethod
+    def summary(cls) -> str:
+        """
+        Format the recorded phases as a summary sorted by duration.
+
+        Returns:
+            str: Per-category totals followed by every phase, slowest first
+        """
+        totals = {}
+        for category, _name, seconds in cls.records:
+            totals[category] = totals.get(category, 0.0) + seconds
+        lines = ['Setup Station profile', 'Totals per category:']
+        for category, seconds in sorted(totals.items(), key=lambda item: item[1], reverse=True):
+            lines.append(f'  {seconds * 1000:10.1f} ms  {category}')
+        lines.append('Phases:')
+        for category, name, seconds in sorted(cls.records, key=lambda record: record[2], reverse=True):
+            lines.append(f'  {seconds * 1000:10.1f} ms  {category:<10} {name}')
+        return '\n'.join(lines)
+
+    @classmethod
+    def print_summary(cls) -> None:
+        """Print the summary to stderr."""
+        if cls.records:
+            print(cls.summary(), file=sys.stderr)
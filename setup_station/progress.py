@@ -0,0 +1,296 @@
+"""
+Progress event bus for the setup pipeline.
+
+Steps post start, sub-step and completion events from any thread. Each step
+is weighted by its expected duration, taken from a history of past runs on
+this machine, or from the step's cost when it never ran here. A running
+step without sub-step events advances with its elapsed time, up to
+max_interpolated of its weight, so a long pw useradd -m does not look stuck.
+
+Events only update the bus state. A publisher thread delivers the combined
+fraction, label and estimated time left to the subscribers at most once per
+frame_budget, and only when something visible changed, so a burst of events
+cannot flood the GTK main loop. Nothing here imports gi.
+"""
+import json
+import os
+import threading
+import time
+from functools import partial
+from typing import Callable, NamedTuple
+
+from setup_station.data import cache_dir
+from setup_station.file_edit import atomic_write
+from setup_station.step_executor import Step
+
+HISTORY_VERSION: int = 1
+history_file: str = os.path.join(cache_dir, 'step-timings.json')
+frame_budget: float = 1 / 30
+"""Minimum seconds between two events delivered to the subscribers."""
+max_interpolated: float = 0.9
+"""Share of its weight a running step reaches through elapsed time alone."""
+
+
+class ProgressEvent(NamedTuple):
+    """
+    Overall setup progress delivered to subscribers.
+
+    Attributes:
+        fraction: Weighted share of the work done, 0.0 to 1.0
+        label: Label of the most recently started step
+        eta: Estimated seconds left, None until it can be estimated
+    """
+    fraction: float
+    label: str
+    eta: float | None
+
+
+class StepHistory:
+    """
+    Utility class keeping the expected duration of every step.
+
+    Durations are smoothed over runs with an exponential moving average so
+    one slow run does not dominate the estimate.
+    """
+    smoothing: float = 0.5
+
+    @classmethod
+    def load(cls, path: str = history_file) -> dict:
+        """
+        Read the expected step durations.
+
+        Args:
+            path: History file
+
+        Returns:
+            dict: Step name -> expected seconds; empty if there is no
+                history. Entries that are not a non-negative number are
+                left out, so those steps count as never run.
+        """
+        try:
+            with open(path, 'r') as f:
+                content = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"Warning: Ignoring unreadable step history {path}: {e}")
+            return {}
+        if not isinstance(content, dict) or content.get('version') != HISTORY_VERSION:
+            return {}
+        steps = content.get('steps')
+        if not isinstance(steps, dict):
+            return {}
+        return {name: seconds for name, seconds in steps.items() if valid_seconds(seconds)}
+
+    @classmethod
+    def update(cls, timings: dict, path: str = history_file) -> None:
+        """
+        Fold the durations of a run into the history.
+
+        Args:
+            timings: Step name -> (start, end) monotonic times of the steps
+                that ran
+            path: History file
+        """
+        steps = cls.load(path)
+        for name, (start, end) in timings.items():
+            duration = end - start
+            previous = steps.get(name)
+            steps[name] = round(duration if previous is None else
+                                previous + cls.smoothing * (duration - previous), 6)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            atomic_write(path, json.dumps({'version': HISTORY_VERSION, 'steps': steps}, indent=2) + '\n')
+        except OSError as e:
+            print(f"Warning: Failed to write step history: {e}")
+
+
+class ProgressBus:
+    """
+    Collects step progress and publishes the combined progress.
+
+    Attributes:
+        weights: Step name -> expected seconds
+    """
+    _current: threading.local = threading.local()
+
+    def __init__(self, steps: list, history: dict | None = None) -> None:
+        """
+        Args:
+            steps: Steps of the run
+            history: Step name -> expected seconds, by default
+                StepHistory.load(); steps without history use their cost
+        """
+        if history is None:
+            history = StepHistory.load()
+        self.weights: dict = {}
+        for step in steps:
+            expected = history.get(step.name)
+            self.weights[step.name] = max(expected if valid_seconds(expected) else step.cost, 0.001)
+        self._total = sum(self.weights.values())
+        self._lock = threading.Lock()
+        self._done: dict = {}
+        self._free = 0.0
+        self._running: dict = {}
+        self._reported: dict = {}
+        self._label = ''
+        self._subscribers: list = []
+        self._last: ProgressEvent | None = None
+        self._started = time.monotonic()
+        self._stop = threading.Event()
+        self._publisher: threading.Thread | None = None
+
+    def subscribe(self, callback: Callable[[ProgressEvent], None]) -> None:
+        """
+        Deliver progress events to a callback, on the publisher thread.
+
+        Args:
+            callback: Called with every published ProgressEvent
+        """
+        self._subscribers.append(callback)
+
+    def start(self) -> None:
+        """Start the publisher thread."""
+        self._started = time.monotonic()
+        self._publisher = threading.Thread(target=self._publish_loop, name='progress', daemon=True)
+        self._publisher.start()
+
+    def close(self) -> None:
+        """Stop the publisher and deliver the final progress."""
+        self._stop.set()
+        if self._publisher is not None:
+            self._publisher.join()
+        self._publish()
+
+    def step_started(self, step: Step) -> None:
+        """
+        Mark a step as running; called on the thread running it.
+
+        Args:
+            step: Starting step
+        """
+        ProgressBus._current.bus = self
+        ProgressBus._current.step = step.name
+        with self._lock:
+            self._running[step.name] = time.monotonic()
+            self._label = step.label
+
+    def step_progress(self, name: str, fraction: float, label: str | None = None) -> None:
+        """
+        Record sub-step progress of a running step.
+
+        Args:
+            name: Step name
+            fraction: Share of the step done, 0.0 to 1.0
+            label: Optional text replacing the step label
+        """
+        with self._lock:
+            self._reported[name] = min(max(fraction, self._reported.get(name, 0.0)), 1.0)
+            if label:
+                self._label = label
+
+    def step_completed(self, step: Step, ran: bool = True) -> None:
+        """
+        Mark a step as done, whether it ran, was skipped or was resumed.
+
+        Args:
+            step: Completed step
+            ran: False if the step was skipped or resumed; its weight then
+                does not count towards the speed of this run
+        """
+        with self._lock:
+            self._running.pop(step.name, None)
+            if step.name not in self._done and not ran:
+                self._free += self.weights.get(step.name, 0.0)
+            self._done[step.name] = True
+
+    def snapshot(self) -> ProgressEvent:
+        """
+        Compute the current progress.
+
+        Returns:
+            ProgressEvent: Fraction, label and estimated seconds left
+        """
+        now = time.monotonic()
+        with self._lock:
+            done = 0.0
+            for name, weight in self.weights.items():
+                if name in self._done:
+                    done += weight
+                elif name in self._running:
+                    elapsed = min((now - self._running[name]) / weight, 1.0) * max_interpolated
+                    done += weight * max(self._reported.get(name, 0.0), elapsed)
+            label = self._label
+            free = self._free
+        fraction = min(done / self._total, 1.0)
+        eta = None
+        elapsed = now - self._started
+        if fraction >= 1.0:
+            eta = 0.0
+        elif done > free and elapsed > 0:
+            # Scale the expected remaining work by how fast this run goes
+            eta = (self._total - done) * elapsed / (done - free)
+        return ProgressEvent(fraction, label, eta)
+
+    def _publish(self) -> None:
+        """Deliver the current progress if it visibly changed."""
+        event = self.snapshot()
+        rounded = ProgressEvent(
+            round(event.fraction, 3), event.label, None if event.eta is None else round(event.eta)
+        )
+        if rounded == self._last:
+            return
+        self._last = rounded
+        for callback in self._subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Warning: Progress subscriber failed: {e}")
+
+    def _publish_loop(self) -> None:
+        while not self._stop.wait(frame_budget):
+            self._publish()
+
+
+def valid_seconds(value) -> bool:
+    """
+    Tell whether a history value is a usable duration.
+
+    Args:
+        value: Value read from the history
+
+    Returns:
+        bool: True for a finite, non-negative int or float
+    """
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and 0 <= value < float('inf'))
+
+
+def step_reporter() -> Callable[..., None]:
+    """
+    Return a function reporting sub-step progress of the step running on
+    this thread, for use from other threads such as command workers.
+
+    Returns:
+        Callable: Takes a fraction and an optional label like
+            report_progress(); does nothing outside a watched step
+    """
+    bus = getattr(ProgressBus._current, 'bus', None)
+    if bus is None:
+        return lambda fraction, label=None: None
+    return partial(bus.step_progress, ProgressBus._current.step)
+
+
+def report_progress(fraction: float, label: str | None = None) -> None:
+    """
+    Report sub-step progress of the step running on this thread.
+
+    Does nothing outside a step watched by a ProgressBus.
+
+    Args:
+        fraction: Share of the step done, 0.0 to 1.0
+        label: Optional text replacing the step label
+    """
+    bus = getattr(ProgressBus._current, 'bus', None)
+    if bus is not None:
+        bus.step_progress(ProgressBus._current.step, fraction, label)
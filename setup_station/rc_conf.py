@@ -0,0 +1,135 @@
+"""
+Transactional rc.conf model.
+
+Replaces one sysrc invocation per key with a single in-process model of
+/etc/rc.conf. The file is parsed once with comments and ordering preserved,
+updates from every setup step accumulate in memory, and commit() writes the
+result once through a temporary file, fsync and rename.
+"""
+import os
+import re
+import threading
+
+from setup_station.data import Target
+from setup_station.file_edit import atomic_write, fsync_directory
+from setup_station.progress import report_progress
+
+rc_conf_path: str = '/etc/rc.conf'
+
+_assignment = re.compile(r'^\s*([A-Za-z_][A-Za-z0-9_]*)=(.*)$')
+
+
+def _unquote(value: str) -> str:
+    """
+    Return the value of an rc.conf assignment without quotes or comment.
+
+    Args:
+        value: Text following the '=' sign
+
+    Returns:
+        str: The assigned value
+    """
+    value = value.strip()
+    if value[:1] in ('"', "'"):
+        end = value.find(value[0], 1)
+        return value[1:end] if end != -1 else value[1:]
+    return value.split('#', 1)[0].strip()
+
+
+class RcConf:
+    """
+    In-memory model of an rc.conf file.
+
+    Reads are served from the parsed model, including uncommitted updates.
+    Updates replace the last assignment of a key in place, like sysrc, or
+    are appended at the end of the file for new keys.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Parse the file once.
+
+        Args:
+            path: Path to the rc.conf file, by default rc.conf in the target
+                root; a missing file is treated as empty
+        """
+        self.path = path or Target.path(rc_conf_path)
+        self._lock = threading.Lock()
+        self.changed: set = set()
+        try:
+            with open(self.path, 'r') as f:
+                self.lines = f.read().splitlines()
+        except FileNotFoundError:
+            self.lines = []
+        self.index: dict = {}
+        self.values: dict = {}
+        for number, line in enumerate(self.lines):
+            match = _assignment.match(line)
+            if match:
+                self.index[match.group(1)] = number
+                self.values[match.group(1)] = _unquote(match.group(2))
+
+    def get(self, key: str, default: str | None = None) -> str | None:
+        """
+        Return the current value of a key.
+
+        Args:
+            key: rc.conf variable name
+            default: Value returned when the key is not set
+
+        Returns:
+            str | None: The value, or default
+        """
+        with self._lock:
+            return self.values.get(key, default)
+
+    def set(self, key: str, value: str) -> None:
+        """
+        Update a key in the model; nothing is written until commit().
+
+        Args:
+            key: rc.conf variable name
+            value: New value
+
+        Raises:
+            ValueError: If the key is not a valid variable name or the value
+                contains a double quote or newline
+        """
+        if not re.match(r'^[A-Za-z_][A-Za-z0-9_]*$', key):
+            raise ValueError(f"Invalid rc.conf variable name: '{key}'")
+        if '"' in value or '\n' in value:
+            raise ValueError(f"Invalid rc.conf value for {key}: '{value}'")
+        with self._lock:
+            if self.values.get(key) == value:
+                return
+            line = f'{key}="{value}"'
+            if key in self.index:
+                self.lines[self.index[key]] = line
+            else:
+                self.index[key] = len(self.lines)
+                self.lines.append(line)
+            self.values[key] = value
+            self.changed.add(key)
+
+    def commit(self) -> bool:
+        """
+        Write the accumulated updates atomically in a single write.
+
+        The content goes to a temporary file in the same directory, which is
+        fsynced and renamed over the original, keeping its mode and owner.
+        Progress is reported between the write and the directory fsync.
+
+        Returns:
+            bool: True if the file was written, False if nothing changed
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        with self._lock:
+            if not self.changed:
+                return False
+            atomic_write(self.path, '\n'.join(self.lines) + '\n', sync_directory=False)
+            report_progress(0.5)
+            fsync_directory(os.path.dirname(self.path) or '.')
+            self.changed.clear()
+            return True
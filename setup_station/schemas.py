@@ -0,0 +1,83 @@
+"""
+Deferred, coalesced GSettings schema compilation.
+
+Writing a schema override only queues its directory. compile() then runs
+glib-compile-schemas once per queued directory, no matter how many overrides
+were written, and does nothing when every override was already up to date.
+"""
+import os
+import threading
+import time
+
+from setup_station.commands import CommandRunner
+from setup_station.file_edit import atomic_write
+from setup_station.progress import step_reporter
+
+schemas_dir: str = '/usr/local/share/glib-2.0/schemas'
+
+
+class SchemaCompiler:
+    """
+    Collects schema directories that need compiling.
+
+    Attributes:
+        duration: Seconds spent in the last compile(), None if nothing ran
+    """
+
+    def __init__(self) -> None:
+        self.pending: set = set()
+        self.duration: float | None = None
+        self._lock = threading.Lock()
+
+    def write_override(self, path: str, content: str) -> bool:
+        """
+        Write a schema override and queue its directory if it changed.
+
+        Args:
+            path: Override file path
+            content: Override file content
+
+        Returns:
+            bool: True if the file was written, False if it was already current
+        """
+        try:
+            with open(path, 'r') as f:
+                if f.read() == content:
+                    return False
+        except FileNotFoundError:
+            pass
+        atomic_write(path, content)
+        with self._lock:
+            self.pending.add(os.path.dirname(path))
+        return True
+
+    def queue(self, directory: str) -> None:
+        """
+        Queue a directory for compiling even if no override changed.
+
+        Args:
+            directory: Schema directory
+        """
+        with self._lock:
+            self.pending.add(directory)
+
+    def compile(self) -> None:
+        """
+        Run glib-compile-schemas once for every queued directory, the
+        directories concurrently. Progress is reported as each finishes.
+
+        Raises:
+            subprocess.SubprocessError: If glib-compile-schemas fails or times out
+        """
+        with self._lock:
+            directories, self.pending = sorted(self.pending), set()
+        if not directories:
+            return
+        start = time.monotonic()
+        report = step_reporter()
+        CommandRunner.run_all(
+            [['glib-compile-schemas', directory] for directory in directories],
+            on_complete=lambda done, total: report(done / total),
+            check=True
+        )
+        self.duration = time.monotonic() - start
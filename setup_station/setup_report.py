@@ -0,0 +1,237 @@
+"""
+Machine-readable timing report for the setup pipeline.
+
+Every setup step and every external command run by system_calls is timed
+with a monotonic clock. write() saves the report as JSON in the spool
+directory (report_dir, or the SETUP_STATION_REPORT_DIR environment variable)
+so setup latency can be collected across machines.
+
+Commands are recorded by program and subcommand only; arguments and input,
+which can hold user names and passwords, are never stored. Changes made
+in-process are recorded by file and a short description.
+
+Steps applied ahead of the pipeline by speculative staging are kept in a
+separate staged section, with their own commands and changes. reset() does
+not clear it, so the report of the setup run that follows includes them.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from setup_station.data import report_dir
+from setup_station.file_edit import atomic_write
+
+REPORT_VERSION: int = 1
+report_dir_env: str = 'SETUP_STATION_REPORT_DIR'
+
+
+class SetupReport:
+    """
+    Utility class collecting step and command timings.
+
+    Times are seconds on the monotonic clock, relative to started, the moment
+    the report was reset; started_at gives the matching wall clock time.
+    Staged entries are timed by wall clock, since they usually precede the
+    reset. path is the file last written.
+    """
+    started: float = time.monotonic()
+    started_at: float = time.time()
+    steps: list = []
+    commands: list = []
+    changes: list = []
+    staged: list = []
+    path: str | None = None
+    _lock: threading.Lock = threading.Lock()
+    _current: threading.local = threading.local()
+
+    @classmethod
+    def reset(cls) -> None:
+        """Start a new report."""
+        with cls._lock:
+            cls.started = time.monotonic()
+            cls.started_at = time.time()
+            cls.steps = []
+            cls.commands = []
+            cls.changes = []
+
+    @classmethod
+    @contextmanager
+    def step(cls, name: str) -> Iterator[None]:
+        """
+        Time a setup step; commands run inside it are attributed to it.
+
+        Args:
+            name: Step name
+        """
+        cls._current.step = name
+        start = time.monotonic()
+        status = 'failed'
+        try:
+            yield
+            status = 'ok'
+        finally:
+            cls._current.step = None
+            cls._add(cls.steps, {'step': name, 'status': status}, start)
+
+    @classmethod
+    @contextmanager
+    def staging(cls, name: str) -> Iterator[dict]:
+        """
+        Time a step applied ahead of the pipeline by speculative staging.
+
+        Commands and changes made inside it are kept in its staged entry
+        instead of the report's own lists.
+
+        Args:
+            name: Step name
+
+        Yields:
+            dict: The staged entry; set_staged_status() updates it later,
+                e.g. when the step is rolled back
+        """
+        entry = {'step': name, 'status': 'failed', 'started_at': time.time(), 'commands': [], 'changes': []}
+        cls._current.staged = entry
+        cls._current.step = name
+        start = time.monotonic()
+        try:
+            yield entry
+            entry['status'] = 'ok'
+        finally:
+            cls._current.staged = None
+            cls._current.step = None
+            entry['duration'] = round(time.monotonic() - start, 6)
+            with cls._lock:
+                cls.staged.append(entry)
+
+    @classmethod
+    def set_staged_status(cls, entry: dict, status: str) -> None:
+        """
+        Update the status of a staged entry.
+
+        Args:
+            entry: Entry yielded by staging()
+            status: New status, e.g. 'rolled back'
+        """
+        with cls._lock:
+            entry['status'] = status
+
+    @classmethod
+    def record_not_run(cls, name: str, status: str) -> None:
+        """
+        Record a step that was not run.
+
+        Args:
+            name: Step name
+            status: Why it was not run, e.g. 'blocked' after a failed step
+        """
+        cls._add(cls.steps, {'step': name, 'status': status}, time.monotonic())
+
+    @classmethod
+    def record_command(
+            cls,
+            command: list,
+            start: float,
+            exit_status: int | None,
+            timed_out: bool = False
+    ) -> None:
+        """
+        Record an external command that finished.
+
+        Args:
+            command: Command and arguments; only the first two are kept
+            start: Monotonic start time
+            exit_status: Exit status, or None if the command could not run,
+                timed out or was started without waiting
+            timed_out: True if the command was killed at its timeout
+        """
+        entry = {
+            'step': getattr(cls._current, 'step', None),
+            'command': ' '.join(command[:2]),
+            'exit_status': exit_status,
+            'timed_out': timed_out
+        }
+        cls._add_record('commands', entry, start)
+
+    @classmethod
+    def record_change(cls, target: str, change: str) -> None:
+        """
+        Record a change made in-process instead of by an external command.
+
+        Args:
+            target: Changed file, or setting such as 'hostname'
+            change: What changed, e.g. 'removed entry ghostbsd'
+        """
+        entry = {
+            'step': getattr(cls._current, 'step', None),
+            'target': target,
+            'change': change
+        }
+        cls._add_record('changes', entry, time.monotonic())
+
+    @classmethod
+    def _add_record(cls, kind: str, entry: dict, start: float) -> None:
+        """Add a command or change to the staged step running on this thread, or to the report."""
+        staged = getattr(cls._current, 'staged', None)
+        if staged is None:
+            cls._add(getattr(cls, kind), entry, start)
+            return
+        entry['duration'] = round(time.monotonic() - start, 6)
+        with cls._lock:
+            staged[kind].append(entry)
+
+    @classmethod
+    def _add(cls, records: list, entry: dict, start: float) -> None:
+        end = time.monotonic()
+        entry['start'] = round(start - cls.started, 6)
+        entry['end'] = round(end - cls.started, 6)
+        entry['duration'] = round(end - start, 6)
+        with cls._lock:
+            records.append(entry)
+
+    @classmethod
+    def as_dict(cls) -> dict:
+        """
+        Return the report content.
+
+        Returns:
+            dict: Report version, host, start time, steps, commands,
+                changes and staged steps
+        """
+        with cls._lock:
+            return {
+                'version': REPORT_VERSION,
+                'hostname': socket.gethostname(),
+                'started_at': cls.started_at,
+                'duration': round(time.monotonic() - cls.started, 6),
+                'steps': list(cls.steps),
+                'commands': list(cls.commands),
+                'changes': list(cls.changes),
+                'staged': list(cls.staged)
+            }
+
+    @classmethod
+    def write(cls, directory: str | None = None) -> str | None:
+        """
+        Write the report as JSON to the spool directory.
+
+        Args:
+            directory: Spool directory; defaults to SETUP_STATION_REPORT_DIR
+                or report_dir
+
+        Returns:
+            str | None: Path of the report, None if it could not be written
+        """
+        directory = directory or os.environ.get(report_dir_env) or report_dir
+        path = os.path.join(directory, f'setup-{int(cls.started_at)}.json')
+        try:
+            os.makedirs(directory, exist_ok=True)
+            atomic_write(path, json.dumps(cls.as_dict(), indent=2) + '\n')
+        except OSError as e:
+            print(f"Warning: Failed to write setup report: {e}")
+            return None
+        cls.path = path
+        return path
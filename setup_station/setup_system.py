@@ -1,19 +1,13 @@
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, GLib, Gdk
+from gi.repository import Gtk, GLib
 import threading
-from time import sleep
-from setup_station.data import css_path, gif_logo, get_text
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
+from math import ceil
+from time import monotonic, sleep
+from setup_station.data import gif_logo, get_text, setup_min_display_time
+from setup_station.handoff import Handoff
+from setup_station.pipeline import run_setup
+from setup_station.progress import ProgressEvent
 
 
 def update_progress(progress_bar: Gtk.ProgressBar, fraction: float, text: str) -> None:
@@ -28,71 +22,61 @@ def update_progress(progress_bar: Gtk.ProgressBar, fraction: float, text: str) -
     progress_bar.set_text(text)
 
 
+def close_setup() -> bool:
+    """
+    Destroy the window, drop the caches and quit the main loop.
+
+    Runs on the GTK main thread; setup-station-init then hands over to
+    lightdm.
+
+    :return: False so GLib runs it only once.
+    """
+    from setup_station.window import Window
+    SetupWindow.slide_text = None
+    Window.destroy()
+    Handoff.release_caches()
+    Gtk.main_quit()
+    return False
+
+
 def setup_system(progress_bar: Gtk.ProgressBar) -> None:
     """
     This function is used to set up the system.
+
+    Independent steps run concurrently. The progress bar follows the work
+    weighted by how long each step took on earlier runs, shows the
+    estimated time left, and is redrawn at most once per frame. When setup
+    is done the main loop is asked to close the window and hand over to
+    lightdm.
+
     :param progress_bar: The progress bar to update.
     """
-    from setup_station.language import Language
-    from setup_station.keyboard import Keyboard
-    from setup_station.timezone import TimeZone
-    from setup_station.add_admin import AddAdminUser
-    from setup_station.system_calls import (
-        enable_lightdm,
-        remove_ghostbsd_autologin,
-        start_lightdm
-    )
-
-    # Step 0/6: Setting system language
-    GLib.idle_add(update_progress, progress_bar, 0/6, get_text("Setting system language"))
-    Language.save_language()
-    sleep(1)
-
-    # Step 1/6: Setting keyboard layout
-    GLib.idle_add(update_progress, progress_bar, 1/6, get_text("Setting keyboard layout"))
-    Keyboard.save_keyboard()
-    sleep(1)
-
-    # Step 2/6: Setting timezone
-    GLib.idle_add(update_progress, progress_bar, 2/6, get_text("Setting timezone"))
-    TimeZone.apply_timezone()
-    sleep(1)
-
-    # Step 3/6: Creating admin user
-    GLib.idle_add(update_progress, progress_bar, 3/6, get_text("Creating admin user"))
-    AddAdminUser.save_admin_user()
-    sleep(1)
-
-    # Step 4/6: Enabling display manager
-    GLib.idle_add(update_progress, progress_bar, 4/6, get_text("Enabling display manager"))
-    enable_lightdm()
-    sleep(1)
-
-    # Step 5/6: Removing system setup autologin
-    GLib.idle_add(update_progress, progress_bar, 5/6, get_text("Removing system setup autologin"))
-    remove_ghostbsd_autologin()
-    sleep(1)
-
-    # Step 6/6: Setup complete
-    GLib.idle_add(update_progress, progress_bar, 1, get_text("Setup complete!"))
-    sleep(1)
+    started = monotonic()
 
-    # Update label text before starting lightdm
-    def update_label():
-        SetupWindow.slide_text.set_markup(
-            get_text("Configuration complete.") +
-            "\n\n" +
-            get_text("Starting the login screen...")
-        )
+    def progress_changed(event: ProgressEvent) -> None:
+        text = event.label
+        if event.eta:
+            text = f"{text} ({get_text('about {seconds} s left').format(seconds=ceil(event.eta))})"
+        GLib.idle_add(update_progress, progress_bar, event.fraction, text)
+
+    # Steps staged while the user was on later pages are skipped by the
+    # pipeline once they are finished
+    from setup_station.speculative import Speculation
+    Speculation.settle()
 
-    GLib.idle_add(update_label)
-    sleep(2)
+    # The report is written before lightdm starts, whether setup succeeded or not
+    run_setup(on_progress=progress_changed)
+
+    GLib.idle_add(update_progress, progress_bar, 1, get_text("Setup complete!"))
 
-    # Start lightdm and exit
-    start_lightdm()
+    # Keep the setup screen up for the configured minimum time
+    remaining = setup_min_display_time - (monotonic() - started)
+    if remaining > 0:
+        sleep(remaining)
 
-    import sys
-    sys.exit(0)
+    # The main thread frees the window and starts lightdm
+    Handoff.request()
+    GLib.idle_add(close_setup)
 
 
 class SetupWindow:
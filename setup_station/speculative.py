@@ -0,0 +1,257 @@
+"""
+Speculative background apply of the language, keyboard and timezone steps.
+
+When enabled, leaving the language, keyboard or timezone page stages its
+step on a background worker while the user fills in the later pages. The
+files a staged step changes are saved first, durably, under staging_dir.
+If the user comes back and picks another value, the staged step is
+cancelled when it has not started yet, or rolled back from the saved files
+before the new value is applied. Closing the wizard rolls every staged step
+back. After a crash, recover() restores the files saved for the steps that
+were still staged, so the wizard starts again from the original files.
+
+The final setup pipeline probes every step, so the staged ones are skipped
+and only the admin user, hostname and lightdm steps are left to run. The
+staged steps, their commands and changes are kept in the staged section of
+the setup report. Nothing here imports gi.
+"""
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, NamedTuple
+
+from setup_station.data import SetupData, Target, staging_dir
+from setup_station.file_edit import FileSnapshot
+from setup_station.rc_conf import rc_conf_path
+from setup_station.setup_report import SetupReport
+from setup_station.system_calls import (
+    keyboard_config,
+    locale_edits,
+    localize_system,
+    set_keyboard,
+    set_timezone
+)
+
+
+def keyboard_files(values: dict) -> list:
+    """
+    List the files set_keyboard() changes for a layout.
+
+    Args:
+        values: keyboard_layout, keyboard_variant and keyboard_model
+
+    Returns:
+        list: File paths, including the compiled schemas and rc.conf
+    """
+    config = keyboard_config(values['keyboard_layout'], values['keyboard_variant'], values['keyboard_model'])
+    files = [config.xorg_conf[0], Target.path(rc_conf_path)]
+    if config.mate_override:
+        files.append(config.mate_override[0])
+        files.append(os.path.join(os.path.dirname(config.mate_override[0]), 'gschemas.compiled'))
+    files.extend(file for file, _, _ in config.xfce_edits)
+    return files
+
+
+class StagedStep(NamedTuple):
+    """
+    A step that can be applied ahead of the setup pipeline.
+
+    Attributes:
+        fields: SetupData attributes the step applies
+        apply: Applies the values
+        files: Returns the files the step changes for the values
+    """
+    fields: tuple
+    apply: Callable[[dict], None]
+    files: Callable[[dict], list]
+
+
+staged_steps: dict = {
+    'language': StagedStep(
+        ('language_code',),
+        lambda values: localize_system(values['language_code']),
+        lambda values: [file for file, _, _ in locale_edits(values['language_code'])]
+    ),
+    'keyboard': StagedStep(
+        ('keyboard_layout', 'keyboard_variant', 'keyboard_model'),
+        lambda values: set_keyboard(
+            values['keyboard_layout'],
+            values['keyboard_variant'],
+            values['keyboard_model']
+        ),
+        keyboard_files
+    ),
+    'timezone': StagedStep(
+        ('timezone',),
+        lambda values: set_timezone(values['timezone']),
+        lambda values: [Target.path('/etc/localtime')]
+    ),
+}
+
+
+class Staging:
+    """
+    One staged application of a step.
+
+    Attributes:
+        name: Step name
+        values: SetupData attribute -> value being applied
+        future: Future of the apply job
+        snapshot: Files saved before the step ran, None until then or
+            after a failure
+        report: Staged entry of the setup report, None until the step ran
+    """
+
+    def __init__(self, name: str, values: dict) -> None:
+        self.name = name
+        self.values = values
+        self.future: Future | None = None
+        self.snapshot: FileSnapshot | None = None
+        self.report: dict | None = None
+
+    @property
+    def directory(self) -> str:
+        """Directory keeping the saved files of the step."""
+        return os.path.join(Target.path(staging_dir), self.name)
+
+
+class Speculation:
+    """
+    Utility class staging steps in the background following the utility class
+    pattern.
+
+    Staged steps run one at a time, in the order they were staged, on a
+    single worker so an apply and the rollback it replaces never overlap.
+    """
+    enabled: bool = False
+    staged: dict = {}
+    _executor: ThreadPoolExecutor | None = None
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def stage(cls, name: str) -> None:
+        """
+        Apply a step in the background with the current SetupData values.
+
+        Does nothing when speculation is disabled or the step is already
+        staged with the same values.
+
+        Args:
+            name: Step name, one of staged_steps
+        """
+        if not cls.enabled or not Target.is_live():
+            return
+        step = staged_steps[name]
+        values = {field: getattr(SetupData, field) or '' for field in step.fields}
+        with cls._lock:
+            current = cls.staged.get(name)
+            if current is not None and current.values == values:
+                return
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='speculative')
+            if current is not None and not current.future.cancel():
+                cls._executor.submit(cls._rollback, current)
+            staging = Staging(name, values)
+            staging.future = cls._executor.submit(cls._apply, staging)
+            cls.staged[name] = staging
+
+    @classmethod
+    def _apply(cls, staging: Staging) -> None:
+        """Save the files of a staged step and apply it."""
+        step = staged_steps[staging.name]
+        try:
+            snapshot = FileSnapshot(step.files(staging.values))
+            snapshot.save(staging.directory)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Not staging {staging.name}, its files cannot be saved: {e}")
+            return
+        staging.snapshot = snapshot
+        try:
+            with SetupReport.staging(staging.name) as report:
+                staging.report = report
+                step.apply(staging.values)
+        except Exception as e:
+            # The setup pipeline runs the step again and reports the error
+            print(f"Warning: Staging {staging.name} failed: {e}")
+            cls._rollback(staging)
+
+    @classmethod
+    def _rollback(cls, staging: Staging) -> None:
+        """Restore the files saved before a staged step ran."""
+        snapshot, staging.snapshot = staging.snapshot, None
+        if snapshot is None:
+            return
+        try:
+            snapshot.restore()
+            FileSnapshot.discard(staging.directory)
+        except OSError as e:
+            print(f"Warning: Failed to roll back staged {staging.name}: {e}")
+            return
+        if staging.report is not None and staging.report['status'] == 'ok':
+            SetupReport.set_staged_status(staging.report, 'rolled back')
+
+    @classmethod
+    def settle(cls) -> None:
+        """
+        Wait for the staged steps and keep their changes.
+
+        Called before the setup pipeline runs; the pipeline skips the
+        steps whose changes are in effect. The saved files are dropped.
+        """
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+            cls.staged = {}
+        if executor is None:
+            return
+        executor.shutdown(wait=True)
+        try:
+            FileSnapshot.discard(Target.path(staging_dir))
+        except OSError as e:
+            print(f"Warning: Failed to remove the staged files: {e}")
+
+    @classmethod
+    def rollback(cls) -> None:
+        """
+        Wait for the staged steps and undo them, most recent first.
+
+        Called when the wizard is closed before setup runs.
+        """
+        with cls._lock:
+            executor, cls._executor = cls._executor, None
+            stagings, cls.staged = list(cls.staged.values()), {}
+        if executor is None:
+            return
+        for staging in stagings:
+            staging.future.cancel()
+        executor.shutdown(wait=True)
+        for staging in reversed(stagings):
+            cls._rollback(staging)
+
+    @classmethod
+    def recover(cls) -> list:
+        """
+        Restore the files of steps left staged by a crashed wizard.
+
+        Returns:
+            list: Names of the rolled back steps
+        """
+        root = Target.path(staging_dir)
+        try:
+            names = sorted(os.listdir(root))
+        except FileNotFoundError:
+            return []
+        recovered = []
+        for name in names:
+            directory = os.path.join(root, name)
+            try:
+                snapshot = FileSnapshot.load(directory)
+                # Without a manifest the step never started changing files
+                if snapshot is not None:
+                    snapshot.restore()
+                    recovered.append(name)
+                FileSnapshot.discard(directory)
+            except OSError as e:
+                print(f"Warning: Failed to roll back {name} staged by an interrupted setup: {e}")
+        if recovered:
+            print(f"Rolled back steps staged by an interrupted setup: {', '.join(recovered)}")
+        return recovered
@@ -0,0 +1,174 @@
+"""
+Dependency-aware step executor for the setup pipeline.
+
+Each step declares the steps it requires and the files it touches. Steps whose
+requirements are complete and whose files do not overlap with a running step
+are run concurrently on a worker pool. Completion is reported through
+callbacks so the progress bar follows real work instead of fixed sleeps.
+"""
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple
+
+from setup_station.profiling import Profiler
+from setup_station.setup_report import SetupReport
+
+
+class Step(NamedTuple):
+    """
+    One unit of setup work.
+
+    Attributes:
+        name: Unique step name
+        label: Translated text shown while the step runs
+        action: Callable doing the work
+        requires: Names of the steps that must complete first
+        touches: Files or resources the step modifies
+        finalized_by: Steps that make this step's changes durable, such as
+            the rc.conf commit; a resumed run only skips the step once
+            they completed too
+        probe: Optional check returning True when the step's changes are
+            already in effect; the step is then skipped
+        cost: Expected seconds the step takes, used to weigh progress until
+            its duration on this machine is known
+    """
+    name: str
+    label: str
+    action: Callable[[], None]
+    requires: tuple = ()
+    touches: tuple = ()
+    finalized_by: tuple = ()
+    probe: Callable[[], bool] | None = None
+    cost: float = 0.5
+
+
+class StepExecutor:
+    """
+    Run steps concurrently while honoring requirements and file conflicts.
+
+    Attributes:
+        timings: Step name -> (start, end) monotonic times of completed steps
+        skipped: Names of the steps skipped because their probe reported
+            them already in effect
+    """
+
+    def __init__(
+            self,
+            steps: list,
+            max_workers: int = 4,
+            on_start: Callable[[Step], None] | None = None,
+            on_complete: Callable[[Step, int, int], None] | None = None,
+            completed: set | frozenset = frozenset()
+    ) -> None:
+        """
+        Args:
+            steps: Steps to run
+            max_workers: Maximum number of steps running at once
+            on_start: Called with a step when it starts
+            on_complete: Called with a step, the number of completed steps
+                and the total when a step completes
+            completed: Names of steps already completed by an earlier run;
+                they count as done and are not run again
+
+        Raises:
+            ValueError: If a step name is duplicated or a requirement is unknown
+        """
+        names = [step.name for step in steps]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate step names in {names}")
+        for step in steps:
+            unknown = set(step.requires).difference(names)
+            if unknown:
+                raise ValueError(f"Step '{step.name}' requires unknown steps: {sorted(unknown)}")
+        self.steps = list(steps)
+        self.max_workers = max_workers
+        self.on_start = on_start
+        self.on_complete = on_complete
+        self.completed = set(completed).intersection(names)
+        self.timings: dict = {}
+        self.skipped: set = set()
+
+    def _satisfied(self, step: Step) -> bool:
+        """Return True if the step's probe reports it already in effect."""
+        if step.probe is None:
+            return False
+        try:
+            return bool(step.probe())
+        except Exception as e:
+            print(f"Warning: Probe for step {step.name} failed, running it: {e}")
+            return False
+
+    def _run_step(self, step: Step) -> None:
+        if self._satisfied(step):
+            self.skipped.add(step.name)
+            SetupReport.record_not_run(step.name, 'skipped')
+            return
+        if self.on_start:
+            self.on_start(step)
+        start = time.monotonic()
+        with SetupReport.step(step.name), Profiler.phase('step', step.name):
+            step.action()
+        self.timings[step.name] = (start, time.monotonic())
+
+    def _ready(self, pending: list, done: set, busy: set) -> list:
+        """Return the pending steps that can start now, in declaration order."""
+        ready = []
+        claimed = set(busy)
+        for step in pending:
+            if not set(step.requires).issubset(done):
+                continue
+            if claimed.intersection(step.touches):
+                continue
+            claimed.update(step.touches)
+            ready.append(step)
+        return ready
+
+    def run(self) -> dict:
+        """
+        Run every step.
+
+        Steps whose probe reports them already in effect are not run and
+        are listed in skipped; they still count as completed. When a step
+        fails no further steps are started; the steps already running are
+        allowed to finish and the first error is raised.
+
+        Returns:
+            dict: Step name -> (start, end) monotonic times
+
+        Raises:
+            Exception: The first exception raised by a step
+            RuntimeError: If the requirements contain a cycle
+        """
+        pending = [step for step in self.steps if step.name not in self.completed]
+        done = set(self.completed)
+        for name in sorted(self.completed):
+            SetupReport.record_not_run(name, 'resumed')
+        running = {}
+        error = None
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='setup-step') as pool:
+            while pending or running:
+                if error is None:
+                    busy = {path for step in running.values() for path in step.touches}
+                    for step in self._ready(pending, done, busy)[:self.max_workers - len(running)]:
+                        pending.remove(step)
+                        running[pool.submit(self._run_step, step)] = step
+                if not running:
+                    if error is None:
+                        blocked = [step.name for step in pending]
+                        raise RuntimeError(f"Setup steps cannot be scheduled (dependency cycle): {blocked}")
+                    break
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    step = running.pop(future)
+                    exception = future.exception()
+                    if exception is not None:
+                        error = error or exception
+                        continue
+                    done.add(step.name)
+                    if self.on_complete:
+                        self.on_complete(step, len(done), len(self.steps))
+        if error is not None:
+            for step in pending:
+                SetupReport.record_not_run(step.name, 'blocked')
+            raise error
+        return self.timings
@@ -0,0 +1,80 @@
+"""
+Style Module.
+
+This module owns the single CSS provider used by every Setup Station window.
+The stylesheet is parsed and registered on the screen once, the first time a
+window is realized, instead of once per page module at import time.
+"""
+import gi
+gi.require_version('Gtk', '3.0')
+from gi.repository import Gtk, Gdk
+from setup_station.data import css_path
+
+
+class Style:
+    """
+    Utility class managing the application stylesheet.
+
+    Keeps exactly one Gtk.CssProvider registered on the default screen and
+    counts registrations, so a regression that parses the stylesheet more
+    than once per theme is visible from the registrations metric.
+    """
+    provider: Gtk.CssProvider | None = None
+    theme_path: str = css_path
+    registrations: int = 0
+    """Number of times a provider has been added to the screen."""
+
+    @classmethod
+    def load(cls) -> None:
+        """
+        Parse the stylesheet and register it on the screen if not done yet.
+        """
+        if cls.provider is not None:
+            return
+        provider = Gtk.CssProvider()
+        provider.load_from_path(cls.theme_path)
+        Gtk.StyleContext.add_provider_for_screen(
+            Gdk.Screen.get_default(),
+            provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
+        )
+        cls.provider = provider
+        cls.registrations += 1
+
+    @classmethod
+    def on_realize(cls, _widget: Gtk.Widget) -> None:
+        """
+        Load the stylesheet when the first window is realized.
+
+        Args:
+            _widget: The window being realized
+        """
+        cls.load()
+
+    @classmethod
+    def set_theme(cls, path: str) -> None:
+        """
+        Swap the application stylesheet at runtime.
+
+        The current provider is removed from the screen before the new one is
+        registered, so only one Setup Station provider is ever active.
+
+        Args:
+            path: Path to the CSS file to load
+        """
+        cls.unload()
+        cls.theme_path = path
+        cls.load()
+
+    @classmethod
+    def unload(cls) -> None:
+        """
+        Remove the stylesheet from the screen and drop the provider.
+        """
+        if cls.provider is None:
+            return
+        Gtk.StyleContext.remove_provider_for_screen(
+            Gdk.Screen.get_default(),
+            cls.provider
+        )
+        cls.provider = None
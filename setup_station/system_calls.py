@@ -1,14 +1,59 @@
-import re
+import filecmp
 import os
-from subprocess import run, Popen
+import socket
+from typing import NamedTuple
+
+from setup_station.data import Target, pc_sysinstall, zoneinfo_dir
+from setup_station.keyboard_catalog import keyboard_catalog
+from setup_station.timezone_catalog import timezone_catalog
+from setup_station.validation import (
+    validate_admin_user,
+    validate_hostname,
+    validate_keyboard,
+    validate_locale,
+    validate_timezone
+)
+from setup_station.commands import CommandRunner
+from setup_station.progress import report_progress
+from setup_station.setup_report import SetupReport
+from setup_station.rc_conf import RcConf
+from setup_station.file_edit import (
+    FileEdits,
+    atomic_write,
+    compile_pattern,
+    fsync_directory,
+    install_copy,
+    install_symlink
+)
+from setup_station.handoff import Handoff
+from setup_station.getty import GettyTab, Ttys, gettytab_path, ttys_path
+from setup_station.schemas import SchemaCompiler, schemas_dir
+
+
+def _set_rc_conf(key: str, value: str, rc_conf: RcConf | None) -> None:
+    """
+    Set an rc.conf key in a transaction, or commit it right away without one.
 
-from setup_station.data import pc_sysinstall
+    Args:
+        key: rc.conf variable name
+        value: New value
+        rc_conf: Open transaction, or None to update the target rc.conf directly
+    """
+    if rc_conf is not None:
+        rc_conf.set(key, value)
+        return
+    rc_conf = RcConf()
+    rc_conf.set(key, value)
+    rc_conf.commit()
 
 
 def replace_pattern(current: str, new: str, file: str) -> None:
     """
     Replace pattern in file with proper error handling.
 
+    The file is replaced atomically; use FileEdits directly to batch several
+    edits of the same or related files.
+
     Args:
         current: Pattern to search for (regex)
         new: Replacement string
@@ -18,23 +63,39 @@ def replace_pattern(current: str, new: str, file: str) -> None:
         FileNotFoundError: If file doesn't exist
         IOError: If file operations fail
     """
-    if not os.path.exists(file):
-        raise FileNotFoundError(f"File not found: {file}")
+    edits = FileEdits()
+    edits.add(file, current, new)
+    edits.commit()
 
+
+def _read(path: str) -> str | None:
+    """Return a file's content, or None if it cannot be read."""
     try:
-        # Read file content
-        with open(file, 'r') as f:
-            content = f.read()
+        with open(path, 'r') as f:
+            return f.read()
+    except OSError:
+        return None
 
-        # Apply pattern replacement
-        modified_content = re.sub(current, new, content)
 
-        # Write modified content back
-        with open(file, 'w') as f:
-            f.write(modified_content)
+def edits_applied(edits: list) -> bool:
+    """
+    Tell whether a list of file edits would leave every file unchanged.
 
-    except (IOError, OSError) as e:
-        raise IOError(f"Failed to modify file {file}: {e}") from e
+    Args:
+        edits: (file, pattern, replacement) tuples
+
+    Returns:
+        bool: True if every file exists and no edit changes it
+    """
+    contents = {}
+    for file, pattern, replacement in edits:
+        if file not in contents:
+            contents[file] = _read(file)
+            if contents[file] is None:
+                return False
+        if compile_pattern(pattern).sub(replacement, contents[file]) != contents[file]:
+            return False
+    return True
 
 
 def language_dictionary() -> dict:
@@ -48,7 +109,7 @@ def language_dictionary() -> dict:
         RuntimeError: If pc-sysinstall command fails
     """
     try:
-        result = run(
+        result = CommandRunner.run(
             [pc_sysinstall, 'query-langs'],
             capture_output=True,
             text=True,
@@ -66,6 +127,52 @@ def language_dictionary() -> dict:
     return dictionary
 
 
+def locale_edits(locale: str) -> list:
+    """
+    List the file edits that apply a locale to the target system.
+
+    Args:
+        locale: Locale code (e.g., 'en_US', 'fr_FR')
+
+    Returns:
+        list: (file, pattern, replacement) tuples
+    """
+    slick_greeter = Target.path("/usr/local/share/xgreeters/slick-greeter.desktop")
+    gtk_greeter = Target.path("/usr/local/share/xgreeters/lightdm-gtk-greeter.desktop")
+
+    edits = [
+        (Target.path('/etc/login.conf'), 'lang=C', f'lang={locale}'),
+        (Target.path('/etc/profile'), 'en_US', locale),
+        (Target.path('/usr/share/skel/dot.profile'), 'en_US', locale)
+    ]
+    if os.path.exists(slick_greeter):
+        edits.append((
+            slick_greeter,
+            'Exec=slick-greeter',
+            f'Exec=env LANG={locale}.UTF-8 slick-greeter'
+        ))
+    elif os.path.exists(gtk_greeter):
+        edits.append((
+            gtk_greeter,
+            'Exec=lightdm-gtk-greeter',
+            f'Exec=env LANG={locale}.UTF-8 lightdm-gtk-greeter'
+        ))
+    return edits
+
+
+def locale_applied(locale: str) -> bool:
+    """
+    Tell whether a locale is already applied to the target system.
+
+    Args:
+        locale: Locale code (e.g., 'en_US', 'fr_FR')
+
+    Returns:
+        bool: True if localize_system() would change nothing
+    """
+    return edits_applied(locale_edits(locale))
+
+
 def localize_system(locale: str) -> None:
     """
     Apply locale configuration to the system.
@@ -75,109 +182,43 @@ def localize_system(locale: str) -> None:
 
     Raises:
         IOError: If file operations fail
-        ValueError: If locale is empty
+        ValueError: If locale is empty or invalid
     """
-    if not locale:
-        raise ValueError("Locale cannot be empty")
-
-    slick_greeter = "/usr/local/share/xgreeters/slick-greeter.desktop"
-    gtk_greeter = "/usr/local/share/xgreeters/lightdm-gtk-greeter.desktop"
+    validate_locale(locale)
 
     try:
-        replace_pattern('lang=C', f'lang={locale}', '/etc/login.conf')
-        replace_pattern('en_US', locale, '/etc/profile')
-        replace_pattern('en_US', locale, '/usr/share/skel/dot.profile')
-
-        if os.path.exists(slick_greeter):
-            replace_pattern(
-                'Exec=slick-greeter',
-                f'Exec=env LANG={locale}.UTF-8 slick-greeter',
-                slick_greeter
-            )
-        elif os.path.exists(gtk_greeter):
-            replace_pattern(
-                'Exec=lightdm-gtk-greeter',
-                f'Exec=env LANG={locale}.UTF-8 lightdm-gtk-greeter',
-                gtk_greeter
-            )
+        edits = FileEdits()
+        for file, pattern, replacement in locale_edits(locale):
+            edits.add(file, pattern, replacement)
+        edits.commit()
     except (IOError, OSError, FileNotFoundError) as e:
         raise IOError(f"Failed to localize system with locale '{locale}': {e}") from e
 
 
 def keyboard_dictionary() -> dict:
     """
-    Query available keyboard layouts and variants from pc-sysinstall.
+    Build the available keyboard layouts and variants from the XKB rules.
 
     Returns:
         dict: Dictionary mapping keyboard names to layout/variant info
 
     Raises:
-        RuntimeError: If pc-sysinstall command fails
+        RuntimeError: If no XKB rules file can be read
     """
-    try:
-        # Get keyboard layouts
-        result1 = run(
-            [pc_sysinstall, 'xkeyboard-layouts'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        dictionary = {}
-        for line in result1.stdout.splitlines():
-            keyboard_list = list(filter(None, line.rstrip().split('  ')))
-            kb_name = keyboard_list[1].strip()
-            kb_layouts = keyboard_list[0].strip()
-            kb_variant = None
-            dictionary[kb_name] = {'layout': kb_layouts, 'variant': kb_variant}
-
-        # Get keyboard variants
-        result2 = run(
-            [pc_sysinstall, 'xkeyboard-variants'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        for line in result2.stdout.splitlines():
-            xkb_variant = line.rstrip()
-            kb_name = xkb_variant.partition(':')[2].strip()
-            keyboard_list = list(filter
-                                 (None, xkb_variant.partition(':')[0].split()))
-            kb_layouts = keyboard_list[1].strip()
-            kb_variant = keyboard_list[0].strip()
-            dictionary[kb_name] = {'layout': kb_layouts, 'variant': kb_variant}
-        return dictionary
-    except Exception as e:
-        raise RuntimeError(f"Failed to query keyboard layouts from pc-sysinstall: {e}") from e
+    return keyboard_catalog().layouts
 
 
 def keyboard_models() -> dict:
     """
-    Query available keyboard models from pc-sysinstall.
+    Build the available keyboard models from the XKB rules.
 
     Returns:
         dict: Dictionary mapping keyboard model names to model codes
 
     Raises:
-        RuntimeError: If pc-sysinstall command fails
+        RuntimeError: If no XKB rules file can be read
     """
-    try:
-        result = run(
-            [pc_sysinstall, 'xkeyboard-models'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-
-        dictionary = {}
-        for line in result.stdout.splitlines():
-            kbm_name = line.rstrip().partition(' ')[2]
-            kbm_code = line.rstrip().partition(' ')[0]
-            dictionary[kbm_name] = kbm_code
-        return dictionary
-    except Exception as e:
-        raise RuntimeError(f"Failed to query keyboard models from pc-sysinstall: {e}") from e
+    return keyboard_catalog().models
 
 
 def change_keyboard(kb_layout: str, kb_variant: str = None, kb_model: str = None) -> None:
@@ -194,18 +235,143 @@ def change_keyboard(kb_layout: str, kb_variant: str = None, kb_model: str = None
     """
     try:
         if kb_variant is None and kb_model is not None:
-            run(['setxkbmap', '-layout', kb_layout, '-model', kb_model], check=True)
+            CommandRunner.run(['setxkbmap', '-layout', kb_layout, '-model', kb_model], check=True)
         elif kb_variant is not None and kb_model is None:
-            run(['setxkbmap', '-layout', kb_layout, '-variant', kb_variant], check=True)
+            CommandRunner.run(['setxkbmap', '-layout', kb_layout, '-variant', kb_variant], check=True)
         elif kb_variant is not None and kb_model is not None:
-            run(['setxkbmap', '-layout', kb_layout, '-variant', kb_variant, '-model', kb_model], check=True)
+            CommandRunner.run(['setxkbmap', '-layout', kb_layout, '-variant', kb_variant, '-model', kb_model], check=True)
         else:
-            run(['setxkbmap', '-layout', kb_layout], check=True)
+            CommandRunner.run(['setxkbmap', '-layout', kb_layout], check=True)
     except Exception as e:
         raise RuntimeError(f"Failed to change keyboard layout: {e}") from e
 
 
-def set_keyboard(kb_layout: str = None, kb_variant: str = None, kb_model: str = None) -> None:
+# Map X11 layouts to console keymaps
+console_keymaps: dict = {
+    'ca': 'ca-fr.kbd',
+    'et': 'ee.kbd',
+    'es': 'es.acc.kbd',
+    'gb': 'uk.kbd'
+}
+
+
+class KeyboardConfig(NamedTuple):
+    """
+    Changes that configure a keyboard layout on the target system.
+
+    Attributes:
+        xorg_conf: (path, content) of the xorg.conf.d keyboard section
+        keymap: Console keymap for rc.conf, None to leave it unchanged
+        mate_override: (path, content) of the MATE schema override, None
+            when MATE is not installed
+        xfce_edits: (file, pattern, replacement) edits of the XFCE settings
+    """
+    xorg_conf: tuple
+    keymap: str | None
+    mate_override: tuple | None
+    xfce_edits: list
+
+
+def keyboard_config(kb_layout: str = None, kb_variant: str = None, kb_model: str = None) -> KeyboardConfig:
+    """
+    Compute the files and settings that configure a keyboard layout.
+
+    Args:
+        kb_layout: Keyboard layout code (defaults to 'us')
+        kb_variant: Optional keyboard variant
+        kb_model: Optional keyboard model (defaults to 'pc104')
+
+    Returns:
+        KeyboardConfig: The changes, with paths in the target root
+    """
+    kx_model = kb_model if kb_model else "pc104"
+    kx_layout = kb_layout if kb_layout else "us"
+
+    # X11 keyboard layout via xorg.conf.d
+    # This affects X server, lightdm greeter, and all X sessions
+    xorg_lines = [
+        'Section "InputClass"',
+        '    Identifier "system-keyboard"',
+        '    MatchIsKeyboard "on"',
+        f'    Option "XkbLayout" "{kx_layout}"'
+    ]
+    if kb_variant:
+        xorg_lines.append(f'    Option "XkbVariant" "{kb_variant}"')
+    xorg_lines.append(f'    Option "XkbModel" "{kx_model}"')
+    xorg_lines.append('EndSection')
+    xorg_conf = (
+        Target.path("/usr/local/etc/X11/xorg.conf.d/00-keyboard.conf"),
+        '\n'.join(xorg_lines) + '\n'
+    )
+
+    # Console keyboard layout in rc.conf
+    keymap = console_keymaps.get(kb_layout, f"{kb_layout}.kbd") if kb_layout else None
+
+    # MATE keyboard settings
+    mate_override = None
+    target_schemas_dir = Target.path(schemas_dir)
+    mate_schema = f"{target_schemas_dir}/org.mate.peripherals-keyboard-xkb.gschema.xml"
+    if os.path.exists(mate_schema):
+        override_file = f"{target_schemas_dir}/92_org.mate.peripherals-keyboard-xkb.kbd.gschema.override"
+        option = "grp:alt_shift_toggle"
+
+        override_lines = ["[org.mate.peripherals-keyboard-xkb.kbd]"]
+        if kb_variant:
+            override_lines.append(f"layouts=['{kx_layout}\\t{kb_variant}']")
+        else:
+            override_lines.append(f"layouts=['{kx_layout}']")
+        override_lines.append(f"model='{kx_model}'")
+        override_lines.append(f"options=['{option}']")
+        mate_override = (override_file, '\n'.join(override_lines) + '\n')
+
+    # XFCE keyboard settings
+    xfce_edits = []
+    xfce_kb_xml = Target.path("/usr/local/etc/xdg/xfce4/xfconf/xfce-perchannel-xml/keyboard-layout.xml")
+    if os.path.exists(xfce_kb_xml):
+        xfce_edits.append((xfce_kb_xml, 'value="us"', f'value="{kx_layout}"'))
+        if kb_variant:
+            xfce_edits.append((xfce_kb_xml, 'value=""', f'value="{kb_variant}"'))
+
+    return KeyboardConfig(xorg_conf, keymap, mate_override, xfce_edits)
+
+
+def keyboard_applied(
+        kb_layout: str = None,
+        kb_variant: str = None,
+        kb_model: str = None,
+        rc_conf: RcConf | None = None
+) -> bool:
+    """
+    Tell whether a keyboard configuration is already in effect.
+
+    Args:
+        kb_layout: Keyboard layout code (defaults to 'us')
+        kb_variant: Optional keyboard variant
+        kb_model: Optional keyboard model (defaults to 'pc104')
+        rc_conf: rc.conf model to read the keymap from; defaults to the
+            target rc.conf
+
+    Returns:
+        bool: True if set_keyboard() would change nothing
+    """
+    config = keyboard_config(kb_layout, kb_variant, kb_model)
+    xorg_kbd_conf, xorg_content = config.xorg_conf
+    if _read(xorg_kbd_conf) != xorg_content:
+        return False
+    if config.keymap and (rc_conf or RcConf()).get('keymap') != config.keymap:
+        return False
+    if config.mate_override and _read(config.mate_override[0]) != config.mate_override[1]:
+        return False
+    return edits_applied(config.xfce_edits)
+
+
+def set_keyboard(
+        kb_layout: str = None,
+        kb_variant: str = None,
+        kb_model: str = None,
+        rc_conf: RcConf | None = None,
+        schemas: SchemaCompiler | None = None
+) -> None:
     """
     Persistently configure keyboard layout system-wide.
     Configures X11 via xorg.conf.d, console keymap, and desktop environment
@@ -215,67 +381,41 @@ def set_keyboard(kb_layout: str = None, kb_variant: str = None, kb_model: str =
         kb_layout: Keyboard layout code (defaults to 'us')
         kb_variant: Optional keyboard variant
         kb_model: Optional keyboard model (defaults to 'pc104')
+        rc_conf: rc.conf transaction receiving the console keymap; when None
+            the keymap is written to the target rc.conf immediately
+        schemas: Schema compiler collecting the MATE override; when None the
+            schemas are compiled immediately if the override changed
 
     Raises:
+        ValueError: If the layout or variant is not in the XKB rules
         IOError: If file operations fail
         RuntimeError: If subprocess commands fail
     """
-    kx_model = kb_model if kb_model else "pc104"
-    kx_layout = kb_layout if kb_layout else "us"
+    # Validate against the XKB rules of the configured system, which is the
+    # catalog the keyboard page was built from on a live system
+    validate_keyboard(kb_layout if kb_layout else "us", kb_variant)
+    config = keyboard_config(kb_layout, kb_variant, kb_model)
 
     try:
-        # Configure X11 keyboard layout via xorg.conf.d
-        # This affects X server, lightdm greeter, and all X sessions
-        xorg_kbd_conf = "/usr/local/etc/X11/xorg.conf.d/00-keyboard.conf"
+        xorg_kbd_conf, xorg_content = config.xorg_conf
         os.makedirs(os.path.dirname(xorg_kbd_conf), exist_ok=True)
+        atomic_write(xorg_kbd_conf, xorg_content)
 
-        with open(xorg_kbd_conf, 'w') as f:
-            f.write('Section "InputClass"\n')
-            f.write('    Identifier "system-keyboard"\n')
-            f.write('    MatchIsKeyboard "on"\n')
-            f.write(f'    Option "XkbLayout" "{kx_layout}"\n')
-            if kb_variant:
-                f.write(f'    Option "XkbVariant" "{kb_variant}"\n')
-            f.write(f'    Option "XkbModel" "{kx_model}"\n')
-            f.write('EndSection\n')
-
-        # Set console keyboard layout in rc.conf
-        if kb_layout:
-            # Map X11 layouts to console keymaps
-            console_keymap_map = {
-                'ca': 'ca-fr.kbd',
-                'et': 'ee.kbd',
-                'es': 'es.acc.kbd',
-                'gb': 'uk.kbd'
-            }
-
-            console_keymap = console_keymap_map.get(kb_layout, f"{kb_layout}.kbd")
-            run(['sysrc', f'keymap={console_keymap}'], check=True)
-
-        # Configure MATE keyboard settings
-        mate_schema = "/usr/local/share/glib-2.0/schemas/org.mate.peripherals-keyboard-xkb.gschema.xml"
-        if os.path.exists(mate_schema):
-            override_file = "/usr/local/share/glib-2.0/schemas/92_org.mate.peripherals-keyboard-xkb.kbd.gschema.override"
-            option = "grp:alt_shift_toggle"
-
-            with open(override_file, 'w') as f:
-                f.write("[org.mate.peripherals-keyboard-xkb.kbd]\n")
-                if kb_variant:
-                    f.write(f"layouts=['{kx_layout}\\t{kb_variant}']\n")
-                else:
-                    f.write(f"layouts=['{kx_layout}']\n")
-                f.write(f"model='{kx_model}'\n")
-                f.write(f"options=['{option}']\n")
-
-            # Compile schemas
-            run(['glib-compile-schemas', '/usr/local/share/glib-2.0/schemas/'], check=True)
-
-        # Configure XFCE keyboard settings
-        xfce_kb_xml = "/usr/local/etc/xdg/xfce4/xfconf/xfce-perchannel-xml/keyboard-layout.xml"
-        if os.path.exists(xfce_kb_xml):
-            replace_pattern('value="us"', f'value="{kx_layout}"', xfce_kb_xml)
-            if kb_variant:
-                replace_pattern('value=""', f'value="{kb_variant}"', xfce_kb_xml)
+        if config.keymap:
+            _set_rc_conf('keymap', config.keymap, rc_conf)
+
+        if config.mate_override:
+            # Compilation is deferred to the caller's schema compiler
+            compiler = schemas if schemas is not None else SchemaCompiler()
+            compiler.write_override(*config.mate_override)
+            if schemas is None:
+                compiler.compile()
+
+        if config.xfce_edits:
+            edits = FileEdits()
+            for file, pattern, replacement in config.xfce_edits:
+                edits.add(file, pattern, replacement)
+            edits.commit()
 
     except (IOError, OSError) as e:
         raise IOError(f"Failed to configure keyboard layout: {e}") from e
@@ -285,74 +425,225 @@ def set_keyboard(kb_layout: str = None, kb_variant: str = None, kb_model: str =
 
 def timezone_dictionary() -> dict:
     """
-    Query available timezones from pc-sysinstall.
+    Build the available timezones from the zoneinfo database.
 
     Returns:
-        dict: Dictionary mapping continents to lists of cities
+        dict: Dictionary mapping continents to sorted lists of cities
 
     Raises:
-        RuntimeError: If pc-sysinstall command fails
+        RuntimeError: If no timezone database is found
     """
-    try:
-        result = run(
-            [pc_sysinstall, 'list-tzones'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
+    return timezone_catalog().index
 
-        dictionary = {}
-        for zone in result.stdout.splitlines():
-            zone_list = zone.partition(':')[0].rstrip().split('/')
-            if len(zone_list) < 2:
-                continue
 
-            continent = zone_list[0]
-            city = '/'.join(zone_list[1:])
-            dictionary.setdefault(continent, []).append(city)
-        return dictionary
-    except Exception as e:
-        raise RuntimeError(f"Failed to query timezones from pc-sysinstall: {e}") from e
+def timezone_applied(timezone: str) -> bool:
+    """
+    Tell whether /etc/localtime already holds a timezone.
 
+    Args:
+        timezone: Timezone string (e.g., 'America/New_York')
 
-def set_timezone(timezone: str) -> None:
+    Returns:
+        bool: True if /etc/localtime links to the zoneinfo file or is
+            byte-identical to it
     """
-    Set the system timezone by copying the appropriate zoneinfo file.
+    if not timezone or '..' in timezone or timezone.startswith('/'):
+        return False
+    localtime_path = Target.path("/etc/localtime")
+    # A symbolic link names its target inside the target root
+    if os.path.islink(localtime_path):
+        return os.path.normpath(os.readlink(localtime_path)) == f"{zoneinfo_dir}/{timezone}"
+    try:
+        return filecmp.cmp(f"{Target.path(zoneinfo_dir)}/{timezone}", localtime_path, shallow=False)
+    except OSError:
+        return False
+
+
+def set_timezone(timezone: str, symlink: bool | None = None) -> bool:
+    """
+    Set the system timezone by installing the appropriate zoneinfo file.
+
+    /etc/localtime is replaced atomically, either by a copy of the zoneinfo
+    file or by a symbolic link to it like tzsetup makes.
 
     Args:
         timezone: Timezone string (e.g., 'America/New_York', 'Europe/London')
+        symlink: True for a symbolic link, False for a copy; None
+            keeps the form of the current /etc/localtime
+
+    Returns:
+        bool: True if /etc/localtime changed
 
     Raises:
         ValueError: If timezone is invalid, contains path traversal, or not found
-        RuntimeError: If timezone copy command fails
+        RuntimeError: If /etc/localtime cannot be replaced
     """
-    if not timezone:
-        raise ValueError("Timezone cannot be empty")
+    validate_timezone(timezone)
+
+    zoneinfo_path = f"{Target.path(zoneinfo_dir)}/{timezone}"
+    localtime_path = Target.path("/etc/localtime")
+    # The link target as seen from inside the target root
+    link_target = f"{zoneinfo_dir}/{timezone}"
+    if symlink is None:
+        symlink = os.path.islink(localtime_path)
+
+    try:
+        if os.path.islink(localtime_path) == symlink and timezone_applied(timezone):
+            return False
+        if symlink:
+            install_symlink(link_target, localtime_path)
+            how = 'symlinked'
+        else:
+            install_copy(zoneinfo_path, localtime_path)
+            how = 'copied'
+    except OSError as e:
+        raise RuntimeError(f"Failed to set timezone '{timezone}': {e}") from e
+    SetupReport.record_change(localtime_path, f'{how} {timezone}')
+    return True
 
-    # Validate timezone doesn't contain path traversal or absolute paths
-    if '..' in timezone or timezone.startswith('/'):
-        raise ValueError(f"Invalid timezone: '{timezone}'. Path traversal not allowed.")
 
-    # Validate timezone format (continent/city or continent/region/city)
-    import re
-    if not re.match(r'^[A-Za-z_]+(/[A-Za-z_+-]+)+$', timezone):
-        raise ValueError(f"Invalid timezone format: '{timezone}'. Expected format: Continent/City")
+def _pw() -> list:
+    """Return the pw command for the target root."""
+    # pw -R runs against the password database of the target root
+    return ['pw'] if Target.is_live() else ['pw', '-R', Target.root]
 
-    zoneinfo_path = f"/usr/share/zoneinfo/{timezone}"
-    localtime_path = "/etc/localtime"
 
-    if not os.path.exists(zoneinfo_path):
-        raise ValueError(f"Timezone '{timezone}' not found in /usr/share/zoneinfo/")
+def admin_user_commands(username: str, name: str, shell: str, homedir: str) -> list:
+    """
+    List the pw command that creates the admin user.
 
-    try:
-        run(['cp', zoneinfo_path, localtime_path], check=True)
-    except Exception as e:
-        raise RuntimeError(f"Failed to set timezone '{timezone}': {e}") from e
+    The account is created without a password; password_commands() sets it.
 
+    Args:
+        username: Username for the admin account
+        name: Full name of the user
+        shell: Path to the user's shell
+        homedir: Home directory path
 
-def set_admin_user(username: str, name: str, password: str, shell: str, homedir: str, hostname: str) -> None:
+    Returns:
+        list: Command argument lists, run in order
     """
-    Create admin user and set passwords securely.
+    return [
+        _pw() + [
+            'useradd', username,
+            '-c', name,
+            '-s', shell,
+            '-m',
+            '-d', homedir,
+            '-G', 'wheel,operator'
+        ]
+    ]
+
+
+def password_commands(username: str, hashed: bool = False) -> list:
+    """
+    List the pw commands that set the root and admin user passwords.
+
+    Every command reads the password, or its crypt hash, from stdin.
+
+    Args:
+        username: Username of the admin account
+        hashed: True to set an already hashed password (pw -H)
+
+    Returns:
+        list: Command argument lists, run in order
+    """
+    option = '-H' if hashed else '-h'
+    return [
+        _pw() + ['usermod', '-n', 'root', option, '0'],
+        _pw() + ['usermod', '-n', username, option, '0']
+    ]
+
+
+def admin_user_exists(username: str) -> bool:
+    """
+    Tell whether a user exists in the target password database.
+
+    Args:
+        username: Username to look up
+
+    Returns:
+        bool: True if the user is listed in master.passwd (or passwd)
+    """
+    content = _read(Target.path('/etc/master.passwd'))
+    if content is None:
+        content = _read(Target.path('/etc/passwd')) or ''
+    prefix = f'{username}:'
+    return any(line.startswith(prefix) for line in content.splitlines())
+
+
+def add_admin_user(username: str, name: str, shell: str, homedir: str) -> None:
+    """
+    Create the admin user, without a password.
+
+    Args:
+        username: Username for the admin account
+        name: Full name of the user
+        shell: Path to the user's shell
+        homedir: Home directory path
+
+    Raises:
+        subprocess.SubprocessError: If pw fails or times out
+    """
+    for command in admin_user_commands(username, name, shell, homedir):
+        CommandRunner.run(command, check=True)
+
+
+def set_passwords(username: str, password: str, hashed: bool = False) -> None:
+    """
+    Set the root and admin user passwords.
+
+    Args:
+        username: Username of the admin account
+        password: Password for both root and admin user
+        hashed: True if password is a crypt hash, as made by hash_password()
+
+    Raises:
+        ValueError: If the password is empty
+        subprocess.SubprocessError: If any command fails or times out
+
+    Note: Password is passed via stdin to avoid exposure in process list.
+    """
+    if not password:
+        raise ValueError("Password cannot be empty")
+    commands = password_commands(username, hashed)
+    for number, command in enumerate(commands, 1):
+        CommandRunner.run(command, input=password, text=True, check=True)
+        report_progress(number / len(commands))
+
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with SHA-512 crypt, the format pw -H accepts.
+
+    Args:
+        password: Password to hash
+
+    Returns:
+        str: The crypt hash
+
+    Raises:
+        ValueError: If the password is empty
+        subprocess.SubprocessError: If openssl fails or times out
+    """
+    if not password:
+        raise ValueError("Password cannot be empty")
+    # The password is passed via stdin; only the hash is printed
+    result = CommandRunner.run(
+        ['openssl', 'passwd', '-6', '-stdin'], input=password, capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+def create_admin_user(
+        username: str,
+        name: str,
+        password: str,
+        shell: str,
+        homedir: str
+) -> None:
+    """
+    Create the admin user unless it exists, then set the root and admin passwords.
 
     Args:
         username: Username for the admin account (alphanumeric, underscore, dash)
@@ -360,134 +651,204 @@ def set_admin_user(username: str, name: str, password: str, shell: str, homedir:
         password: Password for both root and admin user
         shell: Path to the user's shell (must exist in /etc/shells)
         homedir: Home directory path (no path traversal)
-        hostname: System hostname (valid hostname format)
 
     Raises:
         ValueError: If input validation fails
-        subprocess.CalledProcessError: If any command fails
+        subprocess.SubprocessError: If any command fails or times out
 
     Note: Password is passed via stdin to avoid exposure in process list.
     """
-    import re
+    validate_admin_user(username, name, password, shell, homedir)
+    if not admin_user_exists(username):
+        add_admin_user(username, name, shell, homedir)
+    set_passwords(username, password)
 
-    # Validate username format (alphanumeric, underscore, dash, starts with letter or underscore)
-    if not username or not re.match(r'^[a-z_][a-z0-9_-]*$', username, re.IGNORECASE):
-        raise ValueError(f"Invalid username format: '{username}'. Must start with letter/underscore and contain only alphanumeric, underscore, or dash.")
 
-    # Validate username length
-    if len(username) > 32:
-        raise ValueError(f"Username too long: '{username}'. Maximum 32 characters.")
+def hostname_applied(hostname: str, rc_conf: RcConf | None = None) -> bool:
+    """
+    Tell whether a hostname is already set.
 
-    # Validate name is not empty
-    if not name or not name.strip():
-        raise ValueError("Full name cannot be empty")
+    Args:
+        hostname: System hostname
+        rc_conf: rc.conf model to read from; defaults to the target rc.conf
 
-    # Validate password is not empty
-    if not password:
-        raise ValueError("Password cannot be empty")
+    Returns:
+        bool: True if rc.conf, and on a live system the running hostname,
+            already match
+    """
+    if (rc_conf or RcConf()).get('hostname') != hostname:
+        return False
+    return not Target.is_live() or socket.gethostname() == hostname
 
-    # Validate shell exists in /etc/shells
-    if shell:
-        try:
-            with open('/etc/shells', 'r') as f:
-                valid_shells = [line.strip() for line in f if line.strip() and not line.startswith('#')]
-            if shell not in valid_shells:
-                raise ValueError(f"Invalid shell: '{shell}'. Must be listed in /etc/shells")
-        except FileNotFoundError:
-            pass  # /etc/shells might not exist, let pw command handle it
-
-    # Validate homedir path (no path traversal)
-    if homedir and ('..' in homedir or not homedir.startswith('/')):
-        raise ValueError(f"Invalid home directory path: '{homedir}'. Must be absolute path without '..'")
-
-    # Validate hostname is not empty
-    if not hostname or not hostname.strip():
-        raise ValueError("Hostname cannot be empty")
-
-    # Validate hostname format (RFC 1123)
-    if not re.match(r'^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?(\.[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?)*$', hostname, re.IGNORECASE):
-        raise ValueError(f"Invalid hostname format: '{hostname}'. Must follow RFC 1123 hostname rules.")
-
-    # Set Root user password (password read from stdin with -h 0)
-    run(
-        ['pw', 'usermod', '-n', 'root', '-h', '0'],
-        input=password,
-        text=True,
-        check=True
-    )
 
-    # Create admin user with password from stdin
-    run(
-        [
-            'pw', 'useradd', username,
-            '-c', name,
-            '-h', '0',
-            '-s', shell,
-            '-m',
-            '-d', homedir,
-            '-G', 'wheel,operator'
-        ],
-        input=password,
-        text=True,
-        check=True
-    )
+def set_hostname(hostname: str, rc_conf: RcConf | None = None) -> None:
+    """
+    Set the system hostname in rc.conf, and on a live system right away.
+
+    Args:
+        hostname: System hostname (valid hostname format)
+        rc_conf: rc.conf transaction receiving the hostname; when None the
+            hostname is written to the target rc.conf immediately
+
+    Raises:
+        ValueError: If the hostname is invalid
+        OSError: If the running hostname cannot be set
+    """
+    validate_hostname(hostname)
+    _set_rc_conf('hostname', hostname, rc_conf)
+    if Target.is_live() and socket.gethostname() != hostname:
+        socket.sethostname(hostname)
+        SetupReport.record_change('hostname', 'set running hostname')
+
+
+def set_admin_user(
+        username: str,
+        name: str,
+        password: str,
+        shell: str,
+        homedir: str,
+        hostname: str,
+        rc_conf: RcConf | None = None
+) -> None:
+    """
+    Create admin user and set passwords securely.
+
+    Args:
+        username: Username for the admin account (alphanumeric, underscore, dash)
+        name: Full name of the user
+        password: Password for both root and admin user
+        shell: Path to the user's shell (must exist in /etc/shells)
+        homedir: Home directory path (no path traversal)
+        hostname: System hostname (valid hostname format)
+        rc_conf: rc.conf transaction receiving the hostname; when None the
+            hostname is written to the target rc.conf immediately
+
+    Raises:
+        ValueError: If input validation fails
+        subprocess.SubprocessError: If any command fails or times out
+        OSError: If the running hostname cannot be set
+
+    Note: Password is passed via stdin to avoid exposure in process list.
+    """
+    validate_hostname(hostname)
+    create_admin_user(username, name, password, shell, homedir)
+    set_hostname(hostname, rc_conf)
 
-    # Set hostname
-    run(['sysrc', f'hostname={hostname}'], check=True)
-    run(['hostname', hostname], check=True)
 
+def lightdm_enabled(rc_conf: RcConf | None = None) -> bool:
+    """
+    Tell whether lightdm is enabled in rc.conf.
+
+    Args:
+        rc_conf: rc.conf model to read from; defaults to the target rc.conf
 
-def enable_lightdm() -> None:
+    Returns:
+        bool: True if lightdm_enable is YES
+    """
+    return (rc_conf or RcConf()).get('lightdm_enable') == 'YES'
+
+
+def enable_lightdm(rc_conf: RcConf | None = None) -> None:
     """
     Enable lightdm display manager in rc.conf.
 
-    This replaces lightdm_enable="NO" with lightdm_enable="YES" in /etc/rc.conf
+    This replaces lightdm_enable="NO" with lightdm_enable="YES" in rc.conf
     to ensure the display manager starts on boot.
 
+    Args:
+        rc_conf: rc.conf transaction to update; when None the target rc.conf
+            is written immediately
+
     Raises:
-        RuntimeError: If sysrc command fails
+        RuntimeError: If rc.conf cannot be updated
     """
     try:
-        run(['sysrc', 'lightdm_enable=YES'], check=True)
+        _set_rc_conf('lightdm_enable', 'YES', rc_conf)
     except Exception as e:
         raise RuntimeError(f"Failed to enable lightdm: {e}") from e
 
 
 def start_lightdm() -> None:
     """
-    Start the lightdm display manager service without waiting.
+    Hand the console over to the lightdm display manager.
 
-    This starts lightdm immediately using Popen, allowing the setup to exit
-    without blocking. Output goes to terminal for debugging.
+    The process is replaced by a small watcher that starts lightdm and
+    records the time-to-greeter in the setup report, so none of our memory
+    is held while the greeter starts. Output goes to terminal for
+    debugging. Only returns if the watcher could not be started; lightdm
+    is then started in the background.
+    """
+    Handoff.start_lightdm(SetupReport.path)
 
-    Raises:
-        OSError: If service executable cannot be found
+
+# Live session user logged in automatically on the console
+live_user: str = 'ghostbsd'
+autologin_tty: str = 'ttyv0'
+
+
+def autologin_edits() -> list:
+    """
+    List the edits that remove the live user autologin.
+
+    Returns:
+        list: (file, description) tuples, applied in order
     """
-    Popen(['service', 'lightdm', 'start'])
+    return [
+        (Target.path(gettytab_path), f'remove entries for {live_user}'),
+        (Target.path(ttys_path), f'{autologin_tty} getty {live_user} -> Pc')
+    ]
 
 
-def remove_ghostbsd_autologin() -> None:
+def autologin_removed() -> bool:
+    """
+    Tell whether the live user autologin is already removed.
+
+    Returns:
+        bool: True if gettytab has no entry for the live user and the
+            console no longer uses it
+    """
+    if not os.path.exists(Target.path(gettytab_path)) or not os.path.exists(Target.path(ttys_path)):
+        return False
+    return not GettyTab().entries_for(live_user) and Ttys().getty_type(autologin_tty) != live_user
+
+
+def remove_ghostbsd_autologin() -> list:
     """
     Remove GhostBSD live user autologin configuration.
 
     This function:
-    1. Removes ghostbsd user references from /etc/gettytab
-    2. Replaces ghostbsd with Pc (standard getty) in /etc/ttys for ttyv0
+    1. Removes the ghostbsd entries from /etc/gettytab
+    2. Switches the ttyv0 getty from ghostbsd to Pc (standard getty) in
+       /etc/ttys
 
     These changes disable the live system's autologin feature and restore
-    normal terminal login behavior.
+    normal terminal login behavior. Both files are replaced atomically.
+
+    Returns:
+        list: Descriptions of the changes made
 
     Raises:
-        IOError: If file operations fail
-        RuntimeError: If sed command fails
+        RuntimeError: If a file cannot be read or written
     """
     try:
-        # Remove ghostbsd entries from /etc/gettytab
-        run(['sed', '-i', '', '/ghostbsd/d', '/etc/gettytab'], check=True)
-
-        # Replace ghostbsd with Pc in /etc/ttys for ttyv0
-        run(['sed', '-i', '', '/ttyv0/s/ghostbsd/Pc/g', '/etc/ttys'], check=True)
-    except Exception as e:
+        for path in (Target.path(gettytab_path), Target.path(ttys_path)):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"File not found: {path}")
+        gettytab = GettyTab()
+        ttys = Ttys()
+        gettytab.remove_entries_for(live_user)
+        ttys.replace_getty_type(autologin_tty, live_user, 'Pc')
+        report_progress(0.25)
+        changes = []
+        for number, config in enumerate((gettytab, ttys), 1):
+            for change in config.commit(sync_directory=False):
+                SetupReport.record_change(config.path, change)
+                changes.append(change)
+            report_progress(0.25 + 0.25 * number)
+        if changes:
+            fsync_directory(os.path.dirname(gettytab.path))
+        return changes
+    except OSError as e:
         raise RuntimeError(f"Failed to remove ghostbsd autologin configuration: {e}") from e
 
 
@@ -3,29 +3,16 @@ Timezone configuration module following the utility class pattern.
 """
 import gi
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk, Gdk
+from gi.repository import Gtk, GLib
 import os
-from setup_station.system_calls import timezone_dictionary
+from setup_station.catalog import CatalogCache
 from setup_station.data import (
     SetupData,
     tmp,
-    css_path,
     get_text
 )
 from setup_station.window import Window
 
-tzdictionary = timezone_dictionary()
-
-cssProvider = Gtk.CssProvider()
-cssProvider.load_from_path(css_path)
-screen = Gdk.Screen.get_default()
-styleContext = Gtk.StyleContext()
-styleContext.add_provider_for_screen(
-    screen,
-    cssProvider,
-    Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
-)
-
 
 class TimeZone:
     """
@@ -44,6 +31,8 @@ class TimeZone:
     vbox1: Gtk.Box | None = None
     continent: str | None = None
     city: str | None = None
+    tzdictionary: dict = {}
+    continent_store: Gtk.TreeStore | None = None
     continenttreeView: Gtk.TreeView | None = None
     citytreeView: Gtk.TreeView | None = None
     city_store: Gtk.TreeStore | None = None
@@ -81,9 +70,11 @@ class TimeZone:
             cls.city_store.clear()
         if treeiter is not None:
             value = model[treeiter][0]
+            if value not in cls.tzdictionary:
+                return
             cls.continent = value
             if cls.city_store:
-                for line in tzdictionary[cls.continent]:
+                for line in cls.tzdictionary[cls.continent]:
                     cls.city_store.append(None, [line])
                 if cls.citytreeView:
                     cls.citytreeView.set_cursor(0)
@@ -108,10 +99,8 @@ class TimeZone:
             ValueError: If no timezone selected or timezone is invalid
             RuntimeError: If timezone configuration fails
         """
-        from setup_station.system_calls import set_timezone
-        if not SetupData.timezone:
-            raise ValueError("No timezone selected. Please select a continent and city.")
-        set_timezone(SetupData.timezone)
+        from setup_station.apply import apply_timezone
+        apply_timezone()
 
     @classmethod
     def _initialize_ui(cls) -> None:
@@ -135,11 +124,12 @@ class TimeZone:
         sw = Gtk.ScrolledWindow()
         sw.set_shadow_type(Gtk.ShadowType.ETCHED_IN)
         sw.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
-        store = Gtk.TreeStore(str)
-        for line in tzdictionary:
-            store.append(None, [line])
-        cls.continenttreeView = Gtk.TreeView(store)
-        cls.continenttreeView.set_model(store)
+        # Placeholder until the timezone catalog resolves
+        cls.continent_store = Gtk.TreeStore(str)
+        cls.continent_store.append(None, [get_text('Loading...')])
+        cls.continenttreeView = Gtk.TreeView(cls.continent_store)
+        cls.continenttreeView.set_model(cls.continent_store)
+        cls.continenttreeView.set_sensitive(False)
         cls.continenttreeView.set_rules_hint(True)
         cls.continent_columns(cls.continenttreeView)
         cls.continenttree_selection = cls.continenttreeView.get_selection()
@@ -165,6 +155,26 @@ class TimeZone:
         sw.show()
         hbox.pack_start(sw, True, True, 5)
 
+        CatalogCache.when_ready(
+            'timezones',
+            lambda dictionary: GLib.idle_add(cls.populate, dictionary)
+        )
+
+    @classmethod
+    def populate(cls, dictionary: dict) -> None:
+        """
+        Replace the placeholder continent list once the catalog resolves.
+
+        Args:
+            dictionary: Continents mapped to lists of cities
+        """
+        cls.tzdictionary = dictionary
+        cls.continent_store.clear()
+        for line in dictionary:
+            cls.continent_store.append(None, [line])
+        cls.continenttreeView.set_sensitive(True)
+        cls.continenttreeView.set_cursor(1)
+
     @classmethod
     def get_model(cls) -> Gtk.Box:
         """Get the main widget for this screen."""
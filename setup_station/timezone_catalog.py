@@ -0,0 +1,109 @@
+"""
+Native timezone catalog built from the zoneinfo database.
+
+Replaces the pc-sysinstall list-tzones query with a single in-process parse of
+zone1970.tab (falling back to zone.tab) and tzdata.zi. It runs anywhere the
+tz database is installed, including Linux build hosts.
+"""
+import os
+from functools import lru_cache
+from typing import NamedTuple
+import zoneinfo
+
+from setup_station.data import zoneinfo_dir
+
+
+class TimezoneCatalog(NamedTuple):
+    """
+    Parsed timezone catalog.
+
+    Attributes:
+        index: Continents mapped to sorted lists of cities, for the UI
+        zones: Every valid timezone name, including links, for validation
+    """
+    index: dict
+    zones: frozenset
+
+
+def _read_tab(path: str) -> list:
+    """
+    Read the timezone names from a zone1970.tab or zone.tab file.
+
+    Args:
+        path: Path to the tab file
+
+    Returns:
+        list: Timezone names in file order
+    """
+    names = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith('#'):
+                continue
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 3:
+                names.append(fields[2])
+    return names
+
+
+def _read_tzdata(path: str) -> set:
+    """
+    Read zone and link names from a tzdata.zi file.
+
+    Args:
+        path: Path to tzdata.zi
+
+    Returns:
+        set: Every zone name ('Z' lines) and link name ('L' lines)
+    """
+    names = set()
+    with open(path, 'r') as f:
+        for line in f:
+            if line.startswith('Z '):
+                names.add(line.split(None, 2)[1])
+            elif line.startswith('L '):
+                names.add(line.split(None, 3)[2])
+    return names
+
+
+@lru_cache(maxsize=None)
+def timezone_catalog(zoneinfo_path: str = zoneinfo_dir) -> TimezoneCatalog:
+    """
+    Build the timezone catalog once per zoneinfo directory.
+
+    Args:
+        zoneinfo_path: Root of the zoneinfo database
+
+    Returns:
+        TimezoneCatalog: Continent/city index and validity set
+
+    Raises:
+        RuntimeError: If no timezone list can be found
+    """
+    tab_names = []
+    for tab in ('zone1970.tab', 'zone.tab'):
+        try:
+            tab_names = _read_tab(os.path.join(zoneinfo_path, tab))
+            break
+        except OSError:
+            continue
+
+    try:
+        zones = _read_tzdata(os.path.join(zoneinfo_path, 'tzdata.zi'))
+    except OSError:
+        zones = set()
+
+    if not tab_names and not zones and zoneinfo_path == zoneinfo_dir:
+        zones = set(zoneinfo.available_timezones())
+    if not tab_names:
+        tab_names = list(zones)
+    if not tab_names:
+        raise RuntimeError(f"No timezone database found in {zoneinfo_path}")
+    zones.update(tab_names)
+
+    index = {}
+    for name in sorted(tab_names):
+        continent, _, city = name.partition('/')
+        if city:
+            index.setdefault(continent, []).append(city)
+    return TimezoneCatalog(index=index, zones=frozenset(zones))
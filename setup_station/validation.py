@@ -0,0 +1,171 @@
+"""
+Validators for the setup answers.
+
+Each validator raises ValueError with a message for the user. They are used
+by system_calls right before a change and by the plan compiler up front. The
+reference data they need (shells, zones, XKB rules) is read once and cached,
+so validating many answer sets costs no extra I/O.
+"""
+import re
+from functools import lru_cache
+
+from setup_station.data import Target, xkb_rules_dir, zoneinfo_dir
+from setup_station.keyboard_catalog import keyboard_catalog
+from setup_station.timezone_catalog import timezone_catalog
+
+_username = re.compile(r'^[a-z_][a-z0-9_-]*$', re.IGNORECASE)
+_hostname = re.compile(
+    r'^[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?(\.[a-z0-9]([a-z0-9-]{0,61}[a-z0-9])?)*$',
+    re.IGNORECASE
+)
+_locale = re.compile(r'^[A-Za-z0-9_.@-]+$')
+
+
+@lru_cache(maxsize=None)
+def valid_shells(shells_path: str) -> frozenset | None:
+    """
+    Read the login shells listed in a shells file.
+
+    Args:
+        shells_path: Path to the shells file, usually /etc/shells
+
+    Returns:
+        frozenset | None: The shells, or None if the file does not exist
+    """
+    try:
+        with open(shells_path, 'r') as f:
+            return frozenset(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    except FileNotFoundError:
+        return None
+
+
+def validate_locale(locale: str) -> None:
+    """
+    Validate a locale code such as 'en_US'.
+
+    Args:
+        locale: Locale code
+
+    Raises:
+        ValueError: If the locale is empty or contains unexpected characters
+    """
+    if not locale:
+        raise ValueError("Locale cannot be empty")
+    if not _locale.match(locale):
+        raise ValueError(f"Invalid locale: '{locale}'")
+
+
+def validate_keyboard(kb_layout: str, kb_variant: str | None = None) -> None:
+    """
+    Validate a keyboard layout and variant against the target XKB rules.
+
+    Nothing is checked when the XKB rules cannot be read.
+
+    Args:
+        kb_layout: Keyboard layout code
+        kb_variant: Optional keyboard variant
+
+    Raises:
+        ValueError: If the layout or variant is not in the XKB rules
+    """
+    try:
+        variants = keyboard_catalog(Target.path(xkb_rules_dir)).variants
+    except RuntimeError:
+        return
+    if kb_layout not in variants:
+        raise ValueError(f"Unknown keyboard layout: '{kb_layout}'")
+    if kb_variant and kb_variant not in variants[kb_layout]:
+        raise ValueError(f"Unknown variant '{kb_variant}' for keyboard layout '{kb_layout}'")
+
+
+def validate_timezone(timezone: str) -> None:
+    """
+    Validate a timezone against the target zoneinfo database.
+
+    Args:
+        timezone: Timezone string (e.g., 'America/New_York')
+
+    Raises:
+        ValueError: If the timezone is empty, contains path traversal, is not
+            in the zoneinfo database, or the database cannot be read
+    """
+    if not timezone:
+        raise ValueError("Timezone cannot be empty")
+
+    # Validate timezone doesn't contain path traversal or absolute paths
+    if '..' in timezone or timezone.startswith('/'):
+        raise ValueError(f"Invalid timezone: '{timezone}'. Path traversal not allowed.")
+
+    target_zoneinfo_dir = Target.path(zoneinfo_dir)
+    try:
+        valid_zones = timezone_catalog(target_zoneinfo_dir).zones
+    except RuntimeError as e:
+        raise ValueError(f"Cannot validate timezone '{timezone}': {e}") from e
+    if timezone not in valid_zones:
+        raise ValueError(f"Timezone '{timezone}' not found in {target_zoneinfo_dir}/")
+
+
+def validate_admin_user(
+        username: str,
+        name: str,
+        password: str,
+        shell: str,
+        homedir: str
+) -> None:
+    """
+    Validate the admin user account.
+
+    Args:
+        username: Username for the admin account (alphanumeric, underscore, dash)
+        name: Full name of the user
+        password: Password for both root and admin user
+        shell: Path to the user's shell (must exist in /etc/shells)
+        homedir: Home directory path (no path traversal)
+
+    Raises:
+        ValueError: If any value is invalid
+    """
+    # Validate username format (alphanumeric, underscore, dash, starts with letter or underscore)
+    if not username or not _username.match(username):
+        raise ValueError(f"Invalid username format: '{username}'. Must start with letter/underscore and contain only alphanumeric, underscore, or dash.")
+
+    # Validate username length
+    if len(username) > 32:
+        raise ValueError(f"Username too long: '{username}'. Maximum 32 characters.")
+
+    # Validate name is not empty
+    if not name or not name.strip():
+        raise ValueError("Full name cannot be empty")
+
+    # Validate password is not empty
+    if not password:
+        raise ValueError("Password cannot be empty")
+
+    # Validate shell exists in /etc/shells; without the file, pw decides
+    if shell:
+        shells = valid_shells(Target.path('/etc/shells'))
+        if shells is not None and shell not in shells:
+            raise ValueError(f"Invalid shell: '{shell}'. Must be listed in /etc/shells")
+
+    # Validate homedir path (no path traversal)
+    if homedir and ('..' in homedir or not homedir.startswith('/')):
+        raise ValueError(f"Invalid home directory path: '{homedir}'. Must be absolute path without '..'")
+
+
+def validate_hostname(hostname: str) -> None:
+    """
+    Validate a hostname.
+
+    Args:
+        hostname: System hostname (valid hostname format)
+
+    Raises:
+        ValueError: If the hostname is empty or not RFC 1123 compliant
+    """
+    # Validate hostname is not empty
+    if not hostname or not hostname.strip():
+        raise ValueError("Hostname cannot be empty")
+
+    # Validate hostname format (RFC 1123)
+    if not _hostname.match(hostname):
+        raise ValueError(f"Invalid hostname format: '{hostname}'. Must follow RFC 1123 hostname rules.")
@@ -7,6 +7,7 @@ a consistent interface for the main application window.
 import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk
+from setup_station.style import Style
 
 
 class Window:
@@ -14,9 +15,11 @@ class Window:
     Singleton wrapper for GTK Window.
     
     Provides a class-based interface to a single GTK Window instance
-    that can be accessed throughout the application.
+    that can be accessed throughout the application. The window is created
+    on first use, and the application stylesheet is loaded when it is first
+    realized.
     """
-    window: Gtk.Window = Gtk.Window()
+    window: Gtk.Window | None = None
 
     @classmethod
     def connect(cls, signal: str, callback) -> int:
@@ -29,7 +32,7 @@ class Window:
         Returns:
             Connection ID
         """
-        return cls.window.connect(signal, callback)
+        return cls.get_window().connect(signal, callback)
     
     @classmethod
     def set_border_width(cls, width: int) -> None:
@@ -38,7 +41,7 @@ class Window:
         Args:
             width: Border width in pixels
         """
-        return cls.window.set_border_width(width)
+        return cls.get_window().set_border_width(width)
     
     @classmethod
     def set_default_size(cls, width: int, height: int) -> None:
@@ -48,7 +51,7 @@ class Window:
             width: Default width in pixels
             height: Default height in pixels
         """
-        return cls.window.set_default_size(width, height)
+        return cls.get_window().set_default_size(width, height)
     
     @classmethod
     def set_size_request(cls, width: int, height: int) -> None:
@@ -58,7 +61,7 @@ class Window:
             width: Requested width in pixels
             height: Requested height in pixels
         """
-        return cls.window.set_size_request(width, height)
+        return cls.get_window().set_size_request(width, height)
     
     @classmethod
     def set_title(cls, title: str) -> None:
@@ -67,7 +70,7 @@ class Window:
         Args:
             title: Window title string
         """
-        return cls.window.set_title(title)
+        return cls.get_window().set_title(title)
     
     @classmethod
     def set_icon_from_file(cls, filename: str) -> None:
@@ -76,7 +79,7 @@ class Window:
         Args:
             filename: Path to icon file
         """
-        return cls.window.set_icon_from_file(filename)
+        return cls.get_window().set_icon_from_file(filename)
     
     @classmethod
     def add(cls, widget: Gtk.Widget) -> None:
@@ -85,18 +88,28 @@ class Window:
         Args:
             widget: Widget to add
         """
-        return cls.window.add(widget)
+        return cls.get_window().add(widget)
     
     @classmethod
     def show_all(cls) -> None:
         """Show the window and all its children."""
-        return cls.window.show_all()
+        return cls.get_window().show_all()
     
+    @classmethod
+    def destroy(cls) -> None:
+        """Destroy the window and every widget in it."""
+        if cls.window is not None:
+            cls.window.destroy()
+            cls.window = None
+
     @classmethod
     def get_window(cls) -> Gtk.Window:
-        """Get the underlying GTK Window instance.
+        """Get the underlying GTK Window instance, creating it on first use.
         
         Returns:
             The GTK Window instance
         """
+        if cls.window is None:
+            cls.window = Gtk.Window()
+            cls.window.connect("realize", Style.on_realize)
         return cls.window
\ No newline at end of file
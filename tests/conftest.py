@@ -0,0 +1,88 @@
+"""
+Shared fixtures.
+"""
+import os
+
+import pytest
+
+from setup_station.commands import CommandRunner
+from setup_station.data import SetupData, Target
+from setup_station.setup_report import SetupReport
+
+# Path below the root -> content of the files of a freshly installed system
+root_files: dict = {
+    'etc/rc.conf': 'hostname="livecd"\n',
+    'etc/shells': '/bin/sh\n/usr/local/bin/zsh\n',
+    'etc/login.conf': 'default:\\\n\t:lang=C:\\\n\t:charset=UTF-8:\n',
+    'etc/profile': 'LANG=en_US.UTF-8; export LANG\n',
+    'etc/master.passwd': 'root:*:0:0::0:0:Charlie &:/root:/bin/csh\n',
+    'etc/gettytab': (
+        '# Live system terminals\n'
+        'default:\\\n'
+        '\t:cb:ce:ck:lc:fd#1000:sp#1200:\n'
+        '\n'
+        'ghostbsd|Ghostbsd|ghostbsd autologin:\\\n'
+        '\t:al=ghostbsd:ht:np:sp#115200:\n'
+        '\n'
+        'P|Pc|Pc console:\\\n'
+        '\t:ht:np:sp#9600:\n'
+    ),
+    'etc/ttys': (
+        '# name\tgetty\ttype\tstatus\tcomments\n'
+        'console\tnone\tunknown\toff secure\n'
+        'ttyv0\t"/usr/libexec/getty ghostbsd"\txterm\ton  secure\n'
+        'ttyv1\t"/usr/libexec/getty Pc"\txterm\tonifexists secure\n'
+    ),
+    'usr/share/skel/dot.profile': 'LANG=en_US.UTF-8; export LANG\n',
+    'usr/share/zoneinfo/zone1970.tab': (
+        'US\t+404251-0740023\tAmerica/New_York\n'
+        'FR,MC\t+4852+00220\tEurope/Paris\n'
+    ),
+    'usr/share/zoneinfo/America/New_York': 'TZif-new-york',
+    'usr/share/zoneinfo/Europe/Paris': 'TZif-paris',
+    'etc/localtime': 'TZif-utc',
+}
+
+# Logs its arguments and input, and adds the users it is asked to create
+# with a home copied from the skeleton
+fake_pw = '''#!/bin/sh
+{{ echo "$*"; [ "$3" = usermod ] && {{ cat; echo; }}; }} >> {log}
+if [ "$3" = useradd ]; then
+    echo "$4:*:1001:1001::0:0:x:/home/$4:/bin/sh" >> "$2/etc/master.passwd"
+    mkdir -p "$2/home/$4" && cp "$2/usr/share/skel/dot.profile" "$2/home/$4/.profile"
+fi
+exit 0
+'''
+
+
+@pytest.fixture
+def target_root(tmp_path, monkeypatch):
+    """
+    Configure a fake system root holding root_files instead of this machine.
+
+    Returns:
+        pathlib.Path: The root directory
+    """
+    root = tmp_path / 'root'
+    for name, content in root_files.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    monkeypatch.setattr(Target, 'root', str(root))
+    return root
+
+
+@pytest.fixture
+def pw_log(tmp_path, monkeypatch):
+    """Put a fake pw first in PATH and return its log."""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log = tmp_path / 'pw.log'
+    (bin_dir / 'pw').write_text(fake_pw.format(log=log))
+    os.chmod(bin_dir / 'pw', 0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    CommandRunner.configure('')
+    SetupReport.reset()
+    yield log
+    SetupData.reset()
+    SetupReport.reset()
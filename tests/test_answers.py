@@ -0,0 +1,89 @@
+"""
+Answers file parsing for the unattended mode.
+"""
+import pytest
+
+from setup_station.answers import load_answers, parse_answers, read_answers
+from setup_station.data import SetupData
+
+answers_toml = '''
+[language]
+code = "fr_FR"
+
+[keyboard]
+layout = "fr"
+
+[timezone]
+name = "Europe/Paris"
+
+[admin]
+username = "ghost"
+fullname = "Ghost User"
+password = "secret"
+'''
+
+
+def minimal() -> dict:
+    return {
+        'language': {'code': 'en_US'},
+        'timezone': {'name': 'America/New_York'},
+        'admin': {'username': 'ghost', 'fullname': 'Ghost User', 'password': 'secret'},
+    }
+
+
+def test_page_defaults():
+    values = parse_answers(minimal(), 'test')
+    assert values['user_shell'] == '/usr/local/bin/zsh'
+    assert values['user_home_directory'] == '/home/ghost'
+    assert values['hostname'] == 'ghost-ghostbsd'
+    assert values['root_password'] == 'secret'
+
+
+def test_given_values_are_kept():
+    answers = minimal()
+    answers['admin'].update(hostname='station', shell='/bin/sh', home='/usr/home/ghost')
+    values = parse_answers(answers, 'test')
+    assert (values['hostname'], values['user_shell'], values['user_home_directory']) == \
+        ('station', '/bin/sh', '/usr/home/ghost')
+
+
+@pytest.mark.parametrize('change, message', [
+    (lambda answers: answers['admin'].pop('password'), "'admin.password' is required"),
+    (lambda answers: answers['language'].update(code=''), "'language.code' is required"),
+    (lambda answers: answers['admin'].update(uid='1001'), "unknown answer 'admin.uid'"),
+    (lambda answers: answers['admin'].update(shell=1), "'admin.shell' must be a string"),
+    (lambda answers: answers.update(keyboard='us'), "'keyboard' must be a table"),
+])
+def test_invalid_answers(change, message):
+    answers = minimal()
+    change(answers)
+    with pytest.raises(ValueError, match=message):
+        parse_answers(answers, 'test')
+
+
+def test_read_file(tmp_path):
+    path = tmp_path / 'answers.toml'
+    path.write_text(answers_toml)
+    values = read_answers(str(path))
+    assert values['language_code'] == 'fr_FR'
+    assert values['keyboard_layout'] == 'fr'
+    assert 'keyboard_variant' not in values
+
+
+def test_invalid_toml(tmp_path):
+    path = tmp_path / 'answers.toml'
+    path.write_text('[admin\n')
+    with pytest.raises(ValueError, match='Invalid answers file'):
+        read_answers(str(path))
+
+
+def test_load_resets_setup_data(tmp_path):
+    path = tmp_path / 'answers.toml'
+    path.write_text(answers_toml)
+    SetupData.keyboard_variant = 'dvorak'
+    try:
+        load_answers(str(path))
+        assert SetupData.timezone == 'Europe/Paris'
+        assert not SetupData.keyboard_variant
+    finally:
+        SetupData.reset()
@@ -0,0 +1,92 @@
+"""
+Batch provisioning: manifests and clones of the base root.
+"""
+import json
+import os
+
+import pytest
+
+from setup_station.batch import clone_root, read_manifest
+
+manifest_csv = (
+    'name,language.code,timezone.name,admin.username,admin.fullname,admin.password,admin.hostname\n'
+    'lab1,en_US,Europe/Paris,ghost,Ghost User,secret,\n'
+    ',fr_FR,Europe/Paris,ghost,Ghost User,secret,lab2\n'
+)
+
+
+@pytest.fixture
+def base_root(tmp_path):
+    root = tmp_path / 'base'
+    (root / 'etc').mkdir(parents=True)
+    (root / 'etc/rc.conf').write_text('hostname="livecd"\n')
+    (root / 'etc/master.passwd').write_text('root:*:0:0::0:0:Charlie &:/root:/bin/csh\n')
+    os.symlink('/usr/share/zoneinfo/UTC', root / 'etc/localtime')
+    (root / 'var/log').mkdir(parents=True)
+    (root / 'var/log/userlog').write_text('')
+    return root
+
+
+def test_read_csv_manifest(tmp_path):
+    path = tmp_path / 'hosts.csv'
+    path.write_text(manifest_csv)
+    hosts = read_manifest(str(path))
+    assert [name for name, _ in hosts] == ['lab1', 'lab2']
+    # Empty cells are left out
+    assert 'hostname' not in hosts[0][1]['admin']
+    assert hosts[1][1]['language'] == {'code': 'fr_FR'}
+
+
+@pytest.mark.parametrize('rows, message', [
+    ({'name': 'lab1'}, 'must be a list'),
+    ([{'name': '../lab1'}], 'invalid or missing host name'),
+    ([{'admin': {'username': 'ghost'}}], 'invalid or missing host name'),
+    ([{'name': 'lab1'}, {'name': 'lab1'}], 'duplicate host name'),
+])
+def test_invalid_json_manifest(tmp_path, rows, message):
+    path = tmp_path / 'hosts.json'
+    path.write_text(json.dumps(rows))
+    with pytest.raises(ValueError, match=message):
+        read_manifest(str(path))
+
+
+def test_clone_links_all_but_the_password_database(tmp_path, base_root):
+    host = tmp_path / 'out' / 'lab1'
+    host.parent.mkdir()
+    clone_root(str(base_root), str(host))
+    assert os.path.samefile(host / 'etc/rc.conf', base_root / 'etc/rc.conf')
+    assert not os.path.samefile(host / 'etc/master.passwd', base_root / 'etc/master.passwd')
+    assert os.readlink(host / 'etc/localtime') == '/usr/share/zoneinfo/UTC'
+
+
+def test_clone_replaces_a_stale_clone(tmp_path, base_root):
+    host = tmp_path / 'out' / 'lab1'
+    host.parent.mkdir()
+    clone_root(str(base_root), str(host))
+    (host / 'etc/rc.conf').unlink()
+    (host / 'etc/rc.conf').write_text('hostname="lab1"\n')
+    (host / 'stale').write_text('left by the last run')
+    clone_root(str(base_root), str(host))
+    assert (host / 'etc/rc.conf').read_text() == 'hostname="livecd"\n'
+    assert not (host / 'stale').exists()
+    assert (base_root / 'etc/rc.conf').read_text() == 'hostname="livecd"\n'
+    assert os.listdir(host.parent) == ['lab1']
+
+
+@pytest.mark.parametrize('host', ['base', '.'])
+def test_clone_never_replaces_the_base_root(tmp_path, base_root, host):
+    with pytest.raises(ValueError):
+        clone_root(str(base_root), str(tmp_path / host))
+    assert (base_root / 'etc/rc.conf').exists()
+
+
+def test_clone_copies_logs_appended_in_place(tmp_path, base_root):
+    hosts = [tmp_path / 'out' / name for name in ('lab1', 'lab2')]
+    hosts[0].parent.mkdir()
+    for host in hosts:
+        clone_root(str(base_root), str(host))
+    # As pw useradd does with pw.conf's logfile
+    with open(hosts[0] / 'var/log/userlog', 'a') as f:
+        f.write('ghost(1001:1001) created\n')
+    assert (base_root / 'var/log/userlog').read_text() == ''
+    assert (hosts[1] / 'var/log/userlog').read_text() == ''
@@ -0,0 +1,146 @@
+"""
+Catalog cache: fingerprints, stale entries, corrupt cache files and the
+build-time snapshot.
+"""
+import json
+import os
+import threading
+
+import pytest
+
+from setup_station import catalog
+from setup_station.catalog import CACHE_VERSION, CatalogCache, build_snapshot, fingerprint
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Point the cache at tmp_path with a single catalog built from one file."""
+    source = tmp_path / 'source'
+    source.write_text('one')
+    built = []
+
+    def builder() -> dict:
+        built.append(threading.current_thread().name)
+        return {'content': source.read_text()}
+
+    monkeypatch.setattr(catalog, 'cache_dir', str(tmp_path))
+    monkeypatch.setattr(catalog, 'cache_file', str(tmp_path / 'catalog.json'))
+    monkeypatch.setattr(catalog, 'catalog_snapshot', str(tmp_path / 'missing-snapshot'))
+    monkeypatch.setattr(catalog, 'catalog_sources', {'test': (builder, (str(source),))})
+    CatalogCache.clear()
+    yield source, built
+    CatalogCache.clear()
+
+
+def read_cache() -> dict:
+    with open(catalog.cache_file, 'r') as f:
+        return json.load(f)
+
+
+def test_fingerprint_missing_file(tmp_path):
+    path = str(tmp_path / 'missing')
+    assert fingerprint((path,)) == [[path, None, None]]
+
+
+def test_miss_builds_and_stores(cache):
+    source, built = cache
+    assert CatalogCache.get('test') == {'content': 'one'}
+    assert len(built) == 1
+    content = read_cache()
+    assert content['version'] == CACHE_VERSION
+    assert content['entries']['test']['key'] == fingerprint((str(source),))
+
+
+def test_fresh_entry_served_from_disk(cache):
+    source, built = cache
+    CatalogCache.get('test')
+    CatalogCache.clear()
+    assert CatalogCache.get('test') == {'content': 'one'}
+    assert len(built) == 1
+
+
+def test_stale_entry_served_then_rebuilt(cache):
+    source, built = cache
+    CatalogCache.get('test')
+    source.write_text('two!')
+    CatalogCache.clear()
+    assert CatalogCache.get('test') == {'content': 'one'}
+    for thread in threading.enumerate():
+        if thread is not threading.current_thread() and thread.daemon:
+            thread.join(timeout=5)
+    assert read_cache()['entries']['test']['data'] == {'content': 'two!'}
+
+
+@pytest.mark.parametrize('content', [
+    'not json',
+    '[]',
+    json.dumps({'version': CACHE_VERSION, 'entries': []}),
+    json.dumps({'version': CACHE_VERSION, 'entries': {'test': ['data']}}),
+    json.dumps({'version': CACHE_VERSION, 'entries': {'test': {'key': None, 'data': 'text'}}}),
+    json.dumps({'version': CACHE_VERSION + 1, 'entries': {'test': {'key': None, 'data': {}}}}),
+])
+def test_corrupt_cache_counts_as_miss(cache, content):
+    source, built = cache
+    with open(catalog.cache_file, 'w') as f:
+        f.write(content)
+    assert CatalogCache.get('test') == {'content': 'one'}
+    assert len(built) == 1
+
+
+def test_when_ready_passes_empty_catalog_on_failure(cache, monkeypatch):
+    def failing() -> dict:
+        raise KeyError('broken')
+
+    monkeypatch.setattr(catalog, 'catalog_sources', {'test': (failing, ())})
+    received = threading.Event()
+    results = []
+    CatalogCache.when_ready('test', lambda data: (results.append(data), received.set()))
+    assert received.wait(5)
+    assert results == [{}]
+    assert not os.path.exists(catalog.cache_file)
+
+
+def test_snapshot_takes_precedence(cache, tmp_path, monkeypatch):
+    rules = tmp_path / 'rules'
+    rules.mkdir()
+    (rules / 'base.lst').write_text('! layout\n  fr  French\n')
+    zoneinfo = tmp_path / 'zoneinfo'
+    zoneinfo.mkdir()
+    (zoneinfo / 'zone.tab').write_text('FR\t+4852+00220\tEurope/Paris\n')
+    snapshot = tmp_path / 'catalogs.marshal'
+    monkeypatch.setattr(catalog, 'query_languages', lambda: {'English': 'en_US'})
+    names = build_snapshot(str(snapshot), str(rules), str(zoneinfo))
+    assert names == ['languages', 'keyboard_layouts', 'keyboard_models', 'timezones']
+    monkeypatch.setattr(catalog, 'catalog_snapshot', str(snapshot))
+    assert CatalogCache.load_snapshot()['timezones'] == {'Europe': ['Paris']}
+    monkeypatch.setitem(catalog.catalog_sources, 'languages', (None, ()))
+    assert CatalogCache.get('languages') == {'English': 'en_US'}
+
+
+def test_unavailable_catalogs_are_left_out_of_the_snapshot(cache, tmp_path, monkeypatch):
+    def failing() -> dict:
+        raise RuntimeError('pc-sysinstall not found')
+
+    monkeypatch.setattr(catalog, 'query_languages', failing)
+    snapshot = tmp_path / 'catalogs.marshal'
+    names = build_snapshot(str(snapshot), str(tmp_path / 'rules'), str(tmp_path / 'zoneinfo'))
+    assert names == []
+    monkeypatch.setattr(catalog, 'catalog_snapshot', str(snapshot))
+    assert CatalogCache.load_snapshot() == {}
+
+
+def test_prefetch_runs_catalogs_concurrently(cache, monkeypatch):
+    release = threading.Event()
+
+    def slow() -> dict:
+        release.wait(5)
+        return {'slow': True}
+
+    monkeypatch.setattr(catalog, 'catalog_sources', {'slow': (slow, ()), 'fast': (lambda: {'fast': True}, ())})
+    futures = CatalogCache.prefetch()
+    assert CatalogCache.prefetch() is futures
+    # A slow catalog does not hold back the others
+    assert futures['fast'].result(timeout=5) == {'fast': True}
+    assert not futures['slow'].done()
+    release.set()
+    assert futures['slow'].result(timeout=5) == {'slow': True}
@@ -0,0 +1,92 @@
+"""
+Command runner: timeouts, concurrency, and the record and replay modes.
+"""
+import os
+import subprocess
+
+import pytest
+
+from setup_station.commands import CommandRunner
+from setup_station.setup_report import SetupReport
+
+# Prints its first argument and a line counting its runs in the given file
+counter = ['sh', '-c', 'echo "$0"; echo run >> "$1"; wc -l < "$1" | tr -d " "']
+
+
+@pytest.fixture(autouse=True)
+def runner():
+    SetupReport.reset()
+    CommandRunner.configure('')
+    yield
+    CommandRunner.configure('')
+    SetupReport.reset()
+
+
+def test_run_is_reported():
+    result = CommandRunner.run(['sh', '-c', 'exit 3'])
+    assert result.returncode == 3
+    commands = SetupReport.as_dict()['commands']
+    assert [(entry['command'], entry['exit_status'], entry['timed_out']) for entry in commands] == \
+        [('sh -c', 3, False)]
+
+
+def test_check_raises():
+    with pytest.raises(subprocess.CalledProcessError):
+        CommandRunner.run(['false'], check=True)
+
+
+def test_timeout_kills_the_command():
+    with pytest.raises(subprocess.TimeoutExpired):
+        CommandRunner.run(['sleep', '10'], timeout=0.1)
+    assert SetupReport.as_dict()['commands'][0]['timed_out']
+
+
+def test_run_all_keeps_order_and_reports_completion():
+    completed = []
+    commands = [['sh', '-c', f'sleep 0.{3 - number}; echo {number}'] for number in range(3)]
+    results = CommandRunner.run_all(
+        commands, on_complete=lambda done, total: completed.append((done, total)),
+        capture_output=True, text=True
+    )
+    assert [result.stdout for result in results] == ['0\n', '1\n', '2\n']
+    assert completed == [(1, 3), (2, 3), (3, 3)]
+
+
+def test_run_all_raises_after_every_command(tmp_path):
+    marker = tmp_path / 'marker'
+    commands = [['false'], ['sh', '-c', f'sleep 0.1; touch {marker}']]
+    with pytest.raises(subprocess.CalledProcessError):
+        CommandRunner.run_all(commands, check=True)
+    assert marker.exists()
+
+
+@pytest.mark.parametrize('value', ['record', 'record:', 'play:/tmp'])
+def test_invalid_mode(value):
+    with pytest.raises(ValueError):
+        CommandRunner.configure(value)
+
+
+def test_record_then_replay(tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    runs = tmp_path / 'runs'
+    command = counter + ['hello', str(runs)]
+    CommandRunner.configure(f'record:{fixtures}')
+    recorded = [CommandRunner.run(command, capture_output=True, text=True).stdout for _ in range(2)]
+    assert recorded == ['hello\n1\n', 'hello\n2\n']
+    # Command input is never saved
+    CommandRunner.run(['sh', '-c', 'read password'], input=b'secret\n', capture_output=True)
+    assert not any(b'secret' in path.read_bytes() for path in fixtures.iterdir())
+
+    os.unlink(runs)
+    CommandRunner.configure(f'replay:{fixtures}')
+    replayed = [CommandRunner.run(command, capture_output=True, text=True).stdout for _ in range(3)]
+    # The recorded results in order, then the last one again
+    assert replayed == recorded + [recorded[-1]]
+    assert CommandRunner.run(command, capture_output=True).stdout == b'hello\n2\n'
+    assert not runs.exists()
+
+
+def test_replay_without_fixture(tmp_path):
+    CommandRunner.configure(f'replay:{tmp_path}')
+    with pytest.raises(RuntimeError, match='No recorded result'):
+        CommandRunner.run(['pw', 'usershow', 'ghost'])
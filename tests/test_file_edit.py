@@ -0,0 +1,141 @@
+"""
+Atomic file replacement, copies, links, snapshots and batched edits.
+"""
+import os
+import stat
+
+import pytest
+
+from setup_station.file_edit import FileEdits, FileSnapshot, atomic_write, install_copy, install_symlink
+
+
+def mode_of(path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+def test_atomic_write_keeps_mode(tmp_path):
+    path = tmp_path / 'login.conf'
+    path.write_text('old\n')
+    os.chmod(path, 0o600)
+    atomic_write(str(path), 'new\n')
+    assert path.read_text() == 'new\n'
+    assert mode_of(path) == 0o600
+    assert os.listdir(tmp_path) == ['login.conf']
+
+
+def test_atomic_write_new_file(tmp_path):
+    path = tmp_path / 'localtime'
+    atomic_write(str(path), b'TZif', mode=0o444)
+    assert path.read_bytes() == b'TZif'
+    assert mode_of(path) == 0o444
+
+
+def test_atomic_write_failure_leaves_no_temporary(tmp_path):
+    path = tmp_path / 'missing' / 'file'
+    with pytest.raises(OSError):
+        atomic_write(str(path), 'content')
+    assert os.listdir(tmp_path) == []
+
+
+def test_edits_are_applied_in_order_once_per_file(tmp_path):
+    profile = tmp_path / 'profile'
+    profile.write_text('LANG=C.UTF-8; export LANG\nCHARSET=UTF-8; export CHARSET\n')
+    untouched = tmp_path / 'untouched'
+    untouched.write_text('LANG=fr_FR.UTF-8\n')
+    mtime = os.stat(untouched).st_mtime_ns
+    edits = FileEdits()
+    edits.add(str(profile), r'LANG=[^;]*', 'LANG=fr_FR.UTF-8')
+    edits.add(str(profile), r'fr_FR', 'fr_CA')
+    edits.add(str(untouched), r'LANG=fr_FR\.UTF-8', 'LANG=fr_FR.UTF-8')
+    assert edits.commit() == [str(profile)]
+    assert profile.read_text() == 'LANG=fr_CA.UTF-8; export LANG\nCHARSET=UTF-8; export CHARSET\n'
+    assert os.stat(untouched).st_mtime_ns == mtime
+    # The batch is emptied by commit()
+    assert edits.commit() == []
+
+
+def test_missing_file_aborts_the_batch(tmp_path):
+    profile = tmp_path / 'profile'
+    profile.write_text('LANG=C\n')
+    edits = FileEdits()
+    edits.add(str(profile), r'LANG=C', 'LANG=fr_FR.UTF-8')
+    edits.add(str(tmp_path / 'missing'), r'LANG=C', 'LANG=fr_FR.UTF-8')
+    with pytest.raises(FileNotFoundError):
+        edits.commit()
+    assert profile.read_text() == 'LANG=C\n'
+
+
+def test_install_copy_is_not_a_link(tmp_path):
+    source = tmp_path / 'Paris'
+    source.write_bytes(b'TZif' * 10000)
+    os.chmod(source, 0o444)
+    path = tmp_path / 'localtime'
+    os.symlink(str(source), path)
+    install_copy(str(source), str(path))
+    assert not path.is_symlink()
+    assert path.read_bytes() == source.read_bytes()
+    assert mode_of(path) == 0o444
+    assert os.stat(path).st_ino != os.stat(source).st_ino
+    assert sorted(os.listdir(tmp_path)) == ['Paris', 'localtime']
+
+
+def test_install_copy_missing_source(tmp_path):
+    path = tmp_path / 'localtime'
+    path.write_text('old')
+    with pytest.raises(OSError):
+        install_copy(str(tmp_path / 'missing'), str(path))
+    assert path.read_text() == 'old'
+    assert os.listdir(tmp_path) == ['localtime']
+
+
+def test_install_symlink_replaces_file(tmp_path):
+    path = tmp_path / 'localtime'
+    path.write_text('old')
+    install_symlink('/usr/share/zoneinfo/Europe/Paris', str(path))
+    assert os.readlink(path) == '/usr/share/zoneinfo/Europe/Paris'
+    assert os.listdir(tmp_path) == ['localtime']
+
+
+def test_snapshot_restores_files_links_and_missing(tmp_path):
+    conf = tmp_path / 'login.conf'
+    conf.write_text('lang=C\n')
+    os.chmod(conf, 0o640)
+    link = tmp_path / 'localtime'
+    os.symlink('/usr/share/zoneinfo/UTC', link)
+    created = tmp_path / 'keyboard.conf'
+    snapshot = FileSnapshot([str(conf), str(link), str(created), str(conf)])
+    conf.write_text('lang=fr_FR\n')
+    os.unlink(link)
+    link.write_text('TZif')
+    created.write_text('Section "InputClass"\n')
+    snapshot.restore()
+    assert conf.read_text() == 'lang=C\n'
+    assert mode_of(conf) == 0o640
+    assert os.readlink(link) == '/usr/share/zoneinfo/UTC'
+    assert not created.exists()
+
+
+def test_snapshot_saved_to_disk(tmp_path):
+    conf = tmp_path / 'login.conf'
+    conf.write_bytes(b'lang=C\n\xff')
+    missing = tmp_path / 'missing'
+    directory = tmp_path / 'staged' / 'language'
+    FileSnapshot([str(conf), str(missing)]).save(str(directory))
+    assert mode_of(directory) == 0o700
+    conf.write_text('lang=fr_FR\n')
+    missing.write_text('new')
+    FileSnapshot.load(str(directory)).restore()
+    assert conf.read_bytes() == b'lang=C\n\xff'
+    assert not missing.exists()
+    FileSnapshot.discard(str(directory))
+    assert os.listdir(tmp_path / 'staged') == []
+    FileSnapshot.discard(str(directory))
+
+
+def test_snapshot_without_manifest_is_ignored(tmp_path):
+    directory = tmp_path / 'staged'
+    directory.mkdir()
+    (directory / '0').write_text('partial')
+    assert FileSnapshot.load(str(directory)) is None
+    (directory / 'manifest.json').write_text('{"version": 0, "files": []}')
+    assert FileSnapshot.load(str(directory)) is None
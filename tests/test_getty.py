@@ -0,0 +1,86 @@
+"""
+ttys and gettytab models: edits by entry with the rest of the file kept.
+"""
+from setup_station.getty import GettyTab, Ttys
+
+ttys = (
+    '#\n'
+    '# name\tgetty\t\t\t\ttype\tstatus\t\tcomments\n'
+    'console\tnone\t\t\t\tunknown\toff secure\n'
+    'ttyv0\t"/usr/libexec/getty ghostbsd"\txterm\ton  secure # live user\n'
+    'ttyv1\t"/usr/libexec/getty Pc"\t\txterm\tonifexists secure\n'
+    '# ttyv0\t"/usr/libexec/getty ghostbsd"\txterm\toff secure\n'
+)
+
+gettytab = (
+    '# Terminal configuration\n'
+    'default:\\\n'
+    '\t:cb:ce:ck:lc:fd#1000:im=\\r\\n%s/%m (%h) (%t)\\r\\n\\r\\n:sp#1200:\n'
+    '\n'
+    'ghostbsd|Ghostbsd|ghostbsd autologin:\\\n'
+    '\t:al=ghostbsd:ht:np:sp#115200:\n'
+    '\n'
+    'P|Pc|Pc console:\\\n'
+    '\t:ht:np:sp#9600:\n'
+    '\n'
+    'al.Pc:\\\n'
+    '\t:ht:np:sp#115200:al=ghostbsd:\n'
+    '# end\n'
+)
+
+
+def test_unedited_files_are_not_written(tmp_path):
+    for model, name, content in ((Ttys, 'ttys', ttys), (GettyTab, 'gettytab', gettytab)):
+        path = tmp_path / name
+        path.write_text(content)
+        assert model(str(path)).commit() == []
+        assert path.read_text() == content
+
+
+def test_ttys_getty_type(tmp_path):
+    path = tmp_path / 'ttys'
+    path.write_text(ttys)
+    model = Ttys(str(path))
+    assert model.getty_type('ttyv0') == 'ghostbsd'
+    assert model.getty_type('console') is None
+    assert model.getty_type('ttyv9') is None
+
+
+def test_ttys_replace_keeps_layout(tmp_path):
+    path = tmp_path / 'ttys'
+    path.write_text(ttys)
+    model = Ttys(str(path))
+    assert not model.replace_getty_type('ttyv1', 'ghostbsd', 'Pc')
+    assert model.replace_getty_type('ttyv0', 'ghostbsd', 'Pc')
+    assert model.commit() == ['ttyv0 getty ghostbsd -> Pc']
+    assert path.read_text() == ttys.replace(
+        'ttyv0\t"/usr/libexec/getty ghostbsd"', 'ttyv0\t"/usr/libexec/getty Pc"', 1
+    )
+    assert Ttys(str(path)).getty_type('ttyv0') == 'Pc'
+
+
+def test_gettytab_remove_entries(tmp_path):
+    path = tmp_path / 'gettytab'
+    path.write_text(gettytab)
+    model = GettyTab(str(path))
+    assert model.entries_for('ghostbsd') == ['ghostbsd', 'al.Pc']
+    assert model.remove_entries_for('ghostbsd') == ['ghostbsd', 'al.Pc']
+    assert model.commit() == ['removed entry ghostbsd', 'removed entry al.Pc']
+    assert path.read_text() == (
+        '# Terminal configuration\n'
+        'default:\\\n'
+        '\t:cb:ce:ck:lc:fd#1000:im=\\r\\n%s/%m (%h) (%t)\\r\\n\\r\\n:sp#1200:\n'
+        '\n'
+        '\n'
+        'P|Pc|Pc console:\\\n'
+        '\t:ht:np:sp#9600:\n'
+        '\n'
+        '# end\n'
+    )
+    assert GettyTab(str(path)).entries_for('ghostbsd') == []
+
+
+def test_missing_file(tmp_path):
+    model = GettyTab(str(tmp_path / 'gettytab'))
+    assert model.entries_for('ghostbsd') == []
+    assert model.remove_entries_for('ghostbsd') == []
@@ -0,0 +1,36 @@
+"""
+Handoff watcher: lightdm pidfile check and polling with backoff.
+"""
+import os
+import time
+
+from setup_station import handoff
+from setup_station.handoff import lightdm_running, wait_for
+
+
+def test_lightdm_running(tmp_path):
+    pidfile = tmp_path / 'lightdm.pid'
+    assert not lightdm_running(str(pidfile))
+    pidfile.write_text('')
+    assert not lightdm_running(str(pidfile))
+    pidfile.write_text(f'{os.getpid()}\n')
+    assert lightdm_running(str(pidfile))
+
+
+def test_wait_for_backs_off(monkeypatch):
+    monkeypatch.setattr(handoff, 'poll_interval', 0.01)
+    monkeypatch.setattr(handoff, 'max_poll_interval', 0.04)
+    sleeps = []
+    monkeypatch.setattr(handoff.time, 'sleep', sleeps.append)
+    results = iter([False] * 5 + [True])
+    assert wait_for(lambda: next(results), time.monotonic() + 60)
+    assert sleeps == [0.01, 0.02, 0.04, 0.04, 0.04]
+
+
+def test_wait_for_gives_up_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(handoff, 'poll_interval', 0.01)
+    checks = []
+    start = time.monotonic()
+    assert not wait_for(lambda: checks.append(1) and False, start + 0.05)
+    assert 0.05 <= time.monotonic() - start < 1
+    assert len(checks) >= 2
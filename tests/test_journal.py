@@ -0,0 +1,72 @@
+"""
+Checkpoint journal: committed answers, completed steps and old formats.
+"""
+import json
+import os
+import stat
+
+import pytest
+
+from setup_station import system_calls
+from setup_station.journal import JOURNAL_VERSION, SetupJournal
+
+values = {'username': 'ghost', 'user_password': 'secret', 'user_password_hash': '', 'hostname': 'box'}
+
+
+@pytest.fixture
+def journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(system_calls, 'hash_password', lambda password: f'$6$salt${password[::-1]}')
+    return SetupJournal(str(tmp_path / 'journal'))
+
+
+def test_begin_keeps_only_the_hash(journal):
+    committed = journal.begin(values)
+    assert committed['user_password'] == ''
+    assert committed['user_password_hash'] == '$6$salt$terces'
+    with open(journal.answers_path, 'r') as f:
+        assert 'secret' not in f.read()
+    assert stat.S_IMODE(os.stat(journal.answers_path).st_mode) == 0o600
+    assert journal.pending() == committed
+
+
+def test_completed_steps(journal):
+    committed = journal.begin(values)
+    journal.record('language', committed)
+    journal.record('hostname', dict(committed, hostname='other'))
+    with open(journal.journal_path, 'a') as f:
+        f.write('{"step": "keyb')
+    assert journal.completed(committed) == {'language'}
+
+
+def test_begin_starts_an_empty_journal(journal):
+    committed = journal.begin(values)
+    journal.record('language', committed)
+    committed = journal.begin(values)
+    assert journal.completed(committed) == set()
+
+
+def test_finish_removes_the_files(journal):
+    journal.begin(values)
+    journal.finish()
+    assert os.listdir(journal.directory) == []
+    assert journal.pending() is None
+
+
+@pytest.mark.parametrize('content', [
+    {'version': 1, 'values': {'username': 'ghost', 'user_password': 'secret'}},
+    {'version': JOURNAL_VERSION, 'values': {'username': 'ghost', 'user_password': 'secret'}},
+    {'version': JOURNAL_VERSION, 'values': ['ghost']},
+])
+def test_old_or_plaintext_answers_are_removed(journal, content):
+    os.makedirs(journal.directory)
+    with open(journal.answers_path, 'w') as f:
+        json.dump(content, f)
+    assert journal.pending() is None
+    assert not os.path.exists(journal.answers_path)
+
+
+def test_unreadable_answers_are_ignored(journal):
+    os.makedirs(journal.directory)
+    with open(journal.answers_path, 'w') as f:
+        f.write('{"version"')
+    assert journal.pending() is None
@@ -0,0 +1,126 @@
+"""
+Keyboard catalog parsing from fixture XKB rules directories.
+"""
+import threading
+
+import pytest
+
+from setup_station import keyboard_catalog as catalog_module
+from setup_station.keyboard_catalog import keyboard_catalog
+
+evdev_xml = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE xkbConfigRegistry SYSTEM "xkb.dtd">
+<xkbConfigRegistry version="1.1">
+  <modelList>
+    <model>
+      <configItem>
+        <name>pc105</name>
+        <description>Generic 105-key PC</description>
+      </configItem>
+    </model>
+  </modelList>
+  <layoutList>
+    <layout>
+      <configItem>
+        <name>us</name>
+        <description>English (US)</description>
+        <languageList><iso639Id>eng</iso639Id></languageList>
+      </configItem>
+      <variantList>
+        <variant>
+          <configItem>
+            <name>dvorak</name>
+            <description>English (Dvorak)</description>
+          </configItem>
+        </variant>
+      </variantList>
+    </layout>
+    <layout>
+      <configItem>
+        <name>fr</name>
+        <description>French</description>
+      </configItem>
+    </layout>
+  </layoutList>
+  <optionList>
+    <group allowMultipleSelection="true">
+      <configItem>
+        <name>ctrl</name>
+        <description>Ctrl position</description>
+      </configItem>
+      <option>
+        <configItem>
+          <name>ctrl:nocaps</name>
+          <description>Caps Lock as Ctrl</description>
+        </configItem>
+      </option>
+    </group>
+  </optionList>
+</xkbConfigRegistry>
+"""
+
+base_lst = """! model
+  pc105           Generic 105-key PC
+
+! layout
+  us              English (US)
+  fr              French
+
+! variant
+  dvorak          us: English (Dvorak)
+
+! option
+  ctrl:nocaps     Caps Lock as Ctrl
+"""
+
+expected_layouts = {
+    'English (US)': {'layout': 'us', 'variant': None},
+    'English (Dvorak)': {'layout': 'us', 'variant': 'dvorak'},
+    'French': {'layout': 'fr', 'variant': None},
+}
+
+
+@pytest.mark.parametrize('name, content', [('evdev.xml', evdev_xml), ('base.lst', base_lst)])
+def test_parse_rules(tmp_path, name, content):
+    (tmp_path / name).write_text(content)
+    catalog = keyboard_catalog(str(tmp_path))
+    assert catalog.layouts == expected_layouts
+    assert catalog.variants == {'us': ['dvorak'], 'fr': []}
+    assert catalog.models == {'Generic 105-key PC': 'pc105'}
+
+
+def test_broken_xml_falls_back_to_lst(tmp_path):
+    (tmp_path / 'evdev.xml').write_text(evdev_xml[:200])
+    (tmp_path / 'base.lst').write_text(base_lst)
+    assert keyboard_catalog(str(tmp_path)).layouts == expected_layouts
+
+
+def test_missing_rules(tmp_path):
+    with pytest.raises(RuntimeError):
+        keyboard_catalog(str(tmp_path))
+
+
+def test_concurrent_calls_parse_once(tmp_path, monkeypatch):
+    (tmp_path / 'base.lst').write_text(base_lst)
+    parse_lst = catalog_module._parse_lst
+    parsed = []
+    start = threading.Barrier(4)
+
+    def counting_parse(path: str):
+        parsed.append(threading.current_thread().name)
+        return parse_lst(path)
+
+    def prefetch() -> None:
+        start.wait()
+        keyboard_catalog(str(tmp_path))
+
+    monkeypatch.setattr(catalog_module, '_parse_lst', counting_parse)
+    workers = [threading.Thread(target=prefetch) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert len(parsed) == 1
+    keyboard_catalog.cache_clear()
+    keyboard_catalog(str(tmp_path))
+    assert len(parsed) == 2
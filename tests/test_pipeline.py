@@ -0,0 +1,59 @@
+"""
+Setup pipeline run against a fake target root.
+"""
+import time
+
+from setup_station import pipeline
+from setup_station.pipeline import apply_plan
+from setup_station.plan import compile_plan
+from setup_station.setup_report import SetupReport
+
+values = {
+    'language_code': 'fr_FR',
+    'keyboard_layout': 'fr',
+    'timezone': 'Europe/Paris',
+    'username': 'ghost',
+    'user_fullname': 'Ghost User',
+    'user_password': 'secret',
+    'user_shell': '/usr/local/bin/zsh',
+    'user_home_directory': '/home/ghost',
+    'hostname': 'station',
+}
+
+
+def test_setup_stays_in_the_target_root(target_root, pw_log):
+    apply_plan(compile_plan(values))
+    assert 'hostname="station"' in (target_root / 'etc/rc.conf').read_text()
+    assert 'lightdm_enable="YES"' in (target_root / 'etc/rc.conf').read_text()
+    assert (target_root / 'etc/localtime').read_text() == 'TZif-paris'
+    assert 'lang=fr_FR' in (target_root / 'etc/login.conf').read_text()
+    assert 'ghostbsd' not in (target_root / 'etc/gettytab').read_text()
+    commands = [line for line in pw_log.read_text().splitlines() if line.strip() != 'secret']
+    assert all(command.startswith(f'-R {target_root} ') for command in commands)
+    # Both passwords are set through the input, never an argument
+    assert pw_log.read_text().count('secret') == 2
+
+
+def test_second_run_only_sets_the_passwords(target_root, pw_log):
+    apply_plan(compile_plan(values))
+    SetupReport.reset()
+    pw_log.unlink()
+    apply_plan(compile_plan(values))
+    statuses = {entry['step']: entry['status'] for entry in SetupReport.as_dict()['steps']}
+    assert {name for name, status in statuses.items() if status == 'ok'} == {'passwords'}
+    assert 'useradd' not in pw_log.read_text()
+
+
+def test_new_home_gets_the_localized_profile(target_root, pw_log, monkeypatch):
+    apply_language = pipeline.apply_language
+
+    def slow_language() -> None:
+        # As on a slow disk
+        time.sleep(0.2)
+        apply_language()
+
+    monkeypatch.setattr(pipeline, 'apply_language', slow_language)
+    apply_plan(compile_plan(values))
+    assert 'fr_FR' in (target_root / 'usr/share/skel/dot.profile').read_text()
+    assert (target_root / 'home/ghost/.profile').read_text() == \
+        (target_root / 'usr/share/skel/dot.profile').read_text()
@@ -0,0 +1,84 @@
+"""
+Setup plan compilation and validation against a fake root.
+"""
+import pytest
+
+from setup_station.plan import check_answers, compile_plan
+
+answers_toml = '''
+[language]
+code = "fr_FR"
+
+[timezone]
+name = "{timezone}"
+
+[admin]
+username = "ghost"
+fullname = "Ghost User"
+password = "secret"
+'''
+
+
+def values(**changes) -> dict:
+    base = {
+        'language_code': 'fr_FR',
+        'keyboard_layout': 'fr',
+        'timezone': 'Europe/Paris',
+        'username': 'ghost',
+        'user_fullname': 'Ghost User',
+        'user_password': 'secret',
+        'user_shell': '/usr/local/bin/zsh',
+        'user_home_directory': '/home/ghost',
+        'hostname': 'ghost-ghostbsd',
+    }
+    base.update(changes)
+    return base
+
+
+def test_plan_lists_actions_in_pipeline_order(target_root):
+    plan = compile_plan(values())
+    assert plan.values['keyboard_variant'] == ''
+    steps = list(dict.fromkeys(action.step for action in plan.actions))
+    assert steps == [
+        'language', 'keyboard', 'timezone', 'admin_user', 'passwords', 'hostname',
+        'enable_lightdm', 'remove_autologin', 'commit_rc_conf'
+    ]
+    assert ('hostname', 'rc_conf', 'hostname', 'ghost-ghostbsd') in plan.actions
+    install = next(action for action in plan.actions if action.kind == 'install')
+    assert install.target == str(target_root / 'etc/localtime')
+    assert install.detail == f'{target_root}/usr/share/zoneinfo/Europe/Paris'
+
+
+def test_plan_does_not_change_the_root(target_root):
+    before = {path: path.read_bytes() for path in target_root.rglob('*') if path.is_file()}
+    compile_plan(values())
+    assert {path: path.read_bytes() for path in target_root.rglob('*') if path.is_file()} == before
+
+
+def test_password_commands_never_hold_the_password(target_root):
+    plan = compile_plan(values(user_password='', user_password_hash='$6$salt$hash'))
+    commands = [action.target for action in plan.actions if action.step == 'passwords']
+    assert len(commands) == 2
+    assert all('-H 0' in command for command in commands)
+    assert not any('secret' in action.target + action.detail for action in plan.actions)
+
+
+def test_every_error_is_reported(target_root):
+    with pytest.raises(ValueError) as error:
+        compile_plan(values(timezone='Mars/Olympus', hostname='-bad-', user_shell='/bin/fish'))
+    message = str(error.value)
+    assert "Timezone 'Mars/Olympus'" in message
+    assert "Invalid hostname" in message
+    assert "Invalid shell" in message
+
+
+def test_check_answers(target_root, tmp_path):
+    good = tmp_path / 'good.toml'
+    good.write_text(answers_toml.format(timezone='America/New_York'))
+    bad = tmp_path / 'bad.toml'
+    bad.write_text(answers_toml.format(timezone='Europe/Atlantis'))
+    missing = tmp_path / 'missing.toml'
+    results = check_answers([str(good), str(bad), str(missing)])
+    assert results[str(good)] == []
+    assert len(results[str(bad)]) == 1
+    assert len(results[str(missing)]) == 1
@@ -0,0 +1,68 @@
+"""
+Step probes: each reports its step done exactly once the step has run.
+"""
+from setup_station.rc_conf import RcConf
+from setup_station.system_calls import (
+    admin_user_exists,
+    autologin_removed,
+    enable_lightdm,
+    hostname_applied,
+    lightdm_enabled,
+    locale_applied,
+    localize_system,
+    remove_ghostbsd_autologin,
+    set_hostname,
+    set_timezone,
+    timezone_applied
+)
+
+
+def test_locale(target_root):
+    assert not locale_applied('fr_FR')
+    localize_system('fr_FR')
+    assert locale_applied('fr_FR')
+    assert 'lang=fr_FR' in (target_root / 'etc/login.conf').read_text()
+
+
+def test_timezone(target_root):
+    assert not timezone_applied('Europe/Paris')
+    assert set_timezone('Europe/Paris')
+    assert timezone_applied('Europe/Paris')
+    assert not set_timezone('Europe/Paris')
+    # A link like tzsetup makes, named inside the root
+    assert set_timezone('America/New_York', symlink=True)
+    assert timezone_applied('America/New_York')
+    assert not timezone_applied('Europe/Paris')
+
+
+def test_timezone_rejects_traversal(target_root):
+    assert not timezone_applied('../../etc/passwd')
+
+
+def test_hostname_and_lightdm(target_root):
+    rc_conf = RcConf()
+    assert not hostname_applied('station', rc_conf)
+    assert not lightdm_enabled(rc_conf)
+    set_hostname('station', rc_conf)
+    enable_lightdm(rc_conf)
+    assert hostname_applied('station', rc_conf)
+    assert lightdm_enabled(rc_conf)
+    # Only the committed rc.conf counts for a fresh model
+    assert not hostname_applied('station')
+    rc_conf.commit()
+    assert hostname_applied('station')
+
+
+def test_autologin(target_root):
+    assert not autologin_removed()
+    assert remove_ghostbsd_autologin()
+    assert autologin_removed()
+    assert remove_ghostbsd_autologin() == []
+    assert '"/usr/libexec/getty Pc"\txterm\ton  secure' in (target_root / 'etc/ttys').read_text()
+
+
+def test_admin_user(target_root):
+    assert admin_user_exists('root')
+    assert not admin_user_exists('ghost')
+    # A prefix of an existing name is another user
+    assert not admin_user_exists('roo')
@@ -0,0 +1,45 @@
+"""
+Profiling mode; enabling it hooks imports, so it runs in a subprocess.
+"""
+import os
+import subprocess
+import sys
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+profiled_script = '''
+import sys
+from setup_station.profiling import Profiler
+Profiler.configure(sys.argv)
+assert sys.argv == ['-c', 'other'], sys.argv
+with Profiler.phase('step', 'set timezone'):
+    import setup_station.timezone_catalog
+'''
+
+
+def test_profile_flag(tmp_path):
+    dump_dir = tmp_path / 'profile'
+    result = subprocess.run(
+        [sys.executable, '-c', profiled_script, f'--profile={dump_dir}', 'other'],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    assert 'Setup Station profile' in result.stderr
+    assert 'import     setup_station.timezone_catalog' in result.stderr
+    assert 'step       set timezone' in result.stderr
+    # One dump for the outermost phase only
+    assert os.listdir(dump_dir) == ['step-set_timezone.pstats']
+
+
+def test_disabled_by_default():
+    result = subprocess.run(
+        [sys.executable, '-c', profiled_script, 'other'],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+        env={key: value for key, value in os.environ.items() if key != 'SETUP_STATION_PROFILE'}
+    )
+    assert result.stderr == ''
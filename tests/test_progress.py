@@ -0,0 +1,101 @@
+"""
+Progress bus: history weights, sub-step progress and the step history file.
+"""
+import json
+import threading
+
+import pytest
+
+from setup_station.progress import HISTORY_VERSION, ProgressBus, StepHistory, report_progress, step_reporter
+from setup_station.step_executor import Step
+
+steps = [Step('short', 'Short', lambda: None, cost=1.0), Step('long', 'Long', lambda: None, cost=3.0)]
+
+
+@pytest.fixture(autouse=True)
+def no_current_step():
+    yield
+    ProgressBus._current.__dict__.clear()
+
+
+def write_history(path, entries) -> None:
+    with open(path, 'w') as f:
+        json.dump({'version': HISTORY_VERSION, 'steps': entries}, f)
+
+
+def test_weights_from_history_or_cost():
+    bus = ProgressBus(steps, history={'long': 1.0})
+    assert bus.weights == {'short': 1.0, 'long': 1.0}
+
+
+def test_bad_history_entries_are_ignored(tmp_path):
+    path = tmp_path / 'step-timings.json'
+    write_history(path, {'short': 'slow', 'long': -2, 'flag': True, 'other': 0.25})
+    assert StepHistory.load(str(path)) == {'other': 0.25}
+    bus = ProgressBus(steps, history={'short': None, 'long': float('nan')})
+    assert bus.weights == {'short': 1.0, 'long': 3.0}
+
+
+@pytest.mark.parametrize('content', ['{"version"', '[]', json.dumps({'version': HISTORY_VERSION + 1, 'steps': {}})])
+def test_unusable_history_is_empty(tmp_path, content):
+    path = tmp_path / 'step-timings.json'
+    path.write_text(content)
+    assert StepHistory.load(str(path)) == {}
+
+
+def test_history_is_smoothed(tmp_path):
+    path = str(tmp_path / 'cache' / 'step-timings.json')
+    StepHistory.update({'short': (0.0, 2.0)}, path)
+    StepHistory.update({'short': (10.0, 14.0), 'long': (0.0, 1.0)}, path)
+    assert StepHistory.load(path) == {'short': 3.0, 'long': 1.0}
+
+
+def test_weighted_fraction():
+    bus = ProgressBus(steps, history={})
+    bus.step_started(steps[0])
+    bus.step_completed(steps[0])
+    bus.step_started(steps[1])
+    report_progress(0.5, 'Halfway')
+    event = bus.snapshot()
+    assert event.fraction == pytest.approx(2.5 / 4)
+    assert event.label == 'Halfway'
+    bus.step_completed(steps[1])
+    assert bus.snapshot().fraction == 1.0
+    assert bus.snapshot().eta == 0.0
+
+
+def test_reported_progress_never_goes_back():
+    bus = ProgressBus(steps, history={})
+    bus.step_started(steps[1])
+    report_progress(0.5)
+    report_progress(0.25)
+    report_progress(2.0)
+    assert bus.snapshot().fraction == pytest.approx(3.0 / 4)
+
+
+def test_reporter_from_another_thread():
+    bus = ProgressBus(steps, history={})
+    bus.step_started(steps[1])
+    reporter = step_reporter()
+    worker = threading.Thread(target=reporter, args=(0.5,))
+    worker.start()
+    worker.join()
+    assert bus.snapshot().fraction == pytest.approx(1.5 / 4)
+
+
+def test_outside_a_step_nothing_happens():
+    report_progress(0.5)
+    step_reporter()(0.5)
+
+
+def test_subscribers_get_changes_only():
+    bus = ProgressBus(steps, history={})
+    events = []
+    bus.subscribe(events.append)
+    bus.step_completed(steps[0], ran=False)
+    bus._publish()
+    bus._publish()
+    assert len(events) == 1
+    assert events[0].fraction == pytest.approx(1 / 4)
+    # Skipped steps do not count towards the speed of the run
+    assert events[0].eta is None
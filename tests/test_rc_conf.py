@@ -0,0 +1,83 @@
+"""
+rc.conf model: parsing, in-place updates and the single atomic commit.
+"""
+import os
+import stat
+
+import pytest
+
+from setup_station.rc_conf import RcConf
+
+original = (
+    '# Set by the installer\n'
+    'hostname="livecd"\n'
+    "keymap='us.kbd'  # console keymap\n"
+    'sshd_enable=NO # disabled\n'
+    '\n'
+    'hostname="ghostbsd"\n'
+)
+
+
+@pytest.fixture
+def rc_conf(tmp_path):
+    path = tmp_path / 'rc.conf'
+    path.write_text(original)
+    os.chmod(path, 0o640)
+    return path
+
+
+def test_parse_values(rc_conf):
+    conf = RcConf(str(rc_conf))
+    assert conf.get('hostname') == 'ghostbsd'
+    assert conf.get('keymap') == 'us.kbd'
+    assert conf.get('sshd_enable') == 'NO'
+    assert conf.get('missing', 'default') == 'default'
+
+
+def test_updates_replace_last_assignment(rc_conf):
+    conf = RcConf(str(rc_conf))
+    conf.set('hostname', 'station')
+    conf.set('moused_enable', 'YES')
+    assert conf.get('hostname') == 'station'
+    # Nothing is written before commit()
+    assert rc_conf.read_text() == original
+    assert conf.commit()
+    assert rc_conf.read_text() == (
+        '# Set by the installer\n'
+        'hostname="livecd"\n'
+        "keymap='us.kbd'  # console keymap\n"
+        'sshd_enable=NO # disabled\n'
+        '\n'
+        'hostname="station"\n'
+        'moused_enable="YES"\n'
+    )
+    assert stat.S_IMODE(os.stat(rc_conf).st_mode) == 0o640
+    assert os.listdir(rc_conf.parent) == ['rc.conf']
+
+
+def test_unchanged_commit_does_not_write(rc_conf):
+    conf = RcConf(str(rc_conf))
+    conf.set('hostname', 'ghostbsd')
+    mtime = os.stat(rc_conf).st_mtime_ns
+    assert not conf.commit()
+    assert os.stat(rc_conf).st_mtime_ns == mtime
+
+
+def test_missing_file_is_created(tmp_path):
+    path = tmp_path / 'rc.conf'
+    conf = RcConf(str(path))
+    assert conf.get('hostname') is None
+    conf.set('hostname', 'station')
+    conf.commit()
+    assert path.read_text() == 'hostname="station"\n'
+
+
+@pytest.mark.parametrize('key, value', [
+    ('host-name', 'station'),
+    ('1hostname', 'station'),
+    ('hostname', 'sta"tion'),
+    ('hostname', 'sta\ntion'),
+])
+def test_invalid_updates(rc_conf, key, value):
+    with pytest.raises(ValueError):
+        RcConf(str(rc_conf)).set(key, value)
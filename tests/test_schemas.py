@@ -0,0 +1,47 @@
+"""
+Deferred schema compilation: one glib-compile-schemas run per directory.
+"""
+import os
+
+import pytest
+
+from setup_station.commands import CommandRunner
+from setup_station.schemas import SchemaCompiler
+
+
+@pytest.fixture
+def compiler_log(tmp_path, monkeypatch):
+    """Put a glib-compile-schemas logging its directory first in PATH."""
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    log = tmp_path / 'compiled.log'
+    script = bin_dir / 'glib-compile-schemas'
+    script.write_text(f'#!/bin/sh\necho "$1" >> {log}\n')
+    os.chmod(script, 0o755)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    CommandRunner.configure('')
+    return log
+
+
+def test_overrides_are_compiled_once_per_directory(tmp_path, compiler_log):
+    first = tmp_path / 'schemas'
+    second = tmp_path / 'other'
+    first.mkdir()
+    second.mkdir()
+    compiler = SchemaCompiler()
+    assert compiler.write_override(str(first / 'a.gschema.override'), '[org.mate]\n')
+    assert compiler.write_override(str(first / 'b.gschema.override'), '[org.xfce]\n')
+    compiler.queue(str(second))
+    compiler.compile()
+    assert sorted(compiler_log.read_text().split()) == [str(second), str(first)]
+    assert compiler.duration is not None
+
+
+def test_unchanged_override_compiles_nothing(tmp_path, compiler_log):
+    override = tmp_path / 'a.gschema.override'
+    override.write_text('[org.mate]\n')
+    compiler = SchemaCompiler()
+    assert not compiler.write_override(str(override), '[org.mate]\n')
+    compiler.compile()
+    assert not compiler_log.exists()
+    assert compiler.duration is None
@@ -0,0 +1,65 @@
+"""
+Setup timing report: steps, commands, changes and staged steps.
+"""
+import json
+
+import pytest
+
+from setup_station.setup_report import SetupReport
+
+
+@pytest.fixture(autouse=True)
+def report():
+    SetupReport.reset()
+    SetupReport.staged = []
+    yield
+    SetupReport.reset()
+    SetupReport.staged = []
+
+
+def test_records_are_attributed_to_their_step():
+    with SetupReport.step('admin_user'):
+        SetupReport.record_command(['pw', 'useradd', 'ghost', '-c', 'Ghost User'], 0.0, 0)
+        SetupReport.record_change('/etc/ttys', 'ttyv0 getty ghostbsd -> Pc')
+    SetupReport.record_not_run('hostname', 'blocked')
+    content = SetupReport.as_dict()
+    assert [(entry['step'], entry['status']) for entry in content['steps']] == \
+        [('admin_user', 'ok'), ('hostname', 'blocked')]
+    # Arguments, which hold user names, are left out
+    assert content['commands'][0]['command'] == 'pw useradd'
+    assert content['commands'][0]['step'] == 'admin_user'
+    assert content['changes'][0]['step'] == 'admin_user'
+
+
+def test_failed_step():
+    with pytest.raises(OSError):
+        with SetupReport.step('timezone'):
+            raise OSError('read-only file system')
+    assert SetupReport.as_dict()['steps'][0]['status'] == 'failed'
+
+
+def test_staged_steps_survive_reset():
+    with SetupReport.staging('keyboard') as entry:
+        SetupReport.record_change('/etc/rc.conf', 'keymap')
+    SetupReport.set_staged_status(entry, 'rolled back')
+    SetupReport.reset()
+    content = SetupReport.as_dict()
+    assert content['changes'] == []
+    assert content['staged'][0]['status'] == 'rolled back'
+    assert content['staged'][0]['changes'][0]['step'] == 'keyboard'
+
+
+def test_write(tmp_path, monkeypatch):
+    monkeypatch.setenv('SETUP_STATION_REPORT_DIR', str(tmp_path / 'spool'))
+    with SetupReport.step('hostname'):
+        pass
+    path = SetupReport.write()
+    assert path.startswith(str(tmp_path / 'spool'))
+    with open(path, 'r') as f:
+        assert json.load(f)['steps'][0]['step'] == 'hostname'
+
+
+def test_write_failure_is_reported(tmp_path):
+    blocker = tmp_path / 'file'
+    blocker.write_text('')
+    assert SetupReport.write(str(blocker / 'spool')) is None
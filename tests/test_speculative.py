@@ -0,0 +1,152 @@
+"""
+Speculative staging of the language and timezone steps against a fake root.
+
+Staging only runs on the live system, so these tests treat the fake root as
+live until the setup pipeline runs.
+"""
+import os
+import threading
+
+import pytest
+
+from setup_station import speculative
+from setup_station.data import SetupData, Target, staging_dir
+from setup_station.file_edit import FileSnapshot
+from setup_station.pipeline import apply_plan
+from setup_station.plan import compile_plan
+from setup_station.setup_report import SetupReport
+from setup_station.speculative import Speculation
+
+values = {
+    'language_code': 'fr_FR',
+    'keyboard_layout': 'fr',
+    'timezone': 'Europe/Paris',
+    'username': 'ghost',
+    'user_fullname': 'Ghost User',
+    'user_password': 'secret',
+    'user_shell': '/usr/local/bin/zsh',
+    'user_home_directory': '/home/ghost',
+    'hostname': 'station',
+}
+
+
+@pytest.fixture
+def live_root(target_root, monkeypatch):
+    """Enable staging with the fake root taken for the live system."""
+    monkeypatch.setattr(Target, 'is_live', classmethod(lambda cls: True))
+    monkeypatch.setattr(Speculation, 'enabled', True)
+    SetupReport.reset()
+    SetupReport.staged = []
+    yield target_root
+    Speculation.rollback()
+    SetupData.reset()
+    SetupReport.reset()
+    SetupReport.staged = []
+
+
+def stage(name: str, **changes) -> None:
+    for attribute, value in changes.items():
+        setattr(SetupData, attribute, value)
+    Speculation.stage(name)
+
+
+def wait(name: str) -> None:
+    Speculation.staged[name].future.result(timeout=10)
+
+
+def staged_statuses() -> list:
+    return [(entry['step'], entry['status']) for entry in SetupReport.as_dict()['staged']]
+
+
+def test_stage_applies_in_the_background(live_root):
+    stage('timezone', timezone='Europe/Paris')
+    wait('timezone')
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-paris'
+    assert os.listdir(live_root / staging_dir.lstrip('/')) == ['timezone']
+    assert staged_statuses() == [('timezone', 'ok')]
+    # Staging the same value again does nothing
+    future = Speculation.staged['timezone'].future
+    stage('timezone', timezone='Europe/Paris')
+    assert Speculation.staged['timezone'].future is future
+
+
+def test_restage_rolls_back_then_applies(live_root):
+    stage('timezone', timezone='Europe/Paris')
+    wait('timezone')
+    stage('timezone', timezone='America/New_York')
+    wait('timezone')
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-new-york'
+    assert staged_statuses() == [('timezone', 'rolled back'), ('timezone', 'ok')]
+    # Rolling back the new value restores the original file, not Paris
+    Speculation.rollback()
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-utc'
+
+
+def test_restage_cancels_a_step_not_started(live_root, monkeypatch):
+    release = threading.Event()
+    localize_system = speculative.localize_system
+
+    def blocked_localize(locale: str) -> None:
+        release.wait(10)
+        localize_system(locale)
+
+    monkeypatch.setattr(speculative, 'localize_system', blocked_localize)
+    # The single worker is busy with the language while timezone waits
+    stage('language', language_code='fr_FR')
+    stage('timezone', timezone='Europe/Paris')
+    paris = Speculation.staged['timezone'].future
+    stage('timezone', timezone='America/New_York')
+    assert paris.cancelled()
+    release.set()
+    wait('timezone')
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-new-york'
+    assert staged_statuses() == [('language', 'ok'), ('timezone', 'ok')]
+
+
+def test_rollback_on_close(live_root):
+    stage('language', language_code='fr_FR')
+    stage('timezone', timezone='Europe/Paris')
+    wait('timezone')
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-paris'
+    Speculation.rollback()
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-utc'
+    assert 'lang=C' in (live_root / 'etc/login.conf').read_text()
+    assert Speculation.staged == {}
+    assert os.listdir(live_root / staging_dir.lstrip('/')) == []
+    assert staged_statuses() == [('language', 'rolled back'), ('timezone', 'rolled back')]
+
+
+def test_settle_leaves_staged_steps_to_the_probes(live_root, pw_log, monkeypatch):
+    for attribute, value in values.items():
+        setattr(SetupData, attribute, value)
+    Speculation.stage('language')
+    Speculation.stage('timezone')
+    Speculation.settle()
+    assert Speculation.staged == {}
+    assert not os.path.exists(live_root / staging_dir.lstrip('/'))
+    monkeypatch.setattr(Target, 'is_live', classmethod(lambda cls: False))
+    SetupReport.reset()
+    apply_plan(compile_plan(values))
+    statuses = {entry['step']: entry['status'] for entry in SetupReport.as_dict()['steps']}
+    assert statuses['language'] == 'skipped'
+    assert statuses['timezone'] == 'skipped'
+    assert statuses['admin_user'] == 'ok'
+    assert (live_root / 'etc/localtime').read_text() == 'TZif-paris'
+    assert staged_statuses() == [('language', 'ok'), ('timezone', 'ok')]
+
+
+def test_recover_restores_staged_files(target_root):
+    staged = target_root / staging_dir.lstrip('/')
+    localtime = target_root / 'etc/localtime'
+    FileSnapshot([str(localtime)]).save(str(staged / 'timezone'))
+    localtime.write_text('TZif-paris')
+    # A step that crashed before its snapshot was complete changed nothing
+    (staged / 'keyboard').mkdir()
+    (staged / 'keyboard' / '0').write_text('partial')
+    assert Speculation.recover() == ['timezone']
+    assert localtime.read_text() == 'TZif-utc'
+    assert os.listdir(staged) == []
+
+
+def test_recover_without_staged_steps(target_root):
+    assert Speculation.recover() == []
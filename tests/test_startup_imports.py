@@ -0,0 +1,88 @@
+"""
+Startup import budget.
+
+setup-station-init imports the profiler, the journal and the catalog cache
+and prefetches the catalogs before the first window is shown. None of that
+may pull in the setup backend, and the language page shown first may only
+import what it needs at module level.
+"""
+import ast
+import json
+import os
+import subprocess
+import sys
+
+repo_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules only the setup pipeline needs
+backend_modules: tuple = (
+    'setup_station.apply',
+    'setup_station.commands',
+    'setup_station.getty',
+    'setup_station.handoff',
+    'setup_station.pipeline',
+    'setup_station.plan',
+    'setup_station.progress',
+    'setup_station.schemas',
+    'setup_station.setup_report',
+    'setup_station.system_calls',
+    'setup_station.validation',
+)
+import_budget: float = 0.5
+"""Seconds the startup imports may take, measured by python -X importtime."""
+
+# Every catalog is served from a fresh cache, as on a second boot
+startup_script = '''
+import json, os, sys
+from setup_station.profiling import Profiler
+from setup_station.journal import SetupJournal
+from setup_station import catalog
+from setup_station.catalog import CatalogCache, catalog_sources, fingerprint
+catalog.catalog_snapshot = os.path.join(sys.argv[1], 'missing-snapshot')
+catalog.cache_file = os.path.join(sys.argv[1], 'catalog.json')
+entries = {name: {'key': fingerprint(sources), 'data': {}} for name, (_, sources) in catalog_sources.items()}
+with open(catalog.cache_file, 'w') as f:
+    json.dump({'version': catalog.CACHE_VERSION, 'entries': entries}, f)
+for future in CatalogCache.prefetch().values():
+    future.result()
+print(json.dumps(sorted(name for name in sys.modules if name.startswith('setup_station'))))
+'''
+
+
+def run_startup(tmp_path, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, '-c', startup_script, str(tmp_path)],
+        cwd=repo_dir,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+
+def test_prefetch_does_not_import_backend(tmp_path):
+    loaded = json.loads(run_startup(tmp_path).stdout)
+    assert 'setup_station.catalog' in loaded
+    assert not set(backend_modules).intersection(loaded)
+
+
+def test_startup_imports_within_budget(tmp_path):
+    result = run_startup(tmp_path, '-X', 'importtime')
+    cumulative = 0
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package, indented
+        # by nesting; only top-level setup_station imports are summed
+        fields = line.partition(':')[2].split('|')
+        if len(fields) == 3 and fields[2].startswith(' setup_station.'):
+            cumulative += int(fields[1])
+    assert 0 < cumulative / 1e6 < import_budget
+
+
+def test_language_page_imports():
+    path = os.path.join(repo_dir, 'setup_station', 'language.py')
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read())
+    imported = {
+        node.module for node in tree.body
+        if isinstance(node, ast.ImportFrom) and node.module.startswith('setup_station')
+    }
+    assert imported == {'setup_station.catalog', 'setup_station.data', 'setup_station.window'}
@@ -0,0 +1,132 @@
+"""
+Step executor scheduling: requirements, file conflicts, failures and cycles.
+"""
+import threading
+import time
+
+import pytest
+
+from setup_station.setup_report import SetupReport
+from setup_station.step_executor import Step, StepExecutor
+
+
+@pytest.fixture(autouse=True)
+def report():
+    SetupReport.reset()
+    yield
+    SetupReport.reset()
+
+
+class Recorder:
+    """Builds step actions logging their start and end."""
+
+    def __init__(self) -> None:
+        self.events: list = []
+        self.lock = threading.Lock()
+
+    def action(self, name: str, duration: float = 0.0):
+        def run() -> None:
+            with self.lock:
+                self.events.append(('start', name))
+            time.sleep(duration)
+            with self.lock:
+                self.events.append(('end', name))
+        return run
+
+    def ended_before_started(self, first: str, second: str) -> bool:
+        return self.events.index(('end', first)) < self.events.index(('start', second))
+
+
+def statuses() -> dict:
+    return {entry['step']: entry['status'] for entry in SetupReport.as_dict()['steps']}
+
+
+def test_requirements_run_first():
+    recorder = Recorder()
+    steps = [
+        Step('c', 'C', recorder.action('c'), requires=('a', 'b')),
+        Step('a', 'A', recorder.action('a', 0.05)),
+        Step('b', 'B', recorder.action('b')),
+    ]
+    timings = StepExecutor(steps).run()
+    assert set(timings) == {'a', 'b', 'c'}
+    assert recorder.ended_before_started('a', 'c')
+    assert recorder.ended_before_started('b', 'c')
+
+
+def test_steps_touching_a_file_do_not_overlap():
+    recorder = Recorder()
+    steps = [
+        Step('first', 'First', recorder.action('first', 0.05), touches=('/etc/rc.conf',)),
+        Step('second', 'Second', recorder.action('second'), touches=('/etc/rc.conf',)),
+        Step('other', 'Other', recorder.action('other', 0.05), touches=('/etc/ttys',)),
+    ]
+    StepExecutor(steps).run()
+    assert recorder.ended_before_started('first', 'second')
+    # Independent steps start together
+    assert recorder.events.index(('start', 'other')) < recorder.events.index(('end', 'first'))
+
+
+def test_on_complete_counts_steps():
+    completed = []
+    steps = [Step('a', 'A', lambda: None), Step('b', 'B', lambda: None, requires=('a',))]
+    StepExecutor(steps, on_complete=lambda step, done, total: completed.append((step.name, done, total))).run()
+    assert completed == [('a', 1, 2), ('b', 2, 2)]
+
+
+def test_failure_blocks_dependents():
+    def fail() -> None:
+        raise OSError('disk full')
+
+    recorder = Recorder()
+    steps = [
+        Step('broken', 'Broken', fail),
+        Step('after', 'After', recorder.action('after'), requires=('broken',)),
+    ]
+    with pytest.raises(OSError, match='disk full'):
+        StepExecutor(steps).run()
+    assert recorder.events == []
+    assert statuses()['after'] == 'blocked'
+
+
+def test_completed_steps_are_not_run_again():
+    recorder = Recorder()
+    steps = [Step('a', 'A', recorder.action('a')), Step('b', 'B', recorder.action('b'), requires=('a',))]
+    StepExecutor(steps, completed={'a'}).run()
+    assert recorder.events == [('start', 'b'), ('end', 'b')]
+    assert statuses()['a'] == 'resumed'
+
+
+def test_executor_skips_probed_steps():
+    ran = []
+
+    def failing_probe() -> bool:
+        raise OSError('unreadable')
+
+    steps = [
+        Step('done', 'Done', lambda: ran.append('done'), probe=lambda: True),
+        Step('todo', 'Todo', lambda: ran.append('todo'), probe=lambda: False),
+        Step('broken', 'Broken', lambda: ran.append('broken'), probe=failing_probe),
+        Step('after', 'After', lambda: ran.append('after'), requires=('done',)),
+    ]
+    executor = StepExecutor(steps, max_workers=1)
+    timings = executor.run()
+    assert sorted(ran) == ['after', 'broken', 'todo']
+    assert executor.skipped == {'done'}
+    assert 'done' not in timings
+    assert statuses()['done'] == 'skipped'
+
+
+def test_cycle_is_reported():
+    steps = [Step('a', 'A', lambda: None, requires=('b',)), Step('b', 'B', lambda: None, requires=('a',))]
+    with pytest.raises(RuntimeError, match='cycle'):
+        StepExecutor(steps).run()
+
+
+@pytest.mark.parametrize('steps', [
+    [Step('a', 'A', lambda: None), Step('a', 'A', lambda: None)],
+    [Step('a', 'A', lambda: None, requires=('missing',))],
+])
+def test_invalid_steps(steps):
+    with pytest.raises(ValueError):
+        StepExecutor(steps)
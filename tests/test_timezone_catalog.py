@@ -0,0 +1,55 @@
+"""
+Timezone catalog parsing from a fixture zoneinfo tree.
+"""
+import pytest
+
+from setup_station.timezone_catalog import timezone_catalog
+
+zone1970_tab = (
+    "# tzdb timezone descriptions\n"
+    "#codes\tcoordinates\tTZ\tcomments\n"
+    "US\t+404251-0740023\tAmerica/New_York\tEastern (most areas)\n"
+    "CA,US\t+4531-07334\tAmerica/Toronto\n"
+    "FR,MC\t+4852+00220\tEurope/Paris\n"
+    "AR\t-3436-05827\tAmerica/Argentina/Buenos_Aires\n"
+)
+
+tzdata_zi = (
+    "# version 2024a\n"
+    "R E 1981 ma - Mar lSu 1u 1 S\n"
+    "Z America/New_York -4:56:2 - LMT 1883 N 18 17u\n"
+    "Z Etc/UTC 0 - UTC\n"
+    "L America/New_York US/Eastern\n"
+    "L Etc/UTC UTC\n"
+)
+
+
+def test_tab_index_and_links(tmp_path):
+    (tmp_path / 'zone1970.tab').write_text(zone1970_tab)
+    (tmp_path / 'tzdata.zi').write_text(tzdata_zi)
+    catalog = timezone_catalog(str(tmp_path))
+    assert catalog.index == {
+        'America': ['Argentina/Buenos_Aires', 'New_York', 'Toronto'],
+        'Europe': ['Paris'],
+    }
+    # Links and zones missing from the tab are valid, but not listed
+    assert {'US/Eastern', 'UTC', 'Etc/UTC', 'Europe/Paris'} <= catalog.zones
+    assert 'Etc' not in catalog.index
+
+
+def test_zone_tab_fallback(tmp_path):
+    (tmp_path / 'zone.tab').write_text("FR\t+4852+00220\tEurope/Paris\n")
+    catalog = timezone_catalog(str(tmp_path))
+    assert catalog.index == {'Europe': ['Paris']}
+    assert catalog.zones == frozenset({'Europe/Paris'})
+
+
+def test_tzdata_only(tmp_path):
+    (tmp_path / 'tzdata.zi').write_text(tzdata_zi)
+    catalog = timezone_catalog(str(tmp_path))
+    assert catalog.index == {'America': ['New_York'], 'Etc': ['UTC'], 'US': ['Eastern']}
+
+
+def test_missing_database(tmp_path):
+    with pytest.raises(RuntimeError):
+        timezone_catalog(str(tmp_path))
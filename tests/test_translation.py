@@ -0,0 +1,61 @@
+"""
+Cached translations per language.
+"""
+import struct
+
+import pytest
+
+from setup_station import data
+from setup_station.data import Translation
+
+
+def write_mo(path, messages: dict) -> None:
+    """Write a GNU gettext catalog holding messages."""
+    keys = sorted(messages)
+    originals = [key.encode() for key in keys]
+    translated = [messages[key].encode() for key in keys]
+    header = 7 * 4
+    table = header + 16 * len(keys)
+    strings = b''
+    offsets = []
+    for text in originals + translated:
+        offsets.append((len(text), table + len(strings)))
+        strings += text + b'\0'
+    content = struct.pack('<7I', 0x950412de, 0, len(keys), header, header + 8 * len(keys), 0, 0)
+    content += b''.join(struct.pack('<2I', *offset) for offset in offsets)
+    path.parent.mkdir(parents=True)
+    path.write_bytes(content + strings)
+
+
+@pytest.fixture(autouse=True)
+def translations(tmp_path, monkeypatch):
+    write_mo(tmp_path / 'fr/LC_MESSAGES/setup-station.mo', {'Language': 'Langue'})
+    monkeypatch.setattr(data, 'locale_dir', str(tmp_path))
+    Translation.clear()
+    language, Translation.language = Translation.language, None
+    yield
+    Translation.clear()
+    Translation.language = language
+
+
+def test_messages_are_memoized_per_language():
+    Translation.set_language('fr')
+    hits, misses = Translation.hits, Translation.misses
+    assert Translation.gettext('Language') == 'Langue'
+    assert Translation.gettext('Language') == 'Langue'
+    assert Translation.gettext('Keyboard') == 'Keyboard'
+    assert (Translation.hits - hits, Translation.misses - misses) == (1, 2)
+    Translation.set_language('de')
+    assert Translation.gettext('Language') == 'Language'
+    Translation.set_language('fr')
+    assert Translation.gettext('Language') == 'Langue'
+    assert Translation.hits - hits == 2
+
+
+def test_clear_drops_the_cache():
+    Translation.set_language('fr')
+    Translation.gettext('Language')
+    Translation.clear()
+    misses = Translation.misses
+    assert Translation.gettext('Language') == 'Langue'
+    assert Translation.misses == misses + 1